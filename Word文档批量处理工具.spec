@@ -5,6 +5,8 @@ hiddenimports = ['win32com.client', 'win32com.client.gencache']
 hiddenimports += collect_submodules('docx')
 hiddenimports += collect_submodules('docx2python')
 hiddenimports += collect_submodules('win32com')
+# 处理器和部分界面模块在首次使用时才导入，需显式收集
+hiddenimports += collect_submodules('gui')
 
 
 a = Analysis(
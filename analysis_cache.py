@@ -0,0 +1,273 @@
+"""
+提供基于SQLite的单文件分析结果缓存
+
+缓存字数、段落数、字符数、标题、作者、图片数量和大小、正文MinHash签名和解析错误，以文件内容哈希为键。
+文件路径、大小和修改时间均未变化时直接命中，无需读取文件；变化时重新计算哈希，
+内容未变（如仅复制或重命名）仍可命中。再次检测同一文件夹时只需分析新增或修改的文件。
+"""
+import os
+import time
+import sqlite3
+import threading
+
+from file_utils import file_content_hash, get_cache_dir
+
+# 分析逻辑变化时递增，旧版本的缓存结果自动失效
+ANALYSIS_VERSION = 3
+
+# 分析结果中缓存的字段
+ANALYSIS_FIELDS = (
+    "word_count",
+    "paragraph_count",
+    "character_count",
+    "title",
+    "author",
+    "image_count",
+    "image_bytes",
+    "signature",
+    "error",
+)
+
+# 累计多少条写入后提交一次
+COMMIT_INTERVAL = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analysis (
+    content_hash TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    word_count INTEGER,
+    paragraph_count INTEGER,
+    character_count INTEGER,
+    title TEXT,
+    author TEXT,
+    image_count INTEGER,
+    image_bytes INTEGER,
+    signature BLOB,
+    error TEXT,
+    updated REAL NOT NULL
+);
+"""
+
+
+class AnalysisCache:
+    """单文件分析结果缓存，可在多个线程中共用"""
+
+    def __init__(self, db_path=None):
+        """
+        初始化分析缓存
+
+        参数:
+            db_path: 数据库文件路径，默认使用用户缓存目录下的analysis.sqlite3
+        """
+        self.db_path = db_path or os.path.join(get_cache_dir(), "analysis.sqlite3")
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.DatabaseError:
+            pass
+        self._conn.executescript(SCHEMA)
+        # 旧版本数据库缺少的列（旧结果因版本号不同不会被使用）
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(analysis)")}
+        for field in ANALYSIS_FIELDS:
+            if field not in columns:
+                self._conn.execute(f"ALTER TABLE analysis ADD COLUMN {field}")
+        self._conn.commit()
+        # lookup未命中时记录的 (大小, 修改时间, 哈希)，供put复用
+        self._pending = {}
+        self._uncommitted = 0
+
+    def lookup(self, input_file, hash_changed=True):
+        """
+        查找文件的分析结果
+
+        参数:
+            input_file: 文件路径
+            hash_changed: 文件大小或修改时间与记录不符时，是否计算内容哈希继续查找；
+                          为False时直接返回None，不读取文件内容
+
+        返回:
+            dict: 分析结果，未缓存时返回None
+        """
+        path = os.path.abspath(input_file)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, content_hash FROM files WHERE path = ?", (path,)
+            ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            digest = row[2]
+        elif not hash_changed:
+            return None
+        else:
+            # 文件信息变化，按内容哈希查找
+            digest = file_content_hash(path)
+        self._pending[path] = (stat.st_size, stat.st_mtime_ns, digest)
+
+        columns = ", ".join(ANALYSIS_FIELDS)
+        with self._lock:
+            result = self._conn.execute(
+                f"SELECT {columns} FROM analysis WHERE content_hash = ? AND version = ?",
+                (digest, ANALYSIS_VERSION)
+            ).fetchone()
+            if result is None:
+                return None
+            if not row or tuple(row) != (stat.st_size, stat.st_mtime_ns, digest):
+                self._write_file_row(path, stat.st_size, stat.st_mtime_ns, digest)
+        self._pending.pop(path, None)
+        return dict(zip(ANALYSIS_FIELDS, result))
+
+    def put(self, input_file, analysis):
+        """
+        保存文件的分析结果
+
+        参数:
+            input_file: 文件路径
+            analysis: 分析结果，包含ANALYSIS_FIELDS中的字段
+        """
+        path = os.path.abspath(input_file)
+        pending = self._pending.pop(path, None)
+        if pending is None:
+            stat = os.stat(path)
+            pending = (stat.st_size, stat.st_mtime_ns, file_content_hash(path))
+        size, mtime_ns, digest = pending
+
+        values = [analysis.get(field) for field in ANALYSIS_FIELDS]
+        with self._lock:
+            self._write_file_row(path, size, mtime_ns, digest)
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO analysis (content_hash, version, {', '.join(ANALYSIS_FIELDS)}, updated) "
+                f"VALUES (?, ?, {', '.join('?' for _ in ANALYSIS_FIELDS)}, ?)",
+                [digest, ANALYSIS_VERSION] + values + [time.time()]
+            )
+            self._uncommitted += 1
+            if self._uncommitted >= COMMIT_INTERVAL:
+                self._commit()
+
+    def _write_file_row(self, path, size, mtime_ns, digest):
+        """写入路径到哈希的映射（调用方持有锁）"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)",
+            (path, size, mtime_ns, digest)
+        )
+        self._uncommitted += 1
+
+    def _commit(self):
+        self._conn.commit()
+        self._uncommitted = 0
+
+    def flush(self):
+        """提交尚未写入磁盘的结果"""
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        """提交并关闭数据库"""
+        with self._lock:
+            self._commit()
+            self._conn.close()
+
+
+# 每个进程共享一个缓存对象
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_analysis_cache():
+    """
+    获取当前进程共享的分析缓存，数据库无法打开时返回None
+
+    返回:
+        AnalysisCache: 分析缓存
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = AnalysisCache()
+            except (sqlite3.Error, OSError):
+                return None
+        return _cache
+
+
+def get_file_analysis(input_file, cache=None):
+    """
+    获取单个文件的分析结果，优先使用缓存
+
+    参数:
+        input_file: Word文件路径
+        cache: 分析缓存，默认使用共享缓存
+
+    返回:
+        dict: 分析结果
+    """
+    from heading_utils import analyze_file
+    cache = cache or get_analysis_cache()
+    if cache is None:
+        return analyze_file(input_file)
+    analysis = cache.lookup(input_file)
+    if analysis is None:
+        analysis = analyze_file(input_file)
+        cache.put(input_file, analysis)
+    return analysis
+
+
+def iter_file_analyses(input_files, map_unordered, cache=None, costs=None):
+    """
+    获取一批文件的分析结果：先产出缓存命中的结果，未命中的文件交给并行执行器分析
+
+    参数:
+        input_files: 文件路径列表
+        map_unordered: 并行执行函数，签名同WorkerPool.map_unordered(func, items)，
+                       产出 (索引, 条目, 结果, 异常)
+        cache: 分析缓存，默认使用共享缓存
+        costs: 每个文件的估算处理开销（可选），未命中的文件按开销从大到小提交，
+               避免大文件最后才开始处理
+
+    返回:
+        生成器，依次产出 (原始索引, 文件路径, 分析结果, 是否来自缓存)；
+        分析过程异常时结果只包含error字段
+    """
+    from heading_utils import analyze_file
+    cache = cache or get_analysis_cache()
+
+    misses = []
+    for index, input_file in enumerate(input_files):
+        analysis = None
+        if cache is not None:
+            try:
+                analysis = cache.lookup(input_file)
+            except OSError:
+                analysis = None
+        if analysis is None:
+            misses.append(index)
+        else:
+            yield index, input_file, analysis, True
+
+    if costs is not None:
+        misses.sort(key=lambda i: costs[i], reverse=True)
+
+    try:
+        results = map_unordered(analyze_file, [input_files[i] for i in misses])
+        for position, input_file, analysis, error in results:
+            if error is not None:
+                # 执行器层面的异常（如工作进程崩溃）不写入缓存
+                analysis = dict.fromkeys(ANALYSIS_FIELDS)
+                analysis["error"] = str(error) or type(error).__name__
+            elif cache is not None:
+                try:
+                    cache.put(input_file, analysis)
+                except (OSError, sqlite3.Error):
+                    pass
+            yield misses[position], input_file, analysis, False
+    finally:
+        if cache is not None:
+            cache.flush()
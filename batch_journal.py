@@ -0,0 +1,230 @@
+"""
+提供可在崩溃后恢复的批处理日志
+
+批处理开始时写入批次配置和文件列表，之后每个文件开始和结束时各追加一条记录。
+记录只追加不修改，并按批量调用fsync，兼顾安全和速度。程序被关闭、崩溃或
+系统休眠后，可读取最后一个未完成的批次，跳过已完成的文件继续处理；
+处理到一半的文件会从头重新处理（输出文件以原子方式写入，不会留下半个文件）。
+"""
+import os
+import json
+import time
+import uuid
+import threading
+
+from file_utils import get_cache_dir
+
+# 当前批次日志文件名
+JOURNAL_NAME = "last_batch.jsonl"
+
+# 累计多少条记录或经过多少秒后调用一次fsync
+FSYNC_INTERVAL = 20
+FSYNC_SECONDS = 2.0
+
+# 记录类型
+RECORD_BATCH = "batch"
+RECORD_START = "start"
+RECORD_DONE = "done"
+RECORD_END = "end"
+
+
+def get_journal_path(journal_dir=None):
+    """获取批次日志文件路径"""
+    return os.path.join(journal_dir or get_cache_dir("journals"), JOURNAL_NAME)
+
+
+class BatchJournal:
+    """追加写入的批次日志"""
+
+    def __init__(self, path, batch_id):
+        """
+        打开批次日志（追加模式）
+
+        参数:
+            path: 日志文件路径
+            batch_id: 批次编号
+        """
+        self.path = path
+        self.batch_id = batch_id
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        # 崩溃时最后一行可能不完整，先换行避免与新记录连在一起
+        if self._file.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @classmethod
+    def create(cls, config, files, journal_dir=None):
+        """
+        开始一个新批次，覆盖上一个批次的日志
+
+        参数:
+            config: 批次配置（可JSON序列化的字典）
+            files: 本批次要处理的文件名列表
+            journal_dir: 日志目录，默认使用用户缓存目录
+
+        返回:
+            BatchJournal: 批次日志
+        """
+        path = get_journal_path(journal_dir)
+        batch_id = uuid.uuid4().hex
+        header = {
+            "type": RECORD_BATCH,
+            "id": batch_id,
+            "time": time.time(),
+            "config": config,
+            "files": list(files),
+        }
+        # 先写入临时文件再替换，保证日志文件始终以完整的批次头开始
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        return cls(path, batch_id)
+
+    @classmethod
+    def resume(cls, state):
+        """
+        继续向未完成批次的日志追加记录
+
+        参数:
+            state: load_last_batch返回的批次状态
+
+        返回:
+            BatchJournal: 批次日志
+        """
+        return cls(state.path, state.batch_id)
+
+    def _append(self, record, sync=False):
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self._unsynced += 1
+            if sync or self._unsynced >= FSYNC_INTERVAL or time.monotonic() - self._last_sync >= FSYNC_SECONDS:
+                self._sync()
+
+    def _sync(self):
+        """将已写入的记录同步到磁盘（调用方持有锁）"""
+        try:
+            os.fsync(self._file.fileno())
+        except OSError:
+            pass
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def mark_started(self, filename):
+        """记录文件开始处理"""
+        self._append({"type": RECORD_START, "file": filename})
+
+    def mark_done(self, filename, success, outputs=None, error=None):
+        """
+        记录文件处理完成
+
+        参数:
+            filename: 文件名
+            success: 是否成功
+            outputs: 生成的输出文件
+            error: 错误信息
+        """
+        self._append({
+            "type": RECORD_DONE,
+            "file": filename,
+            "success": bool(success),
+            "outputs": list(outputs or []),
+            "error": error,
+        })
+
+    def finish(self):
+        """记录批次正常结束并关闭日志"""
+        self._append({"type": RECORD_END, "time": time.time()}, sync=True)
+        self.close()
+
+    def close(self):
+        """同步并关闭日志，不标记结束（之后仍可恢复）"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.flush()
+            self._sync()
+            self._file.close()
+            self._file = None
+
+
+class BatchState:
+    """从日志中恢复的批次状态"""
+
+    def __init__(self, path, batch_id, config, files):
+        self.path = path
+        self.batch_id = batch_id
+        self.config = config
+        self.files = files
+        # 文件名 -> 最后一条完成记录
+        self.completed = {}
+        # 已开始但未完成的文件
+        self.in_flight = set()
+        self.finished = False
+
+    def succeeded_files(self):
+        """已成功处理的文件名集合"""
+        return {name for name, record in self.completed.items() if record.get("success")}
+
+    def remaining_files(self):
+        """
+        需要继续处理的文件（未开始、处理中断或失败的文件），保持原有顺序
+
+        返回:
+            list: 文件名列表
+        """
+        succeeded = self.succeeded_files()
+        return [name for name in self.files if name not in succeeded]
+
+
+def load_last_batch(journal_dir=None, include_finished=False):
+    """
+    读取最后一个批次的状态
+
+    参数:
+        journal_dir: 日志目录，默认使用用户缓存目录
+        include_finished: 是否返回已正常结束的批次
+
+    返回:
+        BatchState: 批次状态；没有日志、日志损坏或批次已结束时返回None
+    """
+    path = get_journal_path(journal_dir)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    state = None
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # 崩溃时最后一行可能只写了一半
+            continue
+        record_type = record.get("type")
+        if record_type == RECORD_BATCH:
+            state = BatchState(path, record.get("id"), record.get("config", {}), record.get("files", []))
+        elif state is None:
+            continue
+        elif record_type == RECORD_START:
+            state.in_flight.add(record.get("file"))
+        elif record_type == RECORD_DONE:
+            state.in_flight.discard(record.get("file"))
+            state.completed[record.get("file")] = record
+        elif record_type == RECORD_END:
+            state.finished = True
+
+    if state is None or (state.finished and not include_finished):
+        return None
+    return state
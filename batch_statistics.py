@@ -0,0 +1,233 @@
+"""
+提供批量文档的列式统计
+
+每个文件的字数、段落数、字符数以及作者和班级（所在子文件夹）编号按列保存在
+紧凑的数组中，统计时一次性计算平均值、百分位数、直方图以及按作者、按班级的汇总。
+安装了NumPy时使用向量化计算，十万行数据也只需几十毫秒；未安装时使用等价的纯Python实现。
+"""
+import os
+import math
+from array import array
+from bisect import bisect_right
+
+# 检查是否安装了numpy库
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# 统计的百分位数
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# 字数分布直方图的区间数
+HISTOGRAM_BINS = 10
+
+# 不在子文件夹中的文件所属的班级名称
+ROOT_CLASS = "（根目录）"
+
+
+def _percentile(sorted_values, percent):
+    """线性插值计算百分位数，与numpy.percentile的默认方法一致"""
+    if not sorted_values:
+        return 0
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class BatchStatistics:
+    """一批文档的字数统计"""
+
+    def __init__(self, min_words):
+        """
+        参数:
+            min_words: 最小字数要求
+        """
+        self.min_words = min_words
+        self.word_counts = array('q')
+        self.paragraph_counts = array('q')
+        self.character_counts = array('q')
+        self.author_codes = array('q')
+        self.class_codes = array('q')
+        self.authors = []
+        self.classes = []
+        self._author_index = {}
+        self._class_index = {}
+
+    def add(self, name, author, word_count, paragraph_count, character_count):
+        """
+        添加一个文件的统计数据
+
+        参数:
+            name: 相对于输入文件夹的文件名，所在子文件夹作为班级
+            author: 作者名
+            word_count: 字数
+            paragraph_count: 段落数
+            character_count: 字符数
+        """
+        self.word_counts.append(word_count or 0)
+        self.paragraph_counts.append(paragraph_count or 0)
+        self.character_counts.append(character_count or 0)
+        self.author_codes.append(self._code(self._author_index, self.authors, author or "未知"))
+        self.class_codes.append(self._code(self._class_index, self.classes, os.path.dirname(name) or ROOT_CLASS))
+
+    @staticmethod
+    def _code(index, names, name):
+        code = index.get(name)
+        if code is None:
+            code = index[name] = len(names)
+            names.append(name)
+        return code
+
+    def __len__(self):
+        return len(self.word_counts)
+
+    def summary(self):
+        """
+        计算字数的汇总统计
+
+        返回:
+            dict: count、total、mean、std、min、max、low_count、pass_rate，以及各百分位数（键为 p10 等）
+        """
+        count = len(self)
+        result = {"count": count, "total": 0, "mean": 0.0, "std": 0.0, "min": 0, "max": 0,
+                  "low_count": 0, "pass_rate": 0.0}
+        result.update({f"p{p}": 0 for p in PERCENTILES})
+        if not count:
+            return result
+
+        if NUMPY_AVAILABLE:
+            words = np.frombuffer(self.word_counts, dtype=np.int64)
+            low_count = int(np.count_nonzero(words < self.min_words))
+            result.update(
+                total=int(words.sum()), mean=float(words.mean()), std=float(words.std()),
+                min=int(words.min()), max=int(words.max()), low_count=low_count,
+            )
+            for p, value in zip(PERCENTILES, np.percentile(words, PERCENTILES)):
+                result[f"p{p}"] = float(value)
+        else:
+            words = sorted(self.word_counts)
+            total = sum(words)
+            mean = total / count
+            low_count = sum(1 for w in words if w < self.min_words)
+            result.update(
+                total=total, mean=mean, std=math.sqrt(sum((w - mean) ** 2 for w in words) / count),
+                min=words[0], max=words[-1], low_count=low_count,
+            )
+            for p in PERCENTILES:
+                result[f"p{p}"] = float(_percentile(words, p))
+        result["pass_rate"] = 1 - low_count / count
+        return result
+
+    def histogram(self, bins=HISTOGRAM_BINS):
+        """
+        计算字数分布直方图（等宽区间）
+
+        参数:
+            bins: 区间数
+
+        返回:
+            list: (区间下限, 区间上限, 文件数) 列表，最后一个区间包含上限
+        """
+        if not len(self):
+            return []
+        low, high = min(self.word_counts), max(self.word_counts)
+        if low == high:
+            return [(low, high, len(self))]
+        width = (high - low) / bins
+        edges = [round(low + width * i) for i in range(bins)] + [high]
+
+        if NUMPY_AVAILABLE:
+            words = np.frombuffer(self.word_counts, dtype=np.int64)
+            counts = np.histogram(words, bins=np.array(edges, dtype=np.float64))[0].tolist()
+        else:
+            counts = [0] * bins
+            for w in self.word_counts:
+                # 与numpy.histogram一致：左闭右开，最后一个区间包含上限
+                counts[min(bisect_right(edges, w) - 1, bins - 1)] += 1
+        return [(edges[i], edges[i + 1], counts[i]) for i in range(bins)]
+
+    def group_aggregates(self, by="author"):
+        """
+        按作者或班级汇总
+
+        参数:
+            by: "author" 或 "class"
+
+        返回:
+            list: (名称, 文件数, 总字数, 平均字数, 最少字数, 最多字数, 字数不足文件数) 列表，按首次出现的顺序
+        """
+        names = self.authors if by == "author" else self.classes
+        codes = self.author_codes if by == "author" else self.class_codes
+        groups = len(names)
+        if not groups:
+            return []
+
+        if NUMPY_AVAILABLE:
+            codes = np.frombuffer(codes, dtype=np.int64)
+            words = np.frombuffer(self.word_counts, dtype=np.int64)
+            counts = np.bincount(codes, minlength=groups)
+            totals = np.bincount(codes, weights=words, minlength=groups)
+            lows = np.bincount(codes, weights=words < self.min_words, minlength=groups)
+            minimums = np.full(groups, np.iinfo(np.int64).max, dtype=np.int64)
+            maximums = np.full(groups, np.iinfo(np.int64).min, dtype=np.int64)
+            np.minimum.at(minimums, codes, words)
+            np.maximum.at(maximums, codes, words)
+            columns = zip(counts.tolist(), totals.tolist(), minimums.tolist(), maximums.tolist(), lows.tolist())
+        else:
+            counts = [0] * groups
+            totals = [0] * groups
+            lows = [0] * groups
+            minimums = [None] * groups
+            maximums = [None] * groups
+            for code, w in zip(codes, self.word_counts):
+                counts[code] += 1
+                totals[code] += w
+                if w < self.min_words:
+                    lows[code] += 1
+                if minimums[code] is None or w < minimums[code]:
+                    minimums[code] = w
+                if maximums[code] is None or w > maximums[code]:
+                    maximums[code] = w
+            columns = zip(counts, totals, minimums, maximums, lows)
+
+        return [
+            (name, count, int(total), round(total / count, 1), minimum, maximum, int(low))
+            for name, (count, total, minimum, maximum, low) in zip(names, columns)
+        ]
+
+    def write_sheets(self, report):
+        """
+        向报告中添加字数分布、百分位数以及按作者、按班级汇总的工作表
+
+        参数:
+            report: 报告输出（支持add_sheet）
+        """
+        from excel_report import STYLE_PERCENT
+
+        count = len(self)
+        if not count:
+            return
+
+        histogram_sheet = report.add_sheet("字数分布", ["区间下限", "区间上限", "文件数", "占比"],
+                                           column_styles={3: STYLE_PERCENT})
+        for low, high, files in self.histogram():
+            histogram_sheet.append([low, high, files, files / count])
+
+        summary = self.summary()
+        percentile_sheet = report.add_sheet("百分位数", ["百分位", "字数"])
+        for p in PERCENTILES:
+            percentile_sheet.append([f"{p}%", round(summary[f"p{p}"], 1)])
+
+        headers = ["文件数", "总字数", "平均字数", "最少字数", "最多字数", "字数不足文件数"]
+        author_sheet = report.add_sheet("作者统计", ["作者"] + headers)
+        for row in self.group_aggregates("author"):
+            author_sheet.append(row)
+
+        # 只有按子文件夹（班级）组织的文件才需要班级统计
+        if len(self.classes) > 1:
+            class_sheet = report.add_sheet("班级统计", ["班级"] + headers)
+            for row in self.group_aggregates("class"):
+                class_sheet.append(row)
@@ -23,6 +23,7 @@ PyInstaller.__main__.run([
     '--uac-admin',                     # 请求管理员权限
     '--hidden-import=docx',            # 添加隐藏导入
     '--hidden-import=docx2python',
+    '--collect-submodules=gui',        # 处理器等模块延迟导入，需显式收集
     '--version-file=file_version_info.txt',  # 添加版本信息
 ])
 
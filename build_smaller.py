@@ -22,6 +22,8 @@ PyInstaller.__main__.run([
     # Only collect specific modules that are needed
     '--collect-submodules=docx',
     '--collect-submodules=docx2python',
+    # 处理器等模块延迟导入，需显式收集
+    '--collect-submodules=gui',
     '--collect-submodules=win32com',
     '--collect-submodules=pythoncom',
 ])
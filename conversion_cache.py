@@ -0,0 +1,235 @@
+"""
+提供按内容寻址的.doc转.docx转换缓存
+
+以源文件内容的SHA-256哈希为键保存转换结果，格式转换、图片提取、标题提取和
+字数统计共用同一份缓存：同一个.doc文件每批最多转换一次，缓存目录跨运行保留。
+多个线程或工作进程同时请求同一文件时，只有一个会执行转换，其余等待结果。
+"""
+import os
+import time
+import threading
+
+from file_utils import file_content_hash, get_cache_dir
+
+# 缓存总大小上限，超过后按最近使用时间清理
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# 其他进程转换同一文件时的最长等待时间（秒），超过后视为锁已失效
+LOCK_TIMEOUT = 600
+
+
+class ConversionCache:
+    """.doc转换结果缓存"""
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        初始化转换缓存
+
+        参数:
+            cache_dir: 缓存目录，默认使用用户缓存目录下的conversions
+            max_bytes: 缓存总大小上限
+        """
+        self.cache_dir = cache_dir or get_cache_dir("conversions")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        # (路径, 大小, 修改时间) -> 内容哈希，避免同一批次内重复计算
+        self._hashes = {}
+
+    def content_hash(self, input_file):
+        """
+        获取文件内容哈希，文件未变化时使用已计算的结果
+
+        参数:
+            input_file: 文件路径
+
+        返回:
+            str: 十六进制哈希值
+        """
+        stat = os.stat(input_file)
+        key = (os.path.abspath(input_file), stat.st_size, stat.st_mtime_ns)
+        digest = self._hashes.get(key)
+        if digest is None:
+            digest = file_content_hash(input_file)
+            self._hashes[key] = digest
+        return digest
+
+    def path_for(self, digest):
+        """获取哈希对应的缓存文件路径"""
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.docx")
+
+    def lookup(self, input_file):
+        """
+        查找已缓存的转换结果
+
+        参数:
+            input_file: .doc文件路径
+
+        返回:
+            str: 缓存的.docx路径，未缓存时返回None
+        """
+        path = self.path_for(self.content_hash(input_file))
+        if os.path.exists(path):
+            self._touch(path)
+            return path
+        return None
+
+    def _key_lock(self, digest):
+        with self._lock:
+            lock = self._key_locks.get(digest)
+            if lock is None:
+                lock = self._key_locks[digest] = threading.Lock()
+            return lock
+
+    def get_docx(self, input_file, convert=None):
+        """
+        获取.doc文件对应的.docx，未缓存时转换并存入缓存
+
+        参数:
+            input_file: .doc文件路径
+            convert: 转换函数 convert(input_file, output_file)，默认使用共享转换池
+
+        返回:
+            str: 缓存的.docx路径（只读，调用方不得修改或删除）
+        """
+        if convert is None:
+            from doc_converters import convert_doc_to_docx as convert
+
+        digest = self.content_hash(input_file)
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            self._touch(path)
+            return path
+
+        # 线程锁保证进程内只转换一次，锁文件保证多个工作进程之间只转换一次
+        with self._key_lock(digest):
+            if os.path.exists(path):
+                return path
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            lock_path = path + ".lock"
+            if not self._acquire_file_lock(lock_path, path):
+                return path
+            try:
+                temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.docx"
+                try:
+                    convert(input_file, temp_path)
+                    os.replace(temp_path, path)
+                finally:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+            finally:
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    pass
+        return path
+
+    def _acquire_file_lock(self, lock_path, path):
+        """
+        获取跨进程锁文件
+
+        返回:
+            bool: 获得锁时返回True；等待期间其他进程已生成结果时返回False
+        """
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                return True
+            except FileExistsError:
+                pass
+            if os.path.exists(path):
+                return False
+            # 锁文件过旧（进程异常退出）时清除
+            try:
+                if time.time() - os.path.getmtime(lock_path) > LOCK_TIMEOUT:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"等待转换结果超时: {path}")
+            time.sleep(0.2)
+
+    @staticmethod
+    def _touch(path):
+        """更新缓存文件的修改时间，用于按最近使用清理"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def prune(self, max_bytes=None):
+        """
+        清理最久未使用的缓存文件，使总大小不超过上限
+
+        参数:
+            max_bytes: 大小上限，默认使用初始化时的设置
+
+        返回:
+            int: 删除的文件数
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".docx") or name.endswith(".tmp.docx"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+# 每个进程共享一个缓存对象
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_conversion_cache():
+    """
+    获取当前进程共享的转换缓存，首次获取时清理超出上限的旧缓存
+
+    返回:
+        ConversionCache: 转换缓存
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ConversionCache()
+            try:
+                _cache.prune()
+            except OSError:
+                pass
+        return _cache
+
+
+def get_cached_docx(input_file):
+    """
+    获取.doc文件转换后的.docx路径，使用共享缓存
+
+    参数:
+        input_file: .doc文件路径
+
+    返回:
+        str: 缓存的.docx路径
+    """
+    return get_conversion_cache().get_docx(input_file)
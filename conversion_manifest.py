@@ -0,0 +1,202 @@
+"""
+提供增量转换所需的转换清单
+
+清单保存在输出目录中，记录每个源文件的内容哈希、转换配置哈希（格式、后缀、
+作者信息、图片模式等）和生成的输出文件。再次转换时，内容和配置都未变化且输出
+文件仍然存在的源文件会被跳过，只重新生成新增或修改的文件。
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+
+from file_utils import file_content_hash
+
+# 清单文件名
+MANIFEST_NAME = ".conversion_manifest.json"
+
+# 清单格式或转换逻辑变化时递增，旧清单中的记录全部失效
+MANIFEST_VERSION = 1
+
+# 累计多少条新记录后写入一次磁盘
+SAVE_INTERVAL = 20
+
+
+def conversion_config_hash(use_chinese_format, suffix_enabled, suffix_text,
+                           show_author_info, keep_image_position, mark_low_wordcount=False):
+    """
+    计算影响转换输出的配置的哈希
+
+    参数:
+        use_chinese_format: 是否使用中文格式
+        suffix_enabled: 是否启用标题后缀
+        suffix_text: 标题后缀内容
+        show_author_info: 是否显示作者信息
+        keep_image_position: 是否保持图片位置
+        mark_low_wordcount: 是否标记低字数文档
+
+    返回:
+        str: 十六进制哈希值
+    """
+    config = {
+        "version": MANIFEST_VERSION,
+        "use_chinese_format": bool(use_chinese_format),
+        "suffix": suffix_text if suffix_enabled else None,
+        "show_author_info": bool(show_author_info),
+        "keep_image_position": bool(keep_image_position),
+        "mark_low_wordcount": bool(mark_low_wordcount),
+    }
+    data = json.dumps(config, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class ConversionManifest:
+    """输出目录的转换清单"""
+
+    def __init__(self, output_dir):
+        """
+        加载输出目录中的转换清单
+
+        参数:
+            output_dir: 转换输出目录
+        """
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self._dirty = 0
+        # 源文件名 -> {size, mtime_ns, input_hash, config_hash, outputs}
+        self.sources = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.sources = data.get("sources", {})
+
+    def _input_hash(self, input_file, entry):
+        """获取源文件内容哈希，大小和修改时间未变时使用清单中的记录"""
+        stat = os.stat(input_file)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry["input_hash"], stat
+        return file_content_hash(input_file), stat
+
+    def check(self, input_file, config_hash, name=None):
+        """
+        检查源文件的输出是否为最新
+
+        参数:
+            input_file: 源文件路径
+            config_hash: 转换配置哈希
+            name: 源文件相对于输入文件夹的名称，默认为文件名
+
+        返回:
+            list: 输出为最新时返回输出文件路径列表，否则返回None
+        """
+        name = name or os.path.basename(input_file)
+        with self._lock:
+            entry = self.sources.get(name)
+        if not entry or entry.get("config_hash") != config_hash or not entry.get("outputs"):
+            return None
+        input_hash, stat = self._input_hash(input_file, entry)
+        if input_hash != entry["input_hash"]:
+            return None
+        outputs = [os.path.join(self.output_dir, p) for p in entry["outputs"]]
+        if not all(os.path.exists(p) for p in outputs):
+            return None
+        # 仅修改时间变化（内容未变）时更新记录，下次无需重新计算哈希
+        if entry.get("mtime_ns") != stat.st_mtime_ns:
+            with self._lock:
+                entry["size"] = stat.st_size
+                entry["mtime_ns"] = stat.st_mtime_ns
+                self._dirty += 1
+        return outputs
+
+    def status(self, input_file, name=None):
+        """
+        获取源文件的转换状态（不考虑转换配置）
+
+        参数:
+            input_file: 源文件路径
+            name: 源文件相对于输入文件夹的名称，默认为文件名
+
+        返回:
+            tuple: (状态, 输出文件路径列表)，状态为"已转换"、"已过期"（源文件已修改或输出缺失）或"未转换"
+        """
+        name = name or os.path.basename(input_file)
+        with self._lock:
+            entry = self.sources.get(name)
+        if not entry or not entry.get("outputs"):
+            return "未转换", []
+        outputs = [os.path.join(self.output_dir, p) for p in entry["outputs"]]
+        try:
+            input_hash, _ = self._input_hash(input_file, entry)
+        except OSError:
+            return "已过期", outputs
+        if input_hash != entry["input_hash"] or not all(os.path.exists(p) for p in outputs):
+            return "已过期", outputs
+        return "已转换", outputs
+
+    def record(self, input_file, config_hash, outputs, name=None):
+        """
+        记录源文件的转换结果，同一源文件旧的输出文件若不再使用则删除
+
+        参数:
+            input_file: 源文件路径
+            config_hash: 转换配置哈希
+            outputs: 生成的输出文件路径列表
+            name: 源文件相对于输入文件夹的名称，默认为文件名
+        """
+        name = name or os.path.basename(input_file)
+        with self._lock:
+            previous = self.sources.get(name)
+        input_hash, stat = self._input_hash(input_file, previous)
+        relative = [os.path.relpath(p, self.output_dir) for p in outputs]
+
+        with self._lock:
+            self.sources[name] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "input_hash": input_hash,
+                "config_hash": config_hash,
+                "outputs": relative,
+                "time": time.time(),
+            }
+            self._dirty += 1
+            save = self._dirty >= SAVE_INTERVAL
+
+        # 标题或配置变化后输出文件名可能改变，删除过时的旧输出
+        if previous:
+            for old in set(previous.get("outputs", [])) - set(relative):
+                if not self._is_referenced(old):
+                    try:
+                        os.remove(os.path.join(self.output_dir, old))
+                    except OSError:
+                        pass
+        if save:
+            self.save()
+
+    def _is_referenced(self, relative_path):
+        with self._lock:
+            return any(relative_path in entry.get("outputs", []) for entry in self.sources.values())
+
+    def save(self):
+        """原子地写入清单文件"""
+        with self._lock:
+            data = {"version": MANIFEST_VERSION, "sources": dict(self.sources)}
+            self._dirty = 0
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError:
+            if os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
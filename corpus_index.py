@@ -0,0 +1,541 @@
+"""
+提供跨年度的持久化征文语料库索引
+
+每篇收录的文档按字符片段哈希抽样（只保留哈希值能被SAMPLE_MODULUS整除的片段，
+抽样后仍可估计包含度），以 (片段哈希 << 32 | 文档编号) 的64位整数保存在已排序的
+段文件中。查询时对段文件进行内存映射并二分查找，无需把索引读入内存，
+即使收录了几十万篇文档，单篇比对也只需几毫秒。
+
+新收录的文档先保存在内存中，累计到一定数量后写成一个新的小段文件；
+段文件过多时合并最小的段（追加 + 合并压缩），segments.json 记录当前有效的段文件，
+以原子方式替换，合并中断不会造成重复或丢失。写入时持有跨进程锁文件，
+并先读入其他进程新写入的文档和段文件，多个进程可以共用同一个索引目录。
+"""
+import os
+import json
+import time
+import atexit
+import mmap
+import heapq
+import bisect
+import shutil
+import threading
+from array import array
+from contextlib import contextmanager
+
+from file_utils import get_cache_dir, file_content_hash
+from similarity import normalize_text, text_shingles
+
+# 片段抽样模数，越大索引越小、估计越粗
+SAMPLE_MODULUS = 16
+
+# 抽样后少于该数量片段的文档不收录也不比对
+MIN_SAMPLED_SHINGLES = 5
+
+# 出现在超过该数量文档中的片段视为常用语，比对时忽略
+MAX_POSTINGS = 1000
+
+# 默认的包含度阈值：新文档中有多大比例的片段出现在某篇已收录文档中
+CONTAINMENT_THRESHOLD = 0.4
+
+# 内存中累计多少条记录后写成一个段文件
+FLUSH_ENTRIES = 200000
+
+# 段文件数量上限，超过后合并最小的段
+MAX_SEGMENTS = 8
+
+SEGMENTS_NAME = "segments.json"
+DOCUMENTS_NAME = "documents.jsonl"
+LOCK_NAME = "corpus.lock"
+
+# 等待其他进程释放锁文件的最长时间（秒），超过该时间的锁文件视为异常退出遗留
+LOCK_TIMEOUT = 60
+
+# 段文件合并时每次写出的记录数
+_WRITE_CHUNK = 65536
+_DOC_MASK = 0xFFFFFFFF
+
+
+def sampled_shingles(text):
+    """
+    计算文本抽样后的片段哈希
+
+    参数:
+        text: 文档正文
+
+    返回:
+        list: 排序后的片段哈希列表
+    """
+    return sorted(h for h in text_shingles(normalize_text(text)) if h % SAMPLE_MODULUS == 0)
+
+
+class _Segment:
+    """一个内存映射的已排序段文件"""
+
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self._file = None
+        self._map = None
+        self.keys = ()
+        if self.size:
+            self._file = open(path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.keys = memoryview(self._map).cast("Q")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def postings(self, shingle):
+        """返回包含该片段的文档编号所在的区间"""
+        keys = self.keys
+        lo = bisect.bisect_left(keys, shingle << 32)
+        hi = bisect.bisect_left(keys, (shingle + 1) << 32, lo)
+        return lo, hi
+
+    def close(self):
+        if isinstance(self.keys, memoryview):
+            self.keys.release()
+        self.keys = ()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _write_keys(path, keys):
+    """将已排序的64位整数序列写入段文件（先写临时文件再替换）"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        buffer = array("Q")
+        for key in keys:
+            buffer.append(key)
+            if len(buffer) >= _WRITE_CHUNK:
+                buffer.tofile(f)
+                buffer = array("Q")
+        buffer.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class CorpusIndex:
+    """跨年度的征文语料库索引，可在多个线程中共用"""
+
+    def __init__(self, index_dir=None):
+        """
+        打开语料库索引，目录不存在时创建
+
+        参数:
+            index_dir: 索引目录，默认使用用户缓存目录下的corpus
+        """
+        self.index_dir = index_dir or get_cache_dir("corpus")
+        os.makedirs(self.index_dir, exist_ok=True)
+        self._lock = threading.RLock()
+        # 文档编号 -> 文档信息
+        self.documents = []
+        self._hashes = {}
+        # documents.jsonl中已读入的字节数
+        self._documents_offset = 0
+        self._next_segment = 0
+        self.segments = []
+        # 尚未写入段文件的记录：片段哈希 -> 文档编号列表
+        self._pending = {}
+        self._pending_count = 0
+        self._pending_documents = []
+        # 读入文档和段文件
+        with self._file_lock():
+            self._remove_unused_files()
+
+    def _load_documents(self):
+        """读入documents.jsonl中尚未读入的文档信息"""
+        path = os.path.join(self.index_dir, DOCUMENTS_NAME)
+        try:
+            with open(path, "rb") as f:
+                f.seek(self._documents_offset)
+                for line in f:
+                    self._documents_offset += len(line)
+                    try:
+                        document = json.loads(line)
+                    except ValueError:
+                        # 崩溃时最后一行可能只写了一半
+                        continue
+                    if document.get("id") != len(self.documents):
+                        continue
+                    self.documents.append(document)
+                    self._hashes.setdefault(document.get("hash"), document["id"])
+        except OSError:
+            pass
+
+    def _read_segment_names(self):
+        """读取segments.json中记录的段文件名，并更新下一个段文件的编号"""
+        try:
+            with open(os.path.join(self.index_dir, SEGMENTS_NAME), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return []
+        self._next_segment = max(self._next_segment, data.get("next", 0))
+        return data.get("segments", [])
+
+    def _remove_unused_files(self):
+        """删除合并中断留下的无效文件（调用方持有锁文件）"""
+        names = {os.path.basename(segment.path) for segment in self.segments}
+        for name in os.listdir(self.index_dir):
+            if name.endswith((".idx", ".tmp")) and name not in names:
+                try:
+                    os.remove(os.path.join(self.index_dir, name))
+                except OSError:
+                    pass
+
+    def _save_segments(self):
+        """原子地记录当前有效的段文件（调用方持有锁和锁文件）"""
+        path = os.path.join(self.index_dir, SEGMENTS_NAME)
+        temp_path = path + ".tmp"
+        data = {
+            "segments": [os.path.basename(segment.path) for segment in self.segments],
+            "next": self._next_segment,
+        }
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+    @contextmanager
+    def _file_lock(self):
+        """持有跨进程锁文件，并读入其他进程在此期间写入的文档和段文件"""
+        lock_path = os.path.join(self.index_dir, LOCK_NAME)
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                break
+            except FileExistsError:
+                pass
+            # 锁文件过旧（进程异常退出）时清除
+            try:
+                if time.time() - os.path.getmtime(lock_path) > LOCK_TIMEOUT:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"等待语料库锁文件超时: {lock_path}")
+            time.sleep(0.2)
+        try:
+            self._sync()
+            yield
+        finally:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+
+    def _sync(self):
+        """读入其他进程新写入的文档和段文件（调用方持有锁和锁文件）"""
+        base = len(self.documents)
+        self._load_documents()
+        shift = len(self.documents) - base
+        if shift:
+            # 其他进程占用了这些编号，内存中的新文档顺延
+            for document in self._pending_documents:
+                document["id"] += shift
+                if document.get("hash") is not None:
+                    self._hashes[document["hash"]] = document["id"]
+            for document_ids in self._pending.values():
+                document_ids[:] = [document_id + shift for document_id in document_ids]
+
+        names = self._read_segment_names()
+        opened = {os.path.basename(segment.path): segment for segment in self.segments}
+        segments = []
+        for name in names:
+            segment = opened.pop(name, None)
+            if segment is None:
+                try:
+                    segment = _Segment(os.path.join(self.index_dir, name))
+                except OSError:
+                    continue
+            segments.append(segment)
+        # 其他进程已合并掉的段文件
+        for segment in opened.values():
+            segment.close()
+        self.segments = segments
+
+    def _new_segment_path(self):
+        path = os.path.join(self.index_dir, f"segment_{self._next_segment:06d}.idx")
+        self._next_segment += 1
+        return path
+
+    def find_similar(self, text=None, shingles=None, threshold=CONTAINMENT_THRESHOLD, limit=5,
+                     exclude=None):
+        """
+        查找与文本相似的已收录文档
+
+        参数:
+            text: 文档正文
+            shingles: 已计算的sampled_shingles结果（可选，替代text）
+            threshold: 包含度阈值
+            limit: 最多返回的文档数
+            exclude: (名称, 内容哈希)，忽略名称和内容都相同的已收录文档（即文档自身）
+
+        返回:
+            list: (文档信息, 包含度) 列表，按包含度从高到低排列
+        """
+        if shingles is None:
+            shingles = sampled_shingles(text)
+        if len(shingles) < MIN_SAMPLED_SHINGLES:
+            return []
+
+        counts = {}
+        with self._lock:
+            for shingle in shingles:
+                ranges = [(segment, segment.postings(shingle)) for segment in self.segments]
+                pending = self._pending.get(shingle, ())
+                if sum(hi - lo for _, (lo, hi) in ranges) + len(pending) > MAX_POSTINGS:
+                    continue
+                for segment, (lo, hi) in ranges:
+                    keys = segment.keys
+                    for i in range(lo, hi):
+                        document_id = keys[i] & _DOC_MASK
+                        counts[document_id] = counts.get(document_id, 0) + 1
+                for document_id in pending:
+                    counts[document_id] = counts.get(document_id, 0) + 1
+
+            total = len(shingles)
+            matches = []
+            for document_id, count in counts.items():
+                containment = count / total
+                document = self._document(document_id)
+                if containment < threshold or document is None:
+                    continue
+                if exclude is not None and (document.get("name"), document.get("hash")) == tuple(exclude):
+                    continue
+                matches.append((document, containment))
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches[:limit]
+
+    def _document(self, document_id):
+        """按编号获取文档信息（调用方持有锁）"""
+        if document_id < len(self.documents):
+            return self.documents[document_id]
+        document_id -= len(self.documents)
+        if document_id < len(self._pending_documents):
+            return self._pending_documents[document_id]
+        return None
+
+    def add_document(self, text=None, name="", content_hash=None, year=None, shingles=None):
+        """
+        收录一篇文档，内容相同的文档只收录一次
+
+        参数:
+            text: 文档正文
+            name: 文档名称（如源文件名）
+            content_hash: 源文件内容哈希，用于去重
+            year: 所属年份，默认为当前年份
+            shingles: 已计算的sampled_shingles结果（可选，替代text）
+
+        返回:
+            int: 文档编号；已收录或正文过短时返回None
+        """
+        if shingles is None:
+            shingles = sampled_shingles(text)
+        if len(shingles) < MIN_SAMPLED_SHINGLES:
+            return None
+        with self._lock:
+            if content_hash is not None and content_hash in self._hashes:
+                return None
+            document_id = len(self.documents) + len(self._pending_documents)
+            self._pending_documents.append({
+                "id": document_id,
+                "name": name,
+                "hash": content_hash,
+                "year": year or time.localtime().tm_year,
+                "shingles": len(shingles),
+            })
+            if content_hash is not None:
+                self._hashes[content_hash] = document_id
+            for shingle in shingles:
+                self._pending.setdefault(shingle, []).append(document_id)
+            self._pending_count += len(shingles)
+            if self._pending_count >= FLUSH_ENTRIES:
+                self.flush()
+        return document_id
+
+    def flush(self):
+        """将内存中的新文档写成一个段文件，段文件过多时合并"""
+        with self._lock:
+            if not self._pending_documents:
+                return
+            with self._file_lock():
+                self._flush()
+
+    def _flush(self):
+        """flush的实现（调用方持有锁和锁文件）"""
+        # 先追加文档信息，再写入段文件，中断时不会出现没有文档信息的记录
+        data = "".join(json.dumps(document, ensure_ascii=False) + "\n"
+                       for document in self._pending_documents).encode("utf-8")
+        with open(os.path.join(self.index_dir, DOCUMENTS_NAME), "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._documents_offset += len(data)
+        self.documents.extend(self._pending_documents)
+        self._pending_documents = []
+
+        if self._pending:
+            path = self._new_segment_path()
+            _write_keys(path, sorted(
+                (shingle << 32) | document_id
+                for shingle, document_ids in self._pending.items()
+                for document_id in document_ids
+            ))
+            self.segments.append(_Segment(path))
+            self._pending = {}
+            self._pending_count = 0
+            self._save_segments()
+
+        while len(self.segments) > MAX_SEGMENTS:
+            smallest = sorted(self.segments, key=len)[:2]
+            self._merge(smallest)
+
+    def compact(self):
+        """将所有段文件合并为一个"""
+        with self._lock, self._file_lock():
+            if self._pending_documents:
+                self._flush()
+            if len(self.segments) > 1:
+                self._merge(list(self.segments))
+
+    def _merge(self, segments):
+        """合并若干段文件为一个新的段文件（调用方持有锁和锁文件）"""
+        path = self._new_segment_path()
+        _write_keys(path, heapq.merge(*(segment.keys for segment in segments)))
+        merged = _Segment(path)
+        self.segments = [segment for segment in self.segments if segment not in segments] + [merged]
+        self._save_segments()
+        for segment in segments:
+            segment.close()
+            try:
+                os.remove(segment.path)
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self.documents) + len(self._pending_documents)
+
+    def close(self):
+        """写入内存中的新文档并关闭段文件"""
+        with self._lock:
+            self.flush()
+            for segment in self.segments:
+                segment.close()
+            self.segments = []
+
+
+# 每个进程共享一个索引对象
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_corpus_index():
+    """
+    获取当前进程共享的语料库索引，无法打开时返回None
+
+    返回:
+        CorpusIndex: 语料库索引
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            try:
+                _index = CorpusIndex()
+            except (OSError, ValueError):
+                return None
+            atexit.register(_index.close)
+        return _index
+
+
+def clear_corpus_index():
+    """
+    关闭当前进程共享的语料库索引并删除本机语料库
+
+    返回:
+        int: 删除前收录的文档数
+    """
+    global _index
+    with _index_lock:
+        if _index is not None:
+            atexit.unregister(_index.close)
+            _index.close()
+            index_dir = _index.index_dir
+            _index = None
+        else:
+            index_dir = get_cache_dir("corpus")
+        try:
+            with open(os.path.join(index_dir, DOCUMENTS_NAME), "rb") as f:
+                count = sum(1 for _ in f)
+        except OSError:
+            count = 0
+        shutil.rmtree(index_dir, ignore_errors=True)
+    return count
+
+
+def check_and_add_document(text, source_file, content_hash=None, year=None):
+    """
+    将文档与语料库比对，然后收录到语料库
+
+    参数:
+        text: 文档正文
+        source_file: 源文件路径，用于名称和去重
+        content_hash: 源文件内容哈希（可选，调用方已计算时传入，避免重新读取文件）
+        year: 所属年份，默认为当前年份
+
+    返回:
+        list: find_similar的结果；语料库不可用时返回空列表
+    """
+    index = get_corpus_index()
+    if index is None:
+        return []
+    shingles = sampled_shingles(text)
+    if content_hash is None:
+        content_hash = file_content_hash(source_file)
+    name = os.path.basename(source_file)
+    matches = index.find_similar(shingles=shingles, exclude=(name, content_hash))
+    index.add_document(name=name, content_hash=content_hash,
+                       year=year, shingles=shingles)
+    return matches
+
+
+def index_folder(folder, year=None, recursive=True):
+    """
+    将文件夹中的往年征文收录到语料库
+
+    参数:
+        folder: 文件夹路径
+        year: 所属年份，默认为当前年份
+        recursive: 是否包含子文件夹
+
+    返回:
+        int: 新收录的文档数
+    """
+    from doc_reader import load_document
+    from heading_utils import get_document_text
+    from folder_manifest import scan_folder
+
+    index = get_corpus_index()
+    if index is None:
+        return 0
+    added = 0
+    for entry in scan_folder(folder, recursive):
+        try:
+            text = get_document_text(load_document(entry.path))
+        except ImportError:
+            raise
+        except Exception as e:
+            print(f"! 无法读取 {entry.name}：{str(e)}")
+            continue
+        if index.add_document(text, os.path.basename(entry.name), entry.content_hash, year) is not None:
+            added += 1
+    index.flush()
+    return added
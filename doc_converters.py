@@ -0,0 +1,647 @@
+"""
+提供可替换的.doc转.docx转换后端和常驻转换实例池
+
+每个转换实例（Word进程、LibreOffice进程）启动后会被反复用于多个文件，
+避免每个文件都重新启动Office，单个文件的开销只剩实际的转换时间。
+
+可用后端：
+    - word: 通过COM调用Microsoft Word（仅Windows，需要pywin32）
+    - libreoffice: 无界面LibreOffice（Linux/macOS/Windows）
+    - fake: 使用内置.doc读取器生成只含文本的docx，用于测试或无Office环境
+
+可通过环境变量 C_DOC_CONVERTER 指定后端，否则按 word、libreoffice 的顺序自动选择。
+"""
+import os
+import sys
+import time
+import queue
+import shutil
+import atexit
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import Future
+
+# Word SaveAs2 的docx文件格式编号
+WD_FORMAT_DOCX = 16
+
+# LibreOffice 的docx导出过滤器
+LIBREOFFICE_DOCX_FILTER = "MS Word 2007 XML"
+
+# 指定后端的环境变量
+BACKEND_ENV = "C_DOC_CONVERTER"
+
+
+class ConversionError(Exception):
+    """.doc转换失败或没有可用的转换后端"""
+
+
+class DocConverter:
+    """
+    转换后端接口
+
+    子类实现 start()、convert() 和 close()。一个实例同一时间只处理一个文件，
+    由 ConverterPool 负责分配。
+    """
+
+    name = "base"
+
+    @classmethod
+    def is_available(cls):
+        """判断当前环境是否可以使用该后端"""
+        return False
+
+    def start(self):
+        """启动转换实例（启动Office进程等）"""
+
+    def convert(self, input_file, output_file):
+        """
+        将.doc文件转换为.docx文件
+
+        参数:
+            input_file: .doc文件路径
+            output_file: 输出的.docx文件路径
+
+        返回:
+            str: 输出文件路径
+        """
+        raise NotImplementedError
+
+    def is_alive(self):
+        """判断转换实例是否仍然可用，不可用的实例会被转换池丢弃"""
+        return True
+
+    def close(self):
+        """关闭转换实例"""
+
+
+class WordComConverter(DocConverter):
+    """
+    通过COM调用Microsoft Word进行转换
+
+    COM对象只能在创建它的线程中使用，因此每个实例拥有一个专用线程和一个独立的
+    Word进程（DispatchEx），转换请求通过队列交给该线程执行。
+    """
+
+    name = "word"
+
+    @classmethod
+    def is_available(cls):
+        if sys.platform != "win32":
+            return False
+        try:
+            import win32com.client  # noqa: F401
+            import pythoncom  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._ready = threading.Event()
+        self._startup_error = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="word-converter", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._startup_error is not None:
+            raise ConversionError(f"无法启动Word: {self._startup_error}")
+
+    def _run(self):
+        """转换线程主循环"""
+        import win32com.client
+        import pythoncom
+
+        pythoncom.CoInitialize()
+        word = None
+        try:
+            try:
+                word = win32com.client.DispatchEx("Word.Application")
+                word.Visible = 0
+                word.DisplayAlerts = 0
+            except Exception as e:
+                self._startup_error = e
+                return
+            finally:
+                self._ready.set()
+
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+                input_file, output_file, future = job
+                try:
+                    doc = word.Documents.Open(os.path.abspath(input_file), ReadOnly=True,
+                                              AddToRecentFiles=False, Visible=False)
+                    try:
+                        doc.SaveAs2(os.path.abspath(output_file), FileFormat=WD_FORMAT_DOCX)
+                    finally:
+                        doc.Close(SaveChanges=0)
+                    future.set_result(output_file)
+                except Exception as e:
+                    future.set_exception(ConversionError(str(e)))
+                    # Word进程已崩溃时结束线程，转换池会重新创建实例
+                    try:
+                        word.Documents.Count
+                    except Exception:
+                        word = None
+                        break
+        finally:
+            if word is not None:
+                try:
+                    word.Quit()
+                except Exception:
+                    pass
+            pythoncom.CoUninitialize()
+
+    def convert(self, input_file, output_file):
+        if not self.is_alive():
+            raise ConversionError("Word转换实例已退出")
+        future = Future()
+        self._jobs.put((input_file, output_file, future))
+        return future.result()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def close(self):
+        if self.is_alive():
+            self._jobs.put(None)
+            self._thread.join(timeout=30)
+
+
+def find_soffice():
+    """
+    查找LibreOffice可执行文件
+
+    返回:
+        str: soffice路径，未找到时返回None
+    """
+    for name in ("soffice", "libreoffice"):
+        path = shutil.which(name)
+        if path:
+            return path
+    candidates = []
+    if sys.platform == "win32":
+        for base in (os.environ.get("PROGRAMFILES"), os.environ.get("PROGRAMFILES(X86)")):
+            if base:
+                candidates.append(os.path.join(base, "LibreOffice", "program", "soffice.exe"))
+    elif sys.platform == "darwin":
+        candidates.append("/Applications/LibreOffice.app/Contents/MacOS/soffice")
+    for path in candidates:
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _try_lock(lock_file):
+    """
+    对打开的文件加非阻塞排他锁
+
+    锁随文件关闭或进程退出自动释放
+
+    返回:
+        bool: 获得锁时返回True，已被其他进程或文件对象占用时返回False
+    """
+    try:
+        if os.name == "nt":
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _file_url(path):
+    """将本地路径转换为file:// URL"""
+    from pathlib import Path
+    return Path(os.path.abspath(path)).as_uri()
+
+
+class LibreOfficeConverter(DocConverter):
+    """
+    使用无界面LibreOffice进行转换
+
+    可以导入uno模块时启动一个常驻的soffice进程并通过UNO连接反复转换；
+    否则每个文件调用一次 soffice --convert-to，实例池不再节省进程启动时间，
+    只复用已初始化的用户配置目录，省去首次启动时创建配置的时间。
+    """
+
+    name = "libreoffice"
+
+    # 多个soffice进程不能共享同一配置，每个实例占用一个槽位，使用对应的profile_N目录。
+    # 目录跨运行保留并复用，槽位由锁文件在进程间互斥
+    _claimed_slots = set()
+    _slot_lock = threading.Lock()
+    # 命令行模式的提示每个进程只输出一次
+    _cli_notice_shown = False
+
+    @classmethod
+    def is_available(cls):
+        return find_soffice() is not None
+
+    def __init__(self, soffice=None, startup_timeout=60, timeout=300):
+        """
+        参数:
+            soffice: soffice可执行文件路径，默认自动查找
+            startup_timeout: 等待常驻进程启动的秒数
+            timeout: 单个文件的转换超时秒数
+        """
+        self.soffice = soffice or find_soffice()
+        self.startup_timeout = startup_timeout
+        self.timeout = timeout
+        from file_utils import get_cache_dir
+        self.slot, self._slot_file = self._claim_slot(get_cache_dir("libreoffice"))
+        self.profile_dir = get_cache_dir(os.path.join("libreoffice", f"profile_{self.slot}"))
+        self._pipe_name = f"c_doc_{os.getpid()}_{self.slot}"
+        self._process = None
+        self._desktop = None
+
+    @classmethod
+    def _claim_slot(cls, base_dir):
+        """
+        占用编号最小的空闲槽位
+
+        参数:
+            base_dir: 存放配置目录和锁文件的目录
+
+        返回:
+            tuple: (槽位编号, 已加锁的锁文件)，锁文件保持打开直到close()
+        """
+        with cls._slot_lock:
+            slot = 0
+            while True:
+                if slot not in cls._claimed_slots:
+                    lock_file = open(os.path.join(base_dir, f"profile_{slot}.lock"), "a+b")
+                    if _try_lock(lock_file):
+                        cls._claimed_slots.add(slot)
+                        return slot, lock_file
+                    lock_file.close()
+                slot += 1
+
+    def _release_slot(self):
+        """释放槽位，配置目录保留供之后的实例复用"""
+        if self._slot_file is None:
+            return
+        self._slot_file.close()
+        self._slot_file = None
+        with LibreOfficeConverter._slot_lock:
+            LibreOfficeConverter._claimed_slots.discard(self.slot)
+
+    @classmethod
+    def _notify_cli_mode(cls):
+        """提示没有uno模块时每个文件都会单独启动soffice"""
+        with cls._slot_lock:
+            if cls._cli_notice_shown:
+                return
+            cls._cli_notice_shown = True
+        from task_events import report
+        report("! 未找到LibreOffice的uno模块，每个.doc文件都将单独启动一次soffice转换，速度较慢；"
+               "安装python3-uno或使用LibreOffice自带的Python可复用常驻进程")
+
+    def _base_command(self):
+        return [
+            self.soffice,
+            f"-env:UserInstallation={_file_url(self.profile_dir)}",
+            "--headless", "--invisible", "--nologo", "--norestore", "--nodefault",
+        ]
+
+    def start(self):
+        if not self.soffice:
+            self.close()
+            raise ConversionError("未找到LibreOffice（soffice）")
+        try:
+            import uno  # noqa: F401
+        except ImportError:
+            # 没有UNO时使用命令行模式
+            self._notify_cli_mode()
+            return
+
+        self._process = subprocess.Popen(
+            self._base_command() + [f"--accept=pipe,name={self._pipe_name};urp;"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        last_error = None
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                break
+            try:
+                self._desktop = self._connect()
+                return
+            except Exception as e:
+                last_error = e
+                time.sleep(0.5)
+        self.close()
+        raise ConversionError(f"无法连接LibreOffice: {last_error}")
+
+    def _connect(self):
+        """通过UNO管道连接常驻soffice进程"""
+        import uno
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        context = resolver.resolve(
+            f"uno:pipe,name={self._pipe_name};urp;StarOffice.ComponentContext"
+        )
+        return context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+
+    @staticmethod
+    def _properties(**values):
+        from com.sun.star.beans import PropertyValue
+        result = []
+        for name, value in values.items():
+            prop = PropertyValue()
+            prop.Name = name
+            prop.Value = value
+            result.append(prop)
+        return tuple(result)
+
+    def convert(self, input_file, output_file):
+        if self._desktop is not None:
+            return self._convert_uno(input_file, output_file)
+        return self._convert_cli(input_file, output_file)
+
+    def _convert_uno(self, input_file, output_file):
+        """通过常驻进程转换"""
+        try:
+            document = self._desktop.loadComponentFromURL(
+                _file_url(input_file), "_blank", 0, self._properties(Hidden=True, ReadOnly=True)
+            )
+            if document is None:
+                raise ConversionError("LibreOffice无法打开文件")
+            try:
+                document.storeToURL(_file_url(output_file), self._properties(FilterName=LIBREOFFICE_DOCX_FILTER))
+            finally:
+                document.close(True)
+        except ConversionError:
+            raise
+        except Exception as e:
+            raise ConversionError(str(e))
+        return output_file
+
+    def _convert_cli(self, input_file, output_file):
+        """通过命令行转换"""
+        work_dir = tempfile.mkdtemp(prefix="c_doc_lo_")
+        try:
+            command = self._base_command() + [
+                "--convert-to", f"docx:{LIBREOFFICE_DOCX_FILTER}",
+                "--outdir", work_dir, os.path.abspath(input_file),
+            ]
+            try:
+                completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                           timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                raise ConversionError("LibreOffice转换超时")
+            produced = os.path.join(work_dir, os.path.splitext(os.path.basename(input_file))[0] + ".docx")
+            if completed.returncode != 0 or not os.path.exists(produced):
+                message = completed.stderr.decode(errors="replace").strip() or f"返回码 {completed.returncode}"
+                raise ConversionError(f"LibreOffice转换失败: {message}")
+            shutil.move(produced, output_file)
+            return output_file
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def is_alive(self):
+        return self._process is None or self._process.poll() is None
+
+    def close(self):
+        if self._desktop is not None:
+            try:
+                self._desktop.terminate()
+            except Exception:
+                pass
+            self._desktop = None
+        if self._process is not None:
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+        self._release_slot()
+
+
+class FakeConverter(DocConverter):
+    """
+    使用内置.doc读取器生成只含正文文本的docx
+
+    不依赖Office，转换结果不保留格式和图片，主要用于测试和无Office环境下的预览。
+    """
+
+    name = "fake"
+
+    @classmethod
+    def is_available(cls):
+        return True
+
+    def __init__(self):
+        # 记录处理过的文件数，便于测试确认实例被复用
+        self.conversions = 0
+
+    def convert(self, input_file, output_file):
+        from docx import Document
+        from doc_reader import read_doc_document, DocFormatError
+        try:
+            source = read_doc_document(input_file)
+        except (OSError, DocFormatError) as e:
+            raise ConversionError(str(e))
+        doc = Document()
+        if source.core_properties.title:
+            doc.core_properties.title = source.core_properties.title
+        for paragraph in source.paragraphs:
+            doc.add_paragraph(paragraph.text)
+        doc.save(output_file)
+        self.conversions += 1
+        return output_file
+
+
+# 后端注册表，按自动选择的优先级排列
+BACKENDS = {
+    WordComConverter.name: WordComConverter,
+    LibreOfficeConverter.name: LibreOfficeConverter,
+    FakeConverter.name: FakeConverter,
+}
+
+# 自动选择时不使用测试后端
+AUTO_BACKENDS = (WordComConverter.name, LibreOfficeConverter.name)
+
+
+def detect_backend():
+    """
+    选择转换后端
+
+    返回:
+        str: 后端名，没有可用后端时返回None
+    """
+    name = os.environ.get(BACKEND_ENV, "").strip().lower()
+    if name:
+        return name if name in BACKENDS else None
+    for name in AUTO_BACKENDS:
+        if BACKENDS[name].is_available():
+            return name
+    return None
+
+
+class ConverterPool:
+    """
+    常驻转换实例池
+
+    实例在首次需要时创建，用完后放回池中供后续文件复用，最多同时存在size个实例。
+    """
+
+    def __init__(self, backend, size=1):
+        """
+        参数:
+            backend: 后端名或DocConverter子类
+            size: 最多同时存在的实例数
+        """
+        if isinstance(backend, str):
+            if backend not in BACKENDS:
+                raise ConversionError(f"未知的转换后端: {backend}")
+            backend = BACKENDS[backend]
+        self.backend = backend
+        self.size = max(1, size)
+        # 空闲实例，后归还的先取出；实例数已达上限时在条件变量上等待归还或丢弃
+        self._idle = []
+        self._condition = threading.Condition()
+        self._created = 0
+        self._instances = []
+        self._closed = False
+
+    def _acquire(self):
+        """取出一个空闲实例，必要时创建新实例；实例数已达上限时等待其他线程归还或丢弃实例"""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise ConversionError("转换池已关闭")
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                self._condition.wait()
+        converter = self.backend()
+        try:
+            converter.start()
+        except Exception:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._instances.append(converter)
+        return converter
+
+    def _release(self, converter):
+        """归还实例，已失效的实例被关闭并丢弃"""
+        if converter.is_alive():
+            with self._condition:
+                if not self._closed:
+                    self._idle.append(converter)
+                    self._condition.notify()
+                    return
+        self._discard(converter)
+
+    def _discard(self, converter):
+        """丢弃实例并唤醒一个等待的线程，由其创建新实例"""
+        with self._condition:
+            self._created -= 1
+            if converter in self._instances:
+                self._instances.remove(converter)
+            self._condition.notify()
+        try:
+            converter.close()
+        except Exception:
+            pass
+
+    def convert(self, input_file, output_file):
+        """
+        使用池中的实例转换一个文件
+
+        参数:
+            input_file: .doc文件路径
+            output_file: 输出的.docx文件路径
+
+        返回:
+            str: 输出文件路径
+        """
+        converter = self._acquire()
+        try:
+            return converter.convert(input_file, output_file)
+        except ConversionError:
+            raise
+        except Exception as e:
+            raise ConversionError(str(e))
+        finally:
+            self._release(converter)
+
+    def close(self):
+        """关闭所有实例"""
+        with self._condition:
+            self._closed = True
+            instances, self._instances = self._instances, []
+            self._idle = []
+            self._condition.notify_all()
+        for converter in instances:
+            try:
+                converter.close()
+            except Exception:
+                pass
+
+
+# 每个进程共享一个转换池
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_converter_pool():
+    """
+    获取当前进程共享的转换池
+
+    返回:
+        ConverterPool: 转换池
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            backend = detect_backend()
+            if backend is None:
+                raise ConversionError(
+                    "没有可用的.doc转换器，请安装Word和pywin32，或安装LibreOffice"
+                )
+            _pool = ConverterPool(backend)
+        return _pool
+
+
+def shutdown_converter_pool():
+    """关闭当前进程的转换池"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(shutdown_converter_pool)
+
+
+def convert_doc_to_docx(input_file, output_file):
+    """
+    使用共享转换池将.doc文件转换为.docx文件
+
+    参数:
+        input_file: .doc文件路径
+        output_file: 输出的.docx文件路径
+
+    返回:
+        str: 输出文件路径
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    return get_converter_pool().convert(input_file, output_file)
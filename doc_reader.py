@@ -0,0 +1,469 @@
+"""
+提供.doc格式（Word 97-2003）文档的纯Python读取功能
+
+解析复合文档二进制格式（CFB/OLE2）容器，读取WordDocument流中的文件信息块（FIB）
+和表格流中的分段表（piece table）来提取正文文本，无需安装Word或pywin32。
+仅用于字数统计和标题提取，不保留格式和图片。
+"""
+import os
+import struct
+
+# 复合文档文件头签名
+CFB_SIGNATURE = b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1"
+
+# 特殊扇区编号
+MAXREGSECT = 0xFFFFFFFA
+DIFSECT = 0xFFFFFFFC
+FATSECT = 0xFFFFFFFD
+ENDOFCHAIN = 0xFFFFFFFE
+FREESECT = 0xFFFFFFFF
+NOSTREAM = 0xFFFFFFFF
+
+# 目录项类型
+STGTY_STORAGE = 1
+STGTY_STREAM = 2
+STGTY_ROOT = 5
+
+# Word二进制格式常量
+WORD_IDENT = 0xA5EC
+MIN_WORD97_NFIB = 0x00C1
+
+# 段落和控制字符
+PARAGRAPH_MARKS = ("\r", "\x07", "\x0c")
+FIELD_BEGIN = "\x13"
+FIELD_SEPARATOR = "\x14"
+FIELD_END = "\x15"
+
+# 摘要信息属性
+PID_CODEPAGE = 1
+PID_TITLE = 2
+PID_SUBJECT = 3
+PID_AUTHOR = 4
+VT_I2 = 2
+VT_LPSTR = 0x1E
+VT_LPWSTR = 0x1F
+
+
+class DocFormatError(ValueError):
+    """.doc文件已损坏、已加密或格式不受支持"""
+
+
+class CompoundFile:
+    """复合文档二进制格式（CFB/OLE2）容器的只读解析器"""
+
+    def __init__(self, data):
+        """
+        解析复合文档
+
+        参数:
+            data: 文件的全部字节内容
+        """
+        if len(data) < 512 or data[:8] != CFB_SIGNATURE:
+            raise DocFormatError("不是有效的Word 97-2003文档（缺少复合文档签名）")
+
+        self._data = data
+        (self.major_version, byte_order, sector_shift, mini_sector_shift) = struct.unpack_from("<HHHH", data, 26)
+        if byte_order != 0xFFFE:
+            raise DocFormatError("复合文档字节序无效")
+
+        self.sector_size = 1 << sector_shift
+        self.mini_sector_size = 1 << mini_sector_shift
+        (num_fat_sectors, first_dir_sector, _, self.mini_stream_cutoff,
+         first_minifat_sector, num_minifat_sectors,
+         first_difat_sector, num_difat_sectors) = struct.unpack_from("<IIIIIIII", data, 44)
+
+        self._fat = self._load_fat(num_fat_sectors, first_difat_sector, num_difat_sectors)
+        self._entries = self._load_directory(first_dir_sector)
+        if not self._entries or self._entries[0]["type"] != STGTY_ROOT:
+            raise DocFormatError("复合文档缺少根目录项")
+
+        # 小流（mini stream）存放在根目录项的数据中
+        root = self._entries[0]
+        self._mini_stream = self._read_chain(root["start"], root["size"])
+        self._minifat = []
+        if num_minifat_sectors and first_minifat_sector <= MAXREGSECT:
+            raw = self._read_chain(first_minifat_sector)
+            self._minifat = list(struct.unpack_from(f"<{len(raw) // 4}I", raw))
+
+        self._paths = {}
+        self._build_paths(root["child"], "")
+
+    def _sector(self, sector_id):
+        """读取单个扇区的数据"""
+        offset = (sector_id + 1) * self.sector_size
+        if offset >= len(self._data):
+            raise DocFormatError("复合文档扇区越界，文件可能已损坏")
+        return self._data[offset:offset + self.sector_size]
+
+    def _load_fat(self, num_fat_sectors, first_difat_sector, num_difat_sectors):
+        """根据DIFAT读取扇区分配表（FAT）"""
+        difat = list(struct.unpack_from("<109I", self._data, 76))
+        sector_id = first_difat_sector
+        per_sector = self.sector_size // 4 - 1
+        for _ in range(num_difat_sectors):
+            if sector_id > MAXREGSECT:
+                break
+            values = struct.unpack(f"<{per_sector + 1}I", self._sector(sector_id))
+            difat.extend(values[:per_sector])
+            sector_id = values[per_sector]
+
+        fat_sectors = [s for s in difat if s <= MAXREGSECT][:num_fat_sectors]
+        raw = b"".join(self._sector(s) for s in fat_sectors)
+        return list(struct.unpack(f"<{len(raw) // 4}I", raw))
+
+    def _chain(self, start, table):
+        """沿分配表遍历扇区链，防止损坏文件中的循环"""
+        sector_id = start
+        seen = 0
+        limit = len(table)
+        while sector_id <= MAXREGSECT:
+            if sector_id >= limit or seen > limit:
+                raise DocFormatError("复合文档扇区链损坏")
+            yield sector_id
+            seen += 1
+            sector_id = table[sector_id]
+
+    def _read_chain(self, start, size=None):
+        """读取常规扇区链中的数据"""
+        if start > MAXREGSECT:
+            return b""
+        data = b"".join(self._sector(s) for s in self._chain(start, self._fat))
+        return data if size is None else data[:size]
+
+    def _read_mini_chain(self, start, size):
+        """读取小流扇区链中的数据"""
+        if start > MAXREGSECT:
+            return b""
+        step = self.mini_sector_size
+        parts = []
+        for sector_id in self._chain(start, self._minifat):
+            offset = sector_id * step
+            parts.append(self._mini_stream[offset:offset + step])
+        return b"".join(parts)[:size]
+
+    def _load_directory(self, first_dir_sector):
+        """读取目录项"""
+        raw = self._read_chain(first_dir_sector)
+        entries = []
+        for offset in range(0, len(raw) - 127, 128):
+            name_length, entry_type = struct.unpack_from("<HB", raw, offset + 64)
+            left, right, child = struct.unpack_from("<III", raw, offset + 68)
+            start, size_low, size_high = struct.unpack_from("<III", raw, offset + 116)
+            name = raw[offset:offset + max(0, name_length - 2)].decode("utf-16-le", errors="replace")
+            # 版本3的文件中大小的高32位可能是无效数据
+            size = size_low if self.major_version == 3 else size_low | (size_high << 32)
+            entries.append({
+                "name": name, "type": entry_type,
+                "left": left, "right": right, "child": child,
+                "start": start, "size": size,
+            })
+        return entries
+
+    def _build_paths(self, entry_id, prefix):
+        """遍历目录项红黑树，建立路径到目录项的映射"""
+        stack = [(entry_id, prefix)]
+        visited = set()
+        while stack:
+            entry_id, prefix = stack.pop()
+            if entry_id == NOSTREAM or entry_id >= len(self._entries) or entry_id in visited:
+                continue
+            visited.add(entry_id)
+            entry = self._entries[entry_id]
+            path = prefix + entry["name"]
+            self._paths[path] = entry
+            stack.append((entry["left"], prefix))
+            stack.append((entry["right"], prefix))
+            if entry["type"] == STGTY_STORAGE:
+                stack.append((entry["child"], path + "/"))
+
+    def list_streams(self):
+        """列出所有流的路径"""
+        return sorted(p for p, e in self._paths.items() if e["type"] == STGTY_STREAM)
+
+    def exists(self, path):
+        """判断指定路径的流是否存在"""
+        entry = self._paths.get(path)
+        return entry is not None and entry["type"] == STGTY_STREAM
+
+    def open_stream(self, path):
+        """
+        读取指定路径的流
+
+        参数:
+            path: 流路径，子存储中的流用/分隔
+
+        返回:
+            bytes: 流的全部内容
+        """
+        entry = self._paths.get(path)
+        if entry is None or entry["type"] != STGTY_STREAM:
+            raise DocFormatError(f"复合文档中缺少流: {path}")
+        if entry["size"] < self.mini_stream_cutoff:
+            return self._read_mini_chain(entry["start"], entry["size"])
+        return self._read_chain(entry["start"], entry["size"])
+
+
+def _read_pieces(word_stream, table_stream):
+    """
+    读取分段表，返回正文各片段的位置信息
+
+    返回:
+        tuple: (正文字符数, [(起始CP, 结束CP, 文件偏移, 是否压缩), ...])
+    """
+    # FibBase之后依次是 FibRgW97、FibRgLw97 和 FibRgFcLcb
+    csw = struct.unpack_from("<H", word_stream, 32)[0]
+    position = 34 + csw * 2
+    cslw = struct.unpack_from("<H", word_stream, position)[0]
+    rglw_position = position + 2
+    ccp_text = struct.unpack_from("<i", word_stream, rglw_position + 3 * 4)[0]
+    position = rglw_position + cslw * 4
+    cb_rg_fc_lcb = struct.unpack_from("<H", word_stream, position)[0]
+    fclcb_position = position + 2
+    if cb_rg_fc_lcb <= 33:
+        raise DocFormatError("文档信息块中缺少分段表位置")
+    fc_clx, lcb_clx = struct.unpack_from("<II", word_stream, fclcb_position + 33 * 8)
+    if not lcb_clx or fc_clx + lcb_clx > len(table_stream):
+        raise DocFormatError("文档分段表无效")
+
+    clx = table_stream[fc_clx:fc_clx + lcb_clx]
+    position = 0
+    # 跳过Prc（属性修改记录），找到Pcdt
+    while position < len(clx) and clx[position] == 0x01:
+        cb_grpprl = struct.unpack_from("<h", clx, position + 1)[0]
+        position += 3 + cb_grpprl
+    if position >= len(clx) or clx[position] != 0x02:
+        raise DocFormatError("文档分段表无效")
+    lcb = struct.unpack_from("<I", clx, position + 1)[0]
+    plc = clx[position + 5:position + 5 + lcb]
+
+    count = (len(plc) - 4) // 12
+    if count <= 0:
+        return ccp_text, []
+    cps = struct.unpack_from(f"<{count + 1}I", plc, 0)
+    pieces = []
+    for i in range(count):
+        fc_value = struct.unpack_from("<I", plc, (count + 1) * 4 + i * 8 + 2)[0]
+        compressed = bool(fc_value & 0x40000000)
+        fc = fc_value & 0x3FFFFFFF
+        if compressed:
+            fc //= 2
+        pieces.append((cps[i], cps[i + 1], fc, compressed))
+    return ccp_text, pieces
+
+
+def _strip_fields(text):
+    """移除域代码，只保留域结果"""
+    if FIELD_BEGIN not in text:
+        return text
+    result = []
+    # 栈中记录每层域是否处于代码部分
+    stack = []
+    for char in text:
+        if char == FIELD_BEGIN:
+            stack.append(True)
+        elif char == FIELD_SEPARATOR and stack:
+            stack[-1] = False
+        elif char == FIELD_END and stack:
+            stack.pop()
+        elif not any(stack):
+            result.append(char)
+    return "".join(result)
+
+
+def _clean_paragraph(text):
+    """将段落中的特殊字符转换为普通文本"""
+    text = text.replace("\x0b", "\n").replace("\x1e", "-").replace("\x1f", "")
+    return "".join(c for c in text if c >= " " or c in "\t\n")
+
+
+def read_doc_text(input_file):
+    """
+    读取.doc文档的正文文本
+
+    参数:
+        input_file: .doc文件路径
+
+    返回:
+        str: 正文文本，段落之间以换行分隔
+    """
+    return "\n".join(read_doc_paragraphs(input_file))
+
+
+def read_doc_paragraphs(input_file, compound_file=None):
+    """
+    读取.doc文档正文的段落文本（表格单元格作为独立段落）
+
+    参数:
+        input_file: .doc文件路径
+        compound_file: 已解析的复合文档（可选）
+
+    返回:
+        list: 段落文本列表
+    """
+    if compound_file is None:
+        with open(input_file, "rb") as f:
+            compound_file = CompoundFile(f.read())
+
+    word_stream = compound_file.open_stream("WordDocument")
+    if len(word_stream) < 0x200:
+        raise DocFormatError("WordDocument流过短")
+    w_ident, n_fib = struct.unpack_from("<HH", word_stream, 0)
+    if w_ident != WORD_IDENT:
+        raise DocFormatError("不是有效的Word文档")
+    if n_fib < MIN_WORD97_NFIB:
+        raise DocFormatError("不支持Word 6.0/95及更早版本的文档")
+    flags = struct.unpack_from("<H", word_stream, 0x0A)[0]
+    if flags & 0x0100:
+        raise DocFormatError("文档已加密")
+
+    table_name = "1Table" if flags & 0x0200 else "0Table"
+    table_stream = compound_file.open_stream(table_name)
+    ccp_text, pieces = _read_pieces(word_stream, table_stream)
+
+    # 只取正文部分（CP 0 到 ccpText），脚注、页眉等位于其后
+    parts = []
+    for cp_start, cp_end, fc, compressed in pieces:
+        if cp_start >= ccp_text:
+            break
+        length = min(cp_end, ccp_text) - cp_start
+        if length <= 0:
+            continue
+        if compressed:
+            parts.append(word_stream[fc:fc + length].decode("cp1252", errors="replace"))
+        else:
+            parts.append(word_stream[fc:fc + length * 2].decode("utf-16-le", errors="replace"))
+
+    text = _strip_fields("".join(parts))
+    for mark in PARAGRAPH_MARKS[1:]:
+        text = text.replace(mark, PARAGRAPH_MARKS[0])
+    paragraphs = [_clean_paragraph(p) for p in text.split(PARAGRAPH_MARKS[0])]
+    # 去掉文档末尾的空段落
+    while paragraphs and not paragraphs[-1].strip():
+        paragraphs.pop()
+    return paragraphs
+
+
+def _decode_property_string(data, offset, value_type, codepage):
+    """解码属性集中的字符串属性"""
+    size = struct.unpack_from("<I", data, offset + 4)[0]
+    raw = data[offset + 8:offset + 8 + (size * 2 if value_type == VT_LPWSTR else size)]
+    if value_type == VT_LPWSTR or codepage == 1200:
+        return raw.decode("utf-16-le", errors="replace").rstrip("\x00")
+    encoding = "utf-8" if codepage == 65001 else f"cp{codepage}" if codepage else "cp1252"
+    try:
+        return raw.decode(encoding, errors="replace").rstrip("\x00")
+    except LookupError:
+        return raw.decode("cp1252", errors="replace").rstrip("\x00")
+
+
+def read_summary_information(compound_file):
+    """
+    读取文档摘要信息中的标题、主题和作者
+
+    参数:
+        compound_file: 已解析的复合文档
+
+    返回:
+        dict: 包含title、subject、author的字典，缺失时为空字符串
+    """
+    info = {"title": "", "subject": "", "author": ""}
+    name = "\x05SummaryInformation"
+    if not compound_file.exists(name):
+        return info
+    try:
+        data = compound_file.open_stream(name)
+        section_offset = struct.unpack_from("<I", data, 44)[0]
+        count = struct.unpack_from("<I", data, section_offset + 4)[0]
+        properties = {}
+        for i in range(count):
+            pid, offset = struct.unpack_from("<II", data, section_offset + 8 + i * 8)
+            properties[pid] = section_offset + offset
+
+        codepage = 0
+        if PID_CODEPAGE in properties:
+            value_type, value = struct.unpack_from("<Ih", data, properties[PID_CODEPAGE])
+            if value_type == VT_I2:
+                codepage = value & 0xFFFF
+
+        for key, pid in (("title", PID_TITLE), ("subject", PID_SUBJECT), ("author", PID_AUTHOR)):
+            if pid in properties:
+                value_type = struct.unpack_from("<I", data, properties[pid])[0]
+                if value_type in (VT_LPSTR, VT_LPWSTR):
+                    info[key] = _decode_property_string(data, properties[pid], value_type, codepage).strip()
+    except (struct.error, DocFormatError):
+        pass
+    return info
+
+
+class DocParagraph:
+    """与python-docx段落接口兼容的只读段落"""
+
+    __slots__ = ("text",)
+
+    # .doc读取器不解析字符格式
+    runs = ()
+
+    def __init__(self, text):
+        self.text = text
+
+
+class DocCoreProperties:
+    """与python-docx核心属性接口兼容的只读属性"""
+
+    def __init__(self, title="", subject="", author=""):
+        self.title = title
+        self.subject = subject
+        self.author = author
+
+
+class DocDocument:
+    """
+    .doc文档的只读视图，提供与python-docx Document相同的paragraphs、tables和
+    core_properties属性，可直接用于字数统计和标题提取
+    """
+
+    def __init__(self, paragraphs, core_properties=None):
+        self.paragraphs = [DocParagraph(text) for text in paragraphs]
+        # 表格单元格文本已作为段落包含在paragraphs中
+        self.tables = []
+        self.core_properties = core_properties or DocCoreProperties()
+
+
+def read_doc_document(input_file):
+    """
+    读取.doc文档
+
+    参数:
+        input_file: .doc文件路径
+
+    返回:
+        DocDocument: 文档的只读视图
+    """
+    with open(input_file, "rb") as f:
+        compound_file = CompoundFile(f.read())
+    paragraphs = read_doc_paragraphs(input_file, compound_file)
+    info = read_summary_information(compound_file)
+    return DocDocument(paragraphs, DocCoreProperties(info["title"], info["subject"], info["author"]))
+
+
+def load_document(input_file):
+    """
+    打开Word文档
+
+    .docx使用python-docx；.doc已有缓存的转换结果时读取转换后的文件（保留格式），
+    否则使用内置读取器，不会为此启动Office。
+
+    参数:
+        input_file: Word文件路径
+
+    返回:
+        python-docx的Document对象或DocDocument
+    """
+    if os.path.splitext(input_file)[1].lower() == ".doc":
+        from conversion_cache import get_conversion_cache
+        cached_file = get_conversion_cache().lookup(input_file)
+        if cached_file is None:
+            return read_doc_document(input_file)
+        input_file = cached_file
+    from docx import Document
+    return Document(input_file)
@@ -23,13 +23,17 @@ from document_styles import (
 )
 
 # 导入工具模块
-from file_utils import extract_author_from_filename, sanitize_filename, generate_output_filename
+from file_utils import extract_author_from_filename, sanitize_filename, generate_output_filename, save_document_atomic
 from image_extractor import extract_images_from_doc, extract_document_image_relations, find_paragraph_images
+from task_events import report, set_stage, record_output
+from heading_utils import get_document_text
+from corpus_index import check_and_add_document
 
 def process_docx_file(input_file, output_dir, suffix_enabled=True, 
                      suffix_text="——福州大学先进制造学院与海洋学院关工委2023年'中华魂'（毛泽东伟大精神品格）主题教育征文", 
                      use_chinese_format=False, keep_image_position=True, show_author_info=True,
-                     mark_low_wordcount=False): # Added mark_low_wordcount parameter
+                     mark_low_wordcount=False, source_file=None, corpus_check=False,
+                     content_hash=None): # Added mark_low_wordcount parameter
     """
     处理单个.docx格式的Word文件
     
@@ -42,15 +46,18 @@ def process_docx_file(input_file, output_dir, suffix_enabled=True,
         keep_image_position: 是否保持图片位置
         show_author_info: 是否显示作者信息
         mark_low_wordcount: 是否标记低字数文档
+        source_file: 原始文件路径，input_file是由.doc转换得到的文件时用于提取作者名
+        corpus_check: 是否与本机语料库中的往年征文比对，并将本文收录到语料库
+        content_hash: 原始文件的内容哈希（可选，调用方已计算时传入）
     
     返回:
         bool: 处理成功返回True，否则返回False
     """
-    print(f"DEBUG: 开始处理文件 {input_file}")
+    report(f"DEBUG: 开始处理文件 {input_file}")
     try:
         # 检查文件是否存在
         if not os.path.exists(input_file):
-            print(f"× 错误：输入文件 '{input_file}' 不存在")
+            report(f"× 错误：输入文件 '{input_file}' 不存在")
             return False
 
         # 创建成功文件文件夹
@@ -65,6 +72,7 @@ def process_docx_file(input_file, output_dir, suffix_enabled=True,
 
         try:
             # 打开源文档
+            set_stage("读取")
             source_doc = Document(input_file)
             
             # 创建目标文档
@@ -78,7 +86,7 @@ def process_docx_file(input_file, output_dir, suffix_enabled=True,
 
             # 检查是否有图片
             has_images = bool(image_relations)
-            print(f"DEBUG: 文档中包含 {len(image_relations)} 张图片")
+            report(f"DEBUG: 文档中包含 {len(image_relations)} 张图片")
 
             # 提取信息变量
             author_name = ""
@@ -88,7 +96,7 @@ def process_docx_file(input_file, output_dir, suffix_enabled=True,
             used_default_author = False
             
             # 从文件名中提取作者名
-            filename = os.path.basename(input_file)
+            filename = os.path.basename(source_file or input_file)
             author_name = extract_author_from_filename(filename)
             
             # 保存每个段落对应的图片，用于后续处理
@@ -96,10 +104,11 @@ def process_docx_file(input_file, output_dir, suffix_enabled=True,
             
             # 首先遍历文档，找出所有带图片的段落
             if keep_image_position and has_images:
-                print("DEBUG: 分析文档结构以保持图片位置...")
+                report("DEBUG: 分析文档结构以保持图片位置...")
                 paragraph_images = find_paragraph_images(source_doc, image_relations)
             
             # 处理文档内容
+            set_stage("排版")
             for para_idx, para in enumerate(source_doc.paragraphs):
                 try:
                     text = para.text.strip()
@@ -114,9 +123,9 @@ def process_docx_file(input_file, output_dir, suffix_enabled=True,
                             try:
                                 run = img_para.add_run()
                                 run.add_picture(img_path, width=Inches(6))
-                                print(f"DEBUG: 在空段落 {para_idx} 中添加图片")
+                                report(f"DEBUG: 在空段落 {para_idx} 中添加图片")
                             except Exception as e:
-                                print(f"× 添加图片时出错: {str(e)}")
+                                report(f"× 添加图片时出错: {str(e)}")
                         
                         continue  # 处理完图片，继续下一段落
                     
@@ -182,18 +191,18 @@ def process_docx_file(input_file, output_dir, suffix_enabled=True,
                                 try:
                                     run = img_para.add_run()
                                     run.add_picture(img_path, width=Inches(6))
-                                    print(f"DEBUG: 在段落 {para_idx} 后添加图片")
+                                    report(f"DEBUG: 在段落 {para_idx} 后添加图片")
                                 except Exception as e:
-                                    print(f"× 添加图片时出错: {str(e)}")
+                                    report(f"× 添加图片时出错: {str(e)}")
                 except Exception as e:
-                    print(f"× 处理段落 {para_idx} 时出错：{str(e)}")
+                    report(f"× 处理段落 {para_idx} 时出错：{str(e)}")
                     continue
 
             # 处理默认作者名
             if not author_name:
                 author_name = "佚名"
                 used_default_author = True
-                print(f"! 警告：未能提取作者名，使用默认值\"{author_name}\"")
+                report(f"! 警告：未能提取作者名，使用默认值\"{author_name}\"")
                 
                 # 添加默认作者信息（如果需要且未添加）
                 if not author_added and show_author_info and title_found:
@@ -207,7 +216,7 @@ def process_docx_file(input_file, output_dir, suffix_enabled=True,
 
             # 如果不保持图片位置或没找到图片位置信息，但文档包含图片，则在末尾添加图片
             if has_images and not keep_image_position:
-                print("DEBUG: 将所有图片添加到文档末尾")
+                report("DEBUG: 将所有图片添加到文档末尾")
                 new_doc.add_paragraph()  # 添加空行分隔
                 
                 # 将所有图片提取并添加到末尾
@@ -223,7 +232,7 @@ def process_docx_file(input_file, output_dir, suffix_enabled=True,
                         run = img_para.add_run()
                         run.add_picture(img_path, width=Inches(6))
                     except Exception as e:
-                        print(f"× 添加图片到文档末尾时出错：{str(e)}")
+                        report(f"× 添加图片到文档末尾时出错：{str(e)}")
 
             # 生成输出文件名
             if original_title:
@@ -238,27 +247,41 @@ def process_docx_file(input_file, output_dir, suffix_enabled=True,
                 output_file = os.path.join(output_dir_final, new_filename)
                 
                 # 保存文档
+                set_stage("保存")
                 try:
-                    new_doc.save(output_file)
+                    save_document_atomic(new_doc, output_file)
+                    record_output(output_file)
                     if used_default_author:
                         if has_images:
-                            print(f"✓ 文件处理完成（使用默认作者名）：{new_filename}")
+                            report(f"✓ 文件处理完成（使用默认作者名）：{new_filename}")
                         else:
-                            print(f"✓ 文件处理完成（使用默认作者名，无图片）：{new_filename}")
+                            report(f"✓ 文件处理完成（使用默认作者名，无图片）：{new_filename}")
                     else:
                         if has_images:
-                            print(f"✓ 文件处理完成：{new_filename}")
+                            report(f"✓ 文件处理完成：{new_filename}")
                         else:
-                            print(f"✓ 文件处理完成（无图片）：{new_filename}")
+                            report(f"✓ 文件处理完成（无图片）：{new_filename}")
                 except Exception as e:
-                    print(f"× 保存文件时出错：{str(e)}")
+                    report(f"× 保存文件时出错：{str(e)}")
                     return False
+                
+                # 与往年收录的征文比对，并将本文收录到语料库
+                if corpus_check:
+                    set_stage("比对")
+                    try:
+                        for document, containment in check_and_add_document(
+                                get_document_text(source_doc), source_file or input_file,
+                                content_hash):
+                            report(f"! 与语料库中的文档相似：{document['name']}"
+                                   f"（{document['year']}年，重合 {containment:.0%}）")
+                    except Exception as e:
+                        report(f"! 语料库比对失败：{str(e)}")
             else:
-                print("× 未能提取标题")
+                report("× 未能提取标题")
                 return False
                 
         except BadZipFile:
-            print(f"× 错误：文件 '{input_file}' 可能已损坏或不是有效的Word文档")
+            report(f"× 错误：文件 '{input_file}' 可能已损坏或不是有效的Word文档")
             return False
 
         # 清理临时文件
@@ -267,10 +290,10 @@ def process_docx_file(input_file, output_dir, suffix_enabled=True,
                 import shutil
                 shutil.rmtree(temp_dir)
         except Exception as e:
-            print(f"! 清理临时文件时出错: {str(e)}")
+            report(f"! 清理临时文件时出错: {str(e)}")
 
         return True
 
     except Exception as e:
-        print(f"× 处理文件时出现错误：{str(e)}")
+        report(f"× 处理文件时出现错误：{str(e)}")
         return False
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+提供流式写入的Excel报告
+
+使用openpyxl的只写模式生成工作簿，行数据边追加边写出，不在内存中保留单元格对象；
+表头、不足行等样式注册为工作簿共享的命名样式，每个单元格只引用样式名称。
+列宽在追加行时增量记录，无需保存后再逐列扫描所有单元格。
+
+只写工作表必须在写入第一行之前设置列宽，因此每个工作表的行先按顺序暂存到
+临时文件（小数据量时在内存中），保存时再一次性写入工作簿。
+"""
+import os
+import pickle
+import tempfile
+
+# 检查是否安装了openpyxl库
+try:
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, Alignment, PatternFill, NamedStyle
+    from openpyxl.utils import get_column_letter
+    EXCEL_AVAILABLE = True
+except ImportError:
+    EXCEL_AVAILABLE = False
+
+# 共享的命名样式
+STYLE_HEADER = "报告表头"
+STYLE_LABEL = "报告标签"
+STYLE_WARNING = "报告不足"
+STYLE_PERCENT = "报告百分比"
+
+# 暂存行数据超过该大小后写入临时文件
+SPOOL_MAX_SIZE = 1024 * 1024
+
+# 列宽上限，避免超长标题使列过宽
+MAX_COLUMN_WIDTH = 80
+
+
+def _create_named_styles():
+    """创建报告使用的命名样式"""
+    header = NamedStyle(name=STYLE_HEADER)
+    header.font = Font(bold=True)
+    header.alignment = Alignment(horizontal='center')
+
+    label = NamedStyle(name=STYLE_LABEL)
+    label.font = Font(bold=True)
+
+    warning = NamedStyle(name=STYLE_WARNING)
+    warning.fill = PatternFill(start_color="FFCCCC", end_color="FFCCCC", fill_type="solid")
+
+    percent = NamedStyle(name=STYLE_PERCENT)
+    percent.number_format = '0%'
+
+    return [header, label, warning, percent]
+
+
+def column_width(value):
+    """
+    计算单元格内容对应的列宽，与原先自动调整列宽的规则一致
+
+    参数:
+        value: 单元格的值
+
+    返回:
+        float: 列宽
+    """
+    if value is None or value == "":
+        return 0
+    return (len(str(value)) + 2) * 1.2
+
+
+class ReportSheet:
+    """报告中的一个工作表，按顺序追加行"""
+
+    def __init__(self, title, headers=None, column_styles=None):
+        """
+        参数:
+            title: 工作表名称
+            headers: 表头（可选）
+            column_styles: 列序号（从0开始）到命名样式的映射，应用于该列的所有数据单元格
+        """
+        self.title = title
+        self.column_styles = column_styles or {}
+        self.widths = []
+        self.row_count = 0
+        self._rows = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        if headers:
+            self.append(headers, STYLE_HEADER)
+
+    def append(self, values, style=None):
+        """
+        追加一行
+
+        参数:
+            values: 单元格的值
+            style: 应用于整行的命名样式（可选）
+        """
+        values = list(values)
+        widths = self.widths
+        for col, value in enumerate(values):
+            width = column_width(value)
+            if col >= len(widths):
+                widths.append(width)
+            elif width > widths[col]:
+                widths[col] = width
+        pickle.dump((values, style), self._rows, pickle.HIGHEST_PROTOCOL)
+        self.row_count += 1
+
+    def _iter_rows(self):
+        self._rows.seek(0)
+        while True:
+            try:
+                yield pickle.load(self._rows)
+            except EOFError:
+                return
+
+    def write_to(self, workbook):
+        """将暂存的行写入只写工作簿并释放暂存数据"""
+        sheet = workbook.create_sheet(title=self.title)
+        for col, width in enumerate(self.widths, 1):
+            sheet.column_dimensions[get_column_letter(col)].width = min(width, MAX_COLUMN_WIDTH)
+
+        for values, style in self._iter_rows():
+            if style is None and not self.column_styles:
+                sheet.append(values)
+                continue
+            cells = []
+            for col, value in enumerate(values):
+                cell = WriteOnlyCell(sheet, value=value)
+                cell_style = style or self.column_styles.get(col)
+                if cell_style:
+                    cell.style = cell_style
+                cells.append(cell)
+            sheet.append(cells)
+        self.close()
+
+    def close(self):
+        self._rows.close()
+
+
+class ExcelReport:
+    """流式写入的Excel报告"""
+
+    def __init__(self, path):
+        """
+        参数:
+            path: 报告保存路径
+        """
+        if not EXCEL_AVAILABLE:
+            raise ImportError("缺少openpyxl库，无法导出Excel")
+        self.path = path
+        self.sheets = []
+
+    def add_sheet(self, title, headers=None, column_styles=None):
+        """
+        添加工作表
+
+        参数:
+            title: 工作表名称
+            headers: 表头
+            column_styles: 列序号（从0开始）到命名样式的映射
+
+        返回:
+            ReportSheet: 工作表
+        """
+        sheet = ReportSheet(title, headers, column_styles)
+        self.sheets.append(sheet)
+        return sheet
+
+    def _build(self):
+        workbook = openpyxl.Workbook(write_only=True)
+        for style in _create_named_styles():
+            workbook.add_named_style(style)
+        for sheet in self.sheets:
+            sheet.write_to(workbook)
+        return workbook
+
+    def save(self):
+        """
+        保存报告，原路径无法写入时在文件名后加"_新"另存
+
+        返回:
+            str: 实际保存的路径
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        workbook = self._build()
+        path = self.path
+        if os.path.exists(path) and not os.access(path, os.W_OK):
+            path = self._alternate_path()
+            print(f"! 原文件无法写入，将保存到: {os.path.basename(path)}")
+        try:
+            workbook.save(path)
+        except PermissionError:
+            path = self._alternate_path()
+            print(f"! 保存Excel文件时出现权限错误，尝试保存到: {os.path.basename(path)}")
+            workbook.save(path)
+        return path
+
+    def _alternate_path(self):
+        stem, extension = os.path.splitext(self.path)
+        return f"{stem}_新{extension}"
+
+    def close(self):
+        """丢弃尚未保存的暂存数据"""
+        for sheet in self.sheets:
+            sheet.close()
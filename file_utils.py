@@ -4,6 +4,7 @@
 import os
 import re
 import shutil
+import hashlib
 
 def extract_author_number(filename):
     """从文件名中提取作者数字"""
@@ -109,4 +110,109 @@ def generate_output_filename(author_name, title, suffix_enabled, suffix_text, sh
     if len(filename_base) > max_len:
         filename_base = filename_base[:max_len] + "..."
         
-    return filename_base + ".docx"
\ No newline at end of file
+    return filename_base + ".docx"
+
+def get_cache_dir(name=None):
+    """
+    获取跨运行保留的缓存目录
+
+    可通过环境变量 C_DOC_CACHE_DIR 指定位置，否则Windows使用 %LOCALAPPDATA%\\C-doc，
+    其他系统使用 ~/.cache/C-doc
+
+    参数:
+        name: 子目录名（可选）
+
+    返回:
+        str: 已创建的缓存目录路径
+    """
+    base = os.environ.get("C_DOC_CACHE_DIR")
+    if not base:
+        if os.name == "nt":
+            base = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"), "C-doc")
+        else:
+            base = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "C-doc")
+    path = os.path.join(base, name) if name else base
+    os.makedirs(path, exist_ok=True)
+    return path
+
+# 计算文件内容哈希时的读取块大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def file_content_hash(path):
+    """
+    计算文件内容的SHA-256哈希
+
+    参数:
+        path: 文件路径
+
+    返回:
+        str: 十六进制哈希值
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def save_document_atomic(doc, output_file):
+    """
+    原子地保存文档：先写入同目录下的临时文件再替换，中断时不会留下不完整的输出
+
+    参数:
+        doc: 支持save(path)的文档对象
+        output_file: 输出文件路径
+    """
+    directory, name = os.path.split(os.path.abspath(output_file))
+    temp_file = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    try:
+        doc.save(temp_file)
+        os.replace(temp_file, output_file)
+    finally:
+        if os.path.exists(temp_file):
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+
+def link_or_copy(source, target):
+    """
+    为已有文件在另一位置创建硬链接，文件系统不支持硬链接时复制文件
+
+    参数:
+        source: 已有文件路径
+        target: 目标路径，已存在时被替换
+
+    返回:
+        str: 目标路径
+    """
+    if os.path.abspath(source) == os.path.abspath(target):
+        return target
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    if os.path.exists(target):
+        os.remove(target)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+    return target
+
+def reuse_outputs(sources, source_dir, target_dir):
+    """
+    为内容相同的文件复用已有的输出，保持每个输出在其输出目录中的子文件夹（如"成功文件"）
+
+    参数:
+        sources: 已有的输出文件路径列表
+        source_dir: 已有输出所属文件的输出目录
+        target_dir: 当前文件的输出目录
+
+    返回:
+        list: 新的输出文件路径列表
+    """
+    outputs = []
+    for source in sources:
+        relative = os.path.relpath(source, source_dir)
+        if relative.startswith(os.pardir):
+            # 不在原输出目录中的输出只保留文件名
+            relative = os.path.basename(source)
+        outputs.append(link_or_copy(source, os.path.join(target_dir, relative)))
+    return outputs
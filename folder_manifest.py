@@ -0,0 +1,426 @@
+"""
+提供输入文件夹的文件清单
+
+使用 os.scandir 扫描一次文件夹，记录每个Word文件的大小、修改时间、作者编号和
+作者名、按大小估算的处理开销，内容哈希在首次使用时才计算。清单在文件夹未变化时
+被所有功能复用，无需每个功能各自 os.listdir、过滤扩展名并重新解析文件名。
+
+支持递归扫描子文件夹（按包含/排除通配符过滤，跳过~$临时文件和隐藏文件，
+防止符号链接造成的循环），并可让输出目录保持与输入相同的目录结构。
+还可找出内容完全相同的重复提交，使每组只需处理一次。
+"""
+import os
+import re
+import stat as stat_module
+import fnmatch
+import threading
+
+from file_utils import extract_author_number, extract_author_from_filename, file_content_hash
+
+# 支持的Word文件扩展名
+WORD_EXTENSIONS = ('.doc', '.docx')
+
+# .doc文件需要先转换，按相当于多少字节的.docx估算额外开销
+DOC_CONVERSION_COST = 2 * 1024 * 1024
+
+
+class FileEntry:
+    """文件清单中的一个Word文件"""
+
+    __slots__ = ("name", "path", "size", "mtime_ns", "author_number", "author_name", "_hash", "_hash_stat")
+
+    def __init__(self, name, path, size, mtime_ns):
+        """
+        参数:
+            name: 相对于输入文件夹的文件名
+            path: 文件完整路径
+            size: 文件大小（字节）
+            mtime_ns: 修改时间（纳秒）
+        """
+        self.name = name
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        basename = os.path.basename(name)
+        self.author_number = extract_author_number(basename)
+        self.author_name = extract_author_from_filename(basename)
+        self._hash = None
+        self._hash_stat = None
+
+    @property
+    def extension(self):
+        """小写的文件扩展名"""
+        return os.path.splitext(self.name)[1].lower()
+
+    @property
+    def cost(self):
+        """按文件大小估算的处理开销，用于调度和进度估计"""
+        if self.extension == '.doc':
+            return self.size + DOC_CONVERSION_COST
+        return self.size
+
+    @property
+    def content_hash(self):
+        """文件内容的SHA-256哈希，首次访问时计算，文件变化后重新计算"""
+        stat = os.stat(self.path)
+        key = (stat.st_size, stat.st_mtime_ns)
+        if self._hash is None or self._hash_stat != key:
+            self._hash = file_content_hash(self.path)
+            self._hash_stat = key
+        return self._hash
+
+    def __repr__(self):
+        return f"FileEntry({self.name!r}, size={self.size})"
+
+
+# 默认包含的文件
+DEFAULT_INCLUDE = ('*.doc', '*.docx')
+
+
+def is_word_file(filename):
+    """判断是否为需要处理的Word文件（排除Word生成的~$临时文件）"""
+    return filename.lower().endswith(WORD_EXTENSIONS) and not filename.startswith('~$')
+
+
+def parse_patterns(text):
+    """
+    解析以分号、逗号或空白分隔的通配符列表
+
+    参数:
+        text: 如 "*.docx; 初赛/*"
+
+    返回:
+        tuple: 通配符元组
+    """
+    for separator in (';', ',', '；', '，'):
+        text = text.replace(separator, ' ')
+    return tuple(p for p in text.split() if p)
+
+
+def _compile_patterns(patterns):
+    """将通配符列表编译为一个不区分大小写的正则表达式，大量文件时避免逐个匹配"""
+    if not patterns:
+        return None
+    parts = [fnmatch.translate(p.replace('\\', '/')) for p in patterns]
+    return re.compile("|".join(f"(?:{part})" for part in parts), re.IGNORECASE)
+
+
+def _match_any(relative_path, name, pattern):
+    """相对路径或文件名匹配已编译的通配符"""
+    return bool(pattern.match(name) or pattern.match(relative_path.replace(os.sep, '/')))
+
+
+def _is_hidden(item, stat=None):
+    """判断是否为隐藏文件或文件夹"""
+    if item.name.startswith('.'):
+        return True
+    attributes = getattr(stat, 'st_file_attributes', 0) if stat is not None else 0
+    return bool(attributes & getattr(stat_module, 'FILE_ATTRIBUTE_HIDDEN', 0))
+
+
+def scan_folder(folder, recursive=False, include=None, exclude=None, skip_hidden=True, directories=None):
+    """
+    扫描文件夹中的Word文件，逐个目录产出结果，无需等待整个目录树扫描完成
+
+    每个目录内的文件按作者编号排序，目录按深度优先、名称顺序访问。
+
+    参数:
+        folder: 输入文件夹
+        recursive: 是否扫描子文件夹
+        include: 包含的通配符（匹配文件名或相对路径），默认为*.doc和*.docx
+        exclude: 排除的通配符，匹配的文件和文件夹都会被跳过
+        skip_hidden: 是否跳过隐藏文件和文件夹
+        directories: 可选的字典，记录已扫描目录的路径到修改时间，用于判断清单是否过期
+
+    返回:
+        生成器，依次产出 FileEntry
+    """
+    include = _compile_patterns(tuple(include) if include else DEFAULT_INCLUDE)
+    exclude = _compile_patterns(exclude)
+
+    visited = set()
+    stack = [(folder, "")]
+    while stack:
+        directory, relative_dir = stack.pop()
+        try:
+            dir_stat = os.stat(directory)
+        except OSError:
+            continue
+        # 按设备号和inode识别目录，防止符号链接形成循环
+        key = (dir_stat.st_dev, dir_stat.st_ino)
+        if key in visited and key != (0, 0):
+            continue
+        visited.add(key)
+        if directories is not None:
+            directories[directory] = dir_stat.st_mtime_ns
+
+        entries = []
+        subdirectories = []
+        try:
+            iterator = os.scandir(directory)
+        except OSError:
+            continue
+        with iterator:
+            for item in iterator:
+                name = item.name
+                relative = os.path.join(relative_dir, name) if relative_dir else name
+                try:
+                    is_dir = item.is_dir()
+                except OSError:
+                    continue
+
+                if is_dir:
+                    if not recursive:
+                        continue
+                    if skip_hidden and _is_hidden(item, item.stat() if os.name == 'nt' else None):
+                        continue
+                    if exclude and _match_any(relative, name, exclude):
+                        continue
+                    subdirectories.append((item.path, relative))
+                    continue
+
+                if name.startswith('~$') or not _match_any(relative, name, include):
+                    continue
+                if exclude and _match_any(relative, name, exclude):
+                    continue
+                try:
+                    if not item.is_file():
+                        continue
+                    # Windows上scandir已返回大小和修改时间，无需额外的stat调用
+                    stat = item.stat()
+                except OSError:
+                    continue
+                if skip_hidden and _is_hidden(item, stat):
+                    continue
+                entries.append(FileEntry(relative, item.path, stat.st_size, stat.st_mtime_ns))
+
+        entries.sort(key=lambda e: (e.author_number, e.name))
+        yield from entries
+        # 逆序入栈，使子文件夹按名称顺序访问
+        subdirectories.sort(reverse=True)
+        stack.extend(subdirectories)
+
+
+class DuplicateTracker:
+    """
+    逐个登记文件，找出内容完全相同的文件
+
+    只有大小相同的文件才计算内容哈希，大小唯一的文件无需读取。
+    """
+
+    def __init__(self):
+        # 大小 -> 该大小唯一一个尚未计算哈希的条目
+        self._unhashed = {}
+        # 内容哈希 -> 内容相同的条目列表（按登记顺序）
+        self._groups = {}
+
+    def add(self, entry):
+        """
+        登记一个文件
+
+        参数:
+            entry: FileEntry
+
+        返回:
+            list: 之前登记的、与该文件内容完全相同的条目，没有时为空列表
+        """
+        first = self._unhashed.get(entry.size)
+        if first is None and entry.size not in self._unhashed:
+            self._unhashed[entry.size] = entry
+            return []
+        if first is not None:
+            # 出现相同大小的文件，补算之前那个文件的哈希
+            self._unhashed[entry.size] = None
+            self._groups.setdefault(first.content_hash, []).append(first)
+        group = self._groups.setdefault(entry.content_hash, [])
+        earlier = list(group)
+        group.append(entry)
+        return earlier
+
+    def groups(self):
+        """
+        内容完全相同的文件分组
+
+        返回:
+            list: 每组为FileEntry列表，第一个为最先登记的文件
+        """
+        return [group for group in self._groups.values() if len(group) > 1]
+
+
+def mirrored_output_dir(output_dir, name, mirror_output=True):
+    """
+    获取文件对应的输出目录
+
+    参数:
+        output_dir: 输出根目录
+        name: 相对于输入文件夹的文件名
+        mirror_output: 是否保持输入的目录结构
+
+    返回:
+        str: 输出目录
+    """
+    relative_dir = os.path.dirname(name)
+    if mirror_output and relative_dir:
+        return os.path.join(output_dir, relative_dir)
+    return output_dir
+
+
+class FolderManifest:
+    """输入文件夹的Word文件清单，按作者编号排序"""
+
+    def __init__(self, folder, entries, directories, recursive=False):
+        """
+        参数:
+            folder: 输入文件夹
+            entries: FileEntry列表
+            directories: 已扫描目录的路径到修改时间的映射，用于判断清单是否过期
+            recursive: 是否包含子文件夹
+        """
+        self.folder = folder
+        self.recursive = recursive
+        # 递归扫描时保持扫描顺序（按目录分组，目录内按作者编号排序）
+        if recursive:
+            self.entries = list(entries)
+        else:
+            self.entries = sorted(entries, key=lambda e: (e.author_number, e.name))
+        self.directories = directories
+        self._by_name = {entry.name: entry for entry in self.entries}
+
+    @classmethod
+    def build(cls, folder, recursive=False, include=None, exclude=None):
+        """
+        扫描文件夹并创建清单
+
+        需要等待扫描完成：界面操作在开始处理前就要用到文件总数和总大小（进度）、
+        全部文件的估算开销（按开销从大到小提交任务）以及按作者编号的完整顺序。
+        不需要这些信息、希望扫描时即开始处理的调用方（如process_folder）直接迭代scan_folder。
+
+        参数:
+            folder: 输入文件夹
+            recursive: 是否扫描子文件夹
+            include: 包含的通配符
+            exclude: 排除的通配符
+
+        返回:
+            FolderManifest: 文件清单
+        """
+        directories = {}
+        entries = list(scan_folder(folder, recursive, include, exclude, directories=directories))
+        return cls(folder, entries, directories, recursive)
+
+    def is_current(self):
+        """
+        判断清单是否仍与文件夹一致
+
+        各目录修改时间未变说明没有增删文件；文件内容被覆盖时逐个比较大小和修改时间。
+        """
+        for directory, mtime_ns in self.directories.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime_ns:
+                    return False
+            except OSError:
+                return False
+        for entry in self.entries:
+            try:
+                stat = os.stat(entry.path)
+            except OSError:
+                return False
+            if stat.st_size != entry.size or stat.st_mtime_ns != entry.mtime_ns:
+                return False
+        return True
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def names(self):
+        """按作者编号排序的文件名列表"""
+        return [entry.name for entry in self.entries]
+
+    def paths(self):
+        """按作者编号排序的文件路径列表"""
+        return [entry.path for entry in self.entries]
+
+    def total_size(self, names=None):
+        """
+        文件总大小（字节）
+
+        参数:
+            names: 只统计这些文件名（可选）
+        """
+        if names is None:
+            return sum(entry.size for entry in self.entries)
+        return sum(self._by_name[name].size for name in names if name in self._by_name)
+
+    def subset(self, names):
+        """
+        只包含指定文件的清单，保持清单中的顺序
+
+        参数:
+            names: 文件名（如文件列表中勾选的文件）
+
+        返回:
+            FolderManifest: 新的清单
+        """
+        names = set(names)
+        return FolderManifest(self.folder, [e for e in self.entries if e.name in names],
+                              self.directories, self.recursive)
+
+    def get(self, name):
+        """按文件名查找清单条目，不存在时返回None"""
+        return self._by_name.get(name)
+
+    def duplicate_groups(self, names=None):
+        """
+        找出内容完全相同的文件
+
+        参数:
+            names: 只在这些文件中查找，默认为清单中的全部文件
+
+        返回:
+            list: 每组为FileEntry列表，按清单顺序排列
+        """
+        entries = self.entries if names is None else [self._by_name[n] for n in names if n in self._by_name]
+        tracker = DuplicateTracker()
+        for entry in entries:
+            try:
+                tracker.add(entry)
+            except OSError:
+                continue
+        return tracker.groups()
+
+    @property
+    def total_cost(self):
+        """所有文件的估算处理开销"""
+        return sum(entry.cost for entry in self.entries)
+
+
+# 文件夹路径 -> 最近一次创建的清单
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+def get_folder_manifest(folder, recursive=False, include=None, exclude=None, names=None):
+    """
+    获取文件夹的清单，文件夹和扫描选项未变化时复用上次的结果
+
+    参数:
+        folder: 输入文件夹
+        recursive: 是否扫描子文件夹
+        include: 包含的通配符
+        exclude: 排除的通配符
+        names: 只保留这些文件（可选），None表示全部
+
+    返回:
+        FolderManifest: 文件清单
+    """
+    key = (os.path.abspath(folder), bool(recursive), tuple(include or ()), tuple(exclude or ()))
+    with _manifests_lock:
+        manifest = _manifests.get(key)
+    if manifest is None or not manifest.is_current():
+        manifest = FolderManifest.build(folder, recursive, include, exclude)
+        with _manifests_lock:
+            _manifests[key] = manifest
+    return manifest if names is None else manifest.subset(names)
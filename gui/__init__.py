@@ -1,26 +1,44 @@
 """
 Word文档批量处理工具GUI模块
 提供图形用户界面和相关组件
+
+导出的名称在首次访问时才导入对应模块，导入 gui.app 等子模块时
+不会连带导入处理器及其依赖的python-docx、openpyxl等库。
 """
+import importlib
 
-# 导出主应用程序
-from gui.app import App, run_app
+# 导出名称 -> 所在模块
+_EXPORTS = {
+    # 主应用程序
+    'App': 'gui.app',
+    'run_app': 'gui.app',
+    # 框架组件
+    'FileFrame': 'gui.frames.file_frame',
+    'FileListFrame': 'gui.frames.file_list_frame',
+    'FormatFrame': 'gui.frames.format_frame',
+    'WordcountFrame': 'gui.frames.wordcount_frame',
+    'ButtonFrame': 'gui.frames.button_frame',
+    # 处理器
+    'ConversionHandler': 'gui.handlers.conversion_handler',
+    'ImageHandler': 'gui.handlers.image_handler',
+    'WordcountHandler': 'gui.handlers.wordcount_handler',
+    'TitleHandler': 'gui.handlers.title_handler',
+    # 工具
+    'RedirectText': 'gui.utils.redirect_text',
+    'set_window_icon': 'gui.utils.ui_utils',
+    'center_window': 'gui.utils.ui_utils',
+    'create_tooltip': 'gui.utils.ui_utils',
+}
 
-# 导出框架组件
-from gui.frames.file_frame import FileFrame
-from gui.frames.format_frame import FormatFrame
-from gui.frames.wordcount_frame import WordcountFrame
-from gui.frames.button_frame import ButtonFrame
 
-# 导出处理器
-from gui.handlers.conversion_handler import ConversionHandler
-from gui.handlers.image_handler import ImageHandler
-from gui.handlers.wordcount_handler import WordcountHandler
-from gui.handlers.title_handler import TitleHandler
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
 
-# 导出工具
-from gui.utils.redirect_text import RedirectText
-from gui.utils.ui_utils import set_window_icon, center_window, create_tooltip
 
 # 导出主应用类
-__all__ = ['App', 'run_app', 'FileFrame', 'FormatFrame', 'WordcountFrame', 'ButtonFrame', 'ConversionHandler', 'ImageHandler', 'WordcountHandler', 'TitleHandler', 'RedirectText', 'set_window_icon', 'center_window', 'create_tooltip']
\ No newline at end of file
+__all__ = list(_EXPORTS)
@@ -3,8 +3,9 @@ Word文档批量处理工具的主应用程序类
 """
 import os
 import sys
+import importlib
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import messagebox
 import webbrowser
 
 # 使用兼容性模块替代直接导入ttkbootstrap
@@ -12,18 +13,61 @@ from gui.utils.ttk_compat import *  # 导入所有兼容性组件
 
 from gui.frames.file_frame import FileFrame
 from gui.frames.format_frame import FormatFrame
-from gui.frames.wordcount_frame import WordcountFrame
 from gui.frames.button_frame import ButtonFrame
-from gui.handlers.conversion_handler import ConversionHandler
-from gui.handlers.image_handler import ImageHandler
-from gui.handlers.wordcount_handler import WordcountHandler
-from gui.handlers.title_handler import TitleHandler
+from gui.handlers.worker_pool import WorkerPool
 from gui.utils.redirect_text import RedirectText
+from gui.utils.log_sink import LogSink
+from gui.utils.log_model import LogModel
+from gui.utils.log_viewer import LogViewer
+from gui.utils.progress_aggregator import ProgressAggregator, SAMPLE_INTERVAL_MS
 from gui.utils.ui_utils import set_window_icon, center_window, create_tooltip
+from task_events import EventChannel, TaskEvent, TaskResult, detect_level
+
+# 设置选项卡创建之前使用的默认处理线程数
+DEFAULT_THREAD_COUNT = 4
+
+
+class _LazyHandler:
+    """
+    首次访问时才导入并创建处理器
+
+    处理器模块会引入python-docx、openpyxl等较重的库，延迟到第一次使用时导入可以加快启动；
+    窗口显示后工作池会在后台预先导入这些库，因此第一次点击按钮时通常已经导入完毕。
+    """
+
+    def __init__(self, module_name, class_name):
+        """
+        参数:
+            module_name: 处理器模块名
+            class_name: 处理器类名
+        """
+        self.module_name = module_name
+        self.class_name = class_name
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, app, owner=None):
+        if app is None:
+            return self
+        handler_class = getattr(importlib.import_module(self.module_name), self.class_name)
+        handler = handler_class(app)
+        # 保存到实例属性，之后的访问不再经过描述器
+        app.__dict__[self.name] = handler
+        return handler
+
 
 class App:
     """Word文档批量处理工具的主应用程序类"""
     
+    # 处理器（首次使用时创建）
+    conversion_handler = _LazyHandler("gui.handlers.conversion_handler", "ConversionHandler")
+    image_handler = _LazyHandler("gui.handlers.image_handler", "ImageHandler")
+    wordcount_handler = _LazyHandler("gui.handlers.wordcount_handler", "WordcountHandler")
+    title_handler = _LazyHandler("gui.handlers.title_handler", "TitleHandler")
+    report_handler = _LazyHandler("gui.handlers.report_handler", "ReportHandler")
+    corpus_handler = _LazyHandler("gui.handlers.corpus_handler", "CorpusHandler")
+    
     def __init__(self, root):
         """
         初始化应用程序
@@ -45,14 +89,20 @@ class App:
         self.progress_bar = None
         self.status_label = None
         
+        # 处理线程向界面投递事件的通道
+        self.event_channel = EventChannel()
+        
+        # 处理线程更新、界面定时读取的进度汇总
+        self.progress = ProgressAggregator()
+        # 最近一次显示的 (批次编号, 是否进行中)
+        self._progress_shown = (0, False)
+        
         # 创建UI组件
         self._create_widgets()
         
-        # 创建处理器
-        self.conversion_handler = ConversionHandler(self)
-        self.image_handler = ImageHandler(self)
-        self.wordcount_handler = WordcountHandler(self)
-        self.title_handler = TitleHandler(self)
+        # 创建应用程序级共享工作池，窗口显示后在后台预热
+        self.worker_pool = WorkerPool(self.get_worker_count())
+        self.root.after(200, self.worker_pool.start)
         
         # 连接UI事件
         self._connect_events()
@@ -63,6 +113,10 @@ class App:
         # 初始化状态
         self.set_status("就绪")
         
+        # 开始在主线程中轮询处理事件和进度
+        self._poll_events()
+        self._sample_progress()
+        
         # 窗口居中显示
         center_window(self.root, 900, 700)
         
@@ -107,13 +161,20 @@ class App:
         self.notebook = ttk.Notebook(left_frame)
         self.notebook.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
         
-        # 创建各个选项卡内容框架
-        self._create_format_tab()
-        self._create_images_tab()
-        self._create_titles_tab()
-        self._create_wordcount_tab()
-        self._create_properties_tab()  # 文档属性选项卡
-        self._create_settings_tab()
+        # 创建各个选项卡，内容在首次选中（或首次读取其中的设置）时才创建
+        self._pending_tabs = {}
+        self._tab_attributes = {}
+        self._add_tab(" 文档格式 ", self._create_format_tab)
+        self._add_tab(" 图片提取 ", self._create_images_tab, (
+            "preserve_names", "image_format_var", "image_quality_var", "extract_to_folder_var",
+            "concurrent_images_var", "resize_images_var", "max_width_var", "max_height_var"))
+        self._add_tab(" 标题提取 ", self._create_titles_tab, ("include_content",))
+        self._add_tab(" 字数检测 ", self._create_wordcount_tab, ("wordcount_frame",))
+        self._add_tab(" 文档属性 ", self._create_properties_tab, ("author_var", "author_name_var", "company_var"))
+        self._add_tab(" 设置 ", self._create_settings_tab, ("thread_var",))
+        self._add_tab(" 文件列表 ", self._create_file_list_tab, ("file_list_frame",))
+        self.notebook.bind("<<NotebookTabChanged>>", lambda event: self._build_tab(self.notebook.select()))
+        self._build_tab(self.notebook.select())
         
         # 创建状态和控制区域
         controls_frame = ttk.Frame(left_frame)
@@ -210,22 +271,58 @@ class App:
         )
         self.log_text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
-        # 创建重定向文本
-        self.redirect = RedirectText(self.log_text)
+        # 创建重定向文本，完整日志保存在有界的日志模型中
+        self.log_model = LogModel()
+        log_sink = LogSink(self.root, self.log_text, model=self.log_model)
+        log_sink.start()
+        self.redirect = RedirectText(self.log_text, sink=log_sink)
         sys.stdout = self.redirect
         sys.stderr = self.redirect
         
-    def _create_format_tab(self):
-        """创建格式转换选项卡"""
-        format_tab = ttk.Frame(self.notebook, padding=10)
-        self.notebook.add(format_tab, text=" 文档格式 ")
+    def _add_tab(self, text, builder, attributes=()):
+        """
+        添加选项卡，内容延迟创建
         
+        参数:
+            text: 选项卡标题
+            builder: 创建选项卡内容的方法，参数为选项卡框架
+            attributes: 该选项卡创建的属性名，处理器读取这些属性时先创建选项卡
+        """
+        tab = ttk.Frame(self.notebook, padding=10)
+        self.notebook.add(tab, text=text)
+        self._pending_tabs[str(tab)] = (tab, builder)
+        for name in attributes:
+            self._tab_attributes[name] = str(tab)
+    
+    def _build_tab(self, tab_id):
+        """创建尚未创建的选项卡内容"""
+        pending = self._pending_tabs.pop(str(tab_id), None)
+        if pending is not None:
+            tab, builder = pending
+            builder(tab)
+    
+    def __getattr__(self, name):
+        """读取尚未创建的选项卡中的设置时，先创建该选项卡"""
+        tab_attributes = self.__dict__.get("_tab_attributes")
+        tab_id = tab_attributes.get(name) if tab_attributes else None
+        if tab_id is None or tab_id not in self._pending_tabs:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        self._build_tab(tab_id)
+        return self.__dict__[name]
+    
+    def _create_format_tab(self, format_tab):
+        """创建格式转换选项卡"""
         # 设置网格布局
         format_tab.columnconfigure(0, weight=1)
         
         # 创建格式选择框架
         self.format_frame = FormatFrame(format_tab)
         self.format_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=5)
+        # 处理器在第一次点击时才创建
+        self.format_frame.set_corpus_commands(
+            lambda: self.corpus_handler.import_previous_batch(),
+            lambda: self.corpus_handler.clear_corpus()
+        )
         
         # 添加转换说明
         desc_frame = ttk.LabelFrame(format_tab, text="功能说明", padding=10)
@@ -240,11 +337,8 @@ class App:
         )
         desc_text.pack(fill=tk.X, expand=True)
     
-    def _create_images_tab(self):
+    def _create_images_tab(self, images_tab):
         """创建图片提取选项卡"""
-        images_tab = ttk.Frame(self.notebook, padding=10)
-        self.notebook.add(images_tab, text=" 图片提取 ")
-        
         # 设置网格布局
         images_tab.columnconfigure(0, weight=1)
         images_tab.columnconfigure(1, weight=1)
@@ -366,6 +460,16 @@ class App:
             )
         image_help.grid(row=1, column=0, sticky=tk.W, pady=2)
         
+        # 并发提取选项
+        self.concurrent_images_var = tk.BooleanVar(value=True)
+        concurrent_check = ttk.Checkbutton(
+            extract_options_frame,
+            text="并发提取(多文档并行读取和写入)",
+            variable=self.concurrent_images_var
+        )
+        concurrent_check.grid(row=3, column=0, sticky=tk.W, pady=5)
+        create_tooltip(concurrent_check, "选中时并行读取多个文档，并使用独立线程写入图片，适合U盘或网络存储")
+        
         # 添加图片大小限制选项
         self.resize_images_var = tk.BooleanVar(value=False)
         if TTKBOOTSTRAP_AVAILABLE:
@@ -409,11 +513,8 @@ class App:
         )
         height_spin.grid(row=0, column=3, padx=5)
     
-    def _create_titles_tab(self):
+    def _create_titles_tab(self, titles_tab):
         """创建标题提取选项卡"""
-        titles_tab = ttk.Frame(self.notebook, padding=10)
-        self.notebook.add(titles_tab, text=" 标题提取 ")
-        
         # 设置网格布局
         titles_tab.columnconfigure(0, weight=1)
         
@@ -444,23 +545,18 @@ class App:
         content_check.pack(anchor=tk.W, pady=5)
         create_tooltip(content_check, "选中时将包含文档正文的前100个字符作为摘要")
     
-    def _create_wordcount_tab(self):
+    def _create_wordcount_tab(self, wordcount_tab):
         """创建字数检测选项卡"""
-        wordcount_tab = ttk.Frame(self.notebook, padding=10)
-        self.notebook.add(wordcount_tab, text=" 字数检测 ")
-        
         # 设置网格布局
         wordcount_tab.columnconfigure(0, weight=1)
         
-        # 创建字数检测框架
+        # 创建字数检测框架（报告格式选项会引入openpyxl，在此处才导入）
+        from gui.frames.wordcount_frame import WordcountFrame
         self.wordcount_frame = WordcountFrame(wordcount_tab)
         self.wordcount_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=5)
     
-    def _create_properties_tab(self):
+    def _create_properties_tab(self, properties_tab):
         """创建文档属性选项卡"""
-        properties_tab = ttk.Frame(self.notebook, padding=10)
-        self.notebook.add(properties_tab, text=" 文档属性 ")
-        
         # 设置网格布局
         properties_tab.columnconfigure(0, weight=1)
         
@@ -513,11 +609,8 @@ class App:
         )
         desc_text.pack(fill=tk.X, expand=True)
     
-    def _create_settings_tab(self):
+    def _create_settings_tab(self, settings_tab):
         """创建设置选项卡"""
-        settings_tab = ttk.Frame(self.notebook, padding=10)
-        self.notebook.add(settings_tab, text=" 设置 ")
-        
         # 设置网格布局
         settings_tab.columnconfigure(0, weight=1)
         
@@ -531,7 +624,7 @@ class App:
         thread_label = ttk.Label(perf_frame, text="处理线程数:")
         thread_label.grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
         
-        self.thread_var = tk.IntVar(value=4)
+        self.thread_var = tk.IntVar(value=DEFAULT_THREAD_COUNT)
         thread_spin = ttk.Spinbox(
             perf_frame,
             from_=1,
@@ -542,6 +635,27 @@ class App:
         thread_spin.grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
         create_tooltip(thread_spin, "设置处理文档时使用的线程数，数值越大处理速度越快，但会占用更多系统资源")
 
+    def _create_file_list_tab(self, file_list_tab):
+        """创建文件列表选项卡"""
+        # 设置网格布局
+        file_list_tab.columnconfigure(0, weight=1)
+        file_list_tab.rowconfigure(0, weight=1)
+
+        # 文件列表在后台扫描输入文件夹，各功能只处理勾选的文件
+        from gui.frames.file_list_frame import FileListFrame
+        self.file_list_frame = FileListFrame(file_list_tab, self.file_frame, self.worker_pool)
+        self.file_list_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+
+        desc_text = ttk.Label(
+            file_list_tab,
+            text="格式转换、图片提取、标题提取、字数检测和完整报告都只处理勾选的文件。\n"
+                 "单击勾选文件，按住Shift单击可勾选一段连续的文件；单击列标题排序。\n"
+                 "字数和标题来自已有的分析结果，点击\"分析字数\"可补全尚未分析的文件。",
+            wraplength=700,
+            justify=tk.LEFT
+        )
+        desc_text.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=5)
+
     def _setup_keyboard_shortcuts(self):
         """设置键盘快捷键"""
         # 全局快捷键
@@ -557,6 +671,7 @@ class App:
         self.root.bind("<Control-i>", self._shortcut_extract_images)  # Ctrl+I提取图片
         self.root.bind("<Control-t>", self._shortcut_extract_titles)  # Ctrl+T提取标题
         self.root.bind("<Control-w>", self._shortcut_check_wordcount)  # Ctrl+W检测字数
+        self.root.bind("<Control-r>", self._shortcut_full_report)  # Ctrl+R完整报告
         self.root.bind("<Control-l>", self._shortcut_clear_log)  # Ctrl+L清空日志
         
     def _shortcut_open_input(self, event=None):
@@ -587,10 +702,15 @@ class App:
         if not self.processing:
             self.wordcount_handler.check_wordcount()
             
+    def _shortcut_full_report(self, event=None):
+        """快捷键：生成完整报告"""
+        if not self.processing:
+            self.report_handler.generate_full_report()
+            
     def _shortcut_clear_log(self, event=None):
         """快捷键：清空日志"""
         if self.log_text:
-            self.log_text.delete(1.0, tk.END)
+            self.redirect.sink.clear()
             self.set_status("日志已清空")
             
     def _show_shortcuts_help(self, event=None):
@@ -607,6 +727,7 @@ class App:
   Ctrl+I - 提取图片
   Ctrl+T - 提取标题
   Ctrl+W - 检测字数
+  Ctrl+R - 生成完整报告
   
 界面导航:
   Ctrl+1 - 切换到"文档格式"选项卡
@@ -626,15 +747,68 @@ class App:
     def _connect_events(self):
         """连接UI事件与处理函数"""
         # 连接按钮事件
-        self.button_frame.set_command("convert", self.conversion_handler.start_conversion)
-        self.button_frame.set_command("pack_error", self.conversion_handler.pack_error_files)
-        self.button_frame.set_command("extract_images", self.image_handler.extract_images)
-        self.button_frame.set_command("extract_titles", self.title_handler.extract_titles)
-        self.button_frame.set_command("check_wordcount", self.wordcount_handler.check_wordcount)
+        # 处理器在第一次点击时才创建
+        self.button_frame.set_command("convert", lambda: self.conversion_handler.start_conversion())
+        self.button_frame.set_command("pack_error", lambda: self.conversion_handler.pack_error_files())
+        self.button_frame.set_command("extract_images", lambda: self.image_handler.extract_images())
+        self.button_frame.set_command("extract_titles", lambda: self.title_handler.extract_titles())
+        self.button_frame.set_command("check_wordcount", lambda: self.wordcount_handler.check_wordcount())
+        self.button_frame.set_command("full_report", lambda: self.report_handler.generate_full_report())
+        self.button_frame.set_command("resume_batch", lambda: self.conversion_handler.resume_last_batch())
         
         # 连接窗口关闭事件
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
     
+    def log(self, message, level=None):
+        """
+        从任意线程向日志区域追加一条消息
+        
+        参数:
+            message: 日志文本
+            level: 事件级别，默认根据前缀推断
+        """
+        self.event_channel.put(TaskEvent(None, "", level or detect_level(message), message))
+    
+    def _dispatch_events(self):
+        """在主线程中分发事件通道中积压的事件和任务结果"""
+        for item in self.event_channel.drain():
+            if isinstance(item, TaskResult):
+                self.redirect.record_result(item)
+            else:
+                self.redirect.handle_event(item)
+    
+    def _poll_events(self):
+        """定时处理事件通道"""
+        try:
+            self._dispatch_events()
+        finally:
+            self.root.after(100, self._poll_events)
+    
+    def _sample_progress(self):
+        """定时读取进度汇总，更新进度条和状态栏"""
+        try:
+            snapshot = self.progress.snapshot()
+            # 批次结束后只再更新一次进度条，结束状态由处理器设置
+            state = (snapshot.generation, snapshot.active)
+            if snapshot.active or state != self._progress_shown:
+                self._progress_shown = state
+                self.progress_bar.configure(maximum=max(snapshot.total_files, 1), value=snapshot.done_files)
+                if snapshot.active:
+                    self.set_status(self.progress.format(snapshot))
+        finally:
+            self.root.after(SAMPLE_INTERVAL_MS, self._sample_progress)
+    
+    def get_worker_count(self):
+        """获取设置中的处理线程数（需在主线程中调用）"""
+        # 设置选项卡尚未创建时使用默认值，不为此提前创建选项卡
+        thread_var = self.__dict__.get("thread_var")
+        if thread_var is None:
+            return DEFAULT_THREAD_COUNT
+        try:
+            return max(1, int(thread_var.get()))
+        except (ValueError, tk.TclError):
+            return os.cpu_count() or 1
+    
     def set_status(self, message):
         """
         设置状态信息
@@ -649,12 +823,14 @@ class App:
         """准备开始处理"""
         self.processing = True
         self.progress_bar.configure(value=0)
-        self.log_text.delete(1.0, tk.END)
+        self.redirect.sink.clear()
         self.button_frame.enable_buttons(False)
         
     def enable_buttons(self):
         """启用按钮"""
         self.processing = False
+        # 确保所有任务结果都已记录
+        self._dispatch_events()
         error_files = self.redirect.get_error_files() if self.redirect else []
         self.button_frame.enable_buttons(True, len(error_files) > 0)
         
@@ -670,8 +846,8 @@ class App:
         参数:
             error_message: 错误信息
         """
-        self.log_text.insert('end', f"\n\n错误: {error_message}\n")
-        self.log_text.see('end')
+        self._dispatch_events()
+        self.log(f"\n\n错误: {error_message}\n")
         self.set_status(f"处理出错: {error_message}")
         self.enable_buttons()
         
@@ -681,9 +857,19 @@ class App:
             if not messagebox.askokcancel("确认退出", "任务正在进行中，确定要退出吗？"):
                 return
         
-        # 恢复标准输出和错误输出
+        # 恢复标准输出和错误输出，停止日志刷新
         sys.stdout = sys.__stdout__
         sys.stderr = sys.__stderr__
+        self.redirect.sink.stop()
+        self.log_model.close()
+        
+        # 停止当前转换并同步批次日志，下次可继续（未使用过转换功能时无需处理）
+        conversion_handler = self.__dict__.get("conversion_handler")
+        if conversion_handler is not None:
+            conversion_handler.stop()
+        
+        # 关闭共享工作池
+        self.worker_pool.shutdown()
         
         # 销毁窗口
         self.root.destroy()
@@ -703,73 +889,10 @@ class App:
         messagebox.showinfo("关于", about_text)
 
     def _open_log_window(self):
-        """在新窗口中查看日志"""
-        log_window = tk.Toplevel(self.root)
-        log_window.title("查看日志")
-        log_window.minsize(800, 600)
-        
-        log_frame = ttk.Frame(log_window, padding=10)
-        log_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # 创建工具栏框架
-        toolbar_frame = ttk.Frame(log_frame)
-        toolbar_frame.pack(fill=tk.X, pady=(0, 5))
-        
-        # 添加复制按钮
-        if TTKBOOTSTRAP_AVAILABLE:
-            copy_btn = ttk.Button(toolbar_frame, text="复制全部", 
-                                  command=lambda: self._copy_log_to_clipboard(log_text),
-                                  bootstyle="info-outline")
-        else:
-            copy_btn = ttk.Button(toolbar_frame, text="复制全部", 
-                                  command=lambda: self._copy_log_to_clipboard(log_text))
-        copy_btn.pack(side=tk.LEFT, padx=5)
-        
-        # 添加保存按钮
-        if TTKBOOTSTRAP_AVAILABLE:
-            save_btn = ttk.Button(toolbar_frame, text="保存日志", 
-                                 command=lambda: self._save_log_to_file(log_text),
-                                 bootstyle="info-outline")
-        else:
-            save_btn = ttk.Button(toolbar_frame, text="保存日志", 
-                                 command=lambda: self._save_log_to_file(log_text))
-        save_btn.pack(side=tk.LEFT, padx=5)
-        
-        # 创建日志文本框
-        log_text = ScrolledText(
-            log_frame,
-            wrap=tk.WORD, 
-            width=100, 
-            height=30, 
-            font=("Consolas", 10)
-        )
-        log_text.pack(fill=tk.BOTH, expand=True)
-        
-        # 插入主窗口中的日志内容
-        log_text.insert(tk.END, self.log_text.get(1.0, tk.END))
-        
-        # 居中显示窗口
-        center_window(log_window, 800, 600)
-        
-    def _copy_log_to_clipboard(self, log_text):
-        """复制日志内容到剪贴板"""
-        self.root.clipboard_clear()
-        self.root.clipboard_append(log_text.get(1.0, tk.END))
-        self.set_status("日志已复制到剪贴板")
-        
-    def _save_log_to_file(self, log_text):
-        """保存日志到文件"""
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".log",
-            filetypes=[("日志文件", "*.log"), ("文本文件", "*.txt"), ("所有文件", "*.*")]
-        )
-        if file_path:
-            try:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(log_text.get(1.0, tk.END))
-                self.set_status(f"日志已保存到 {file_path}")
-            except Exception as e:
-                messagebox.showerror("保存错误", f"保存日志时出错：{str(e)}")
+        """在新窗口中查看完整日志，只渲染可见的行，可按级别和文件名筛选"""
+        # 先写出尚在队列中的日志
+        self.redirect.sink.flush()
+        LogViewer(self.root, self.log_model, self.set_status)
 
 def run_app():
     """运行应用程序"""
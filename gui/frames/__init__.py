@@ -1,11 +1,27 @@
 """
 Word文档批量处理工具 - GUI框架组件包
 
-提供各种UI框架组件
+提供各种UI框架组件（首次访问时才导入）
 """
-from gui.frames.file_frame import FileFrame
-from gui.frames.format_frame import FormatFrame
-from gui.frames.wordcount_frame import WordcountFrame
-from gui.frames.button_frame import ButtonFrame
+import importlib
 
-__all__ = ['FileFrame', 'FormatFrame', 'WordcountFrame', 'ButtonFrame']
\ No newline at end of file
+# 导出名称 -> 所在模块
+_EXPORTS = {
+    'FileFrame': 'gui.frames.file_frame',
+    'FileListFrame': 'gui.frames.file_list_frame',
+    'FormatFrame': 'gui.frames.format_frame',
+    'WordcountFrame': 'gui.frames.wordcount_frame',
+    'ButtonFrame': 'gui.frames.button_frame',
+}
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = list(_EXPORTS)
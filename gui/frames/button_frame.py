@@ -33,6 +33,8 @@ class ButtonFrame(ttk.Frame):
         self.extract_images_btn = None
         self.extract_titles_btn = None
         self.check_wordcount_btn = None
+        self.full_report_btn = None
+        self.resume_batch_btn = None
         
         # 创建界面组件
         self._create_widgets()
@@ -46,6 +48,8 @@ class ButtonFrame(ttk.Frame):
             'images': '🖼️',       # 图片图标
             'titles': '📑',       # 标题图标
             'wordcount': '📊',    # 统计图标
+            'resume': '⏯️',       # 继续图标
+            'report': '📋',       # 报告图标
             'settings': '⚙️'      # 设置图标
         }
         
@@ -140,12 +144,46 @@ class ButtonFrame(ttk.Frame):
         self.check_wordcount_btn.pack(side=tk.LEFT, padx=5)
         create_tooltip(self.check_wordcount_btn, "检测所有文档的字数")
         
+        # 完整报告按钮
+        if TTKBOOTSTRAP_AVAILABLE:
+            self.full_report_btn = ttk.Button(
+                self, 
+                text=f"{icons['report']} 完整报告",
+                bootstyle=f"secondary-outline", 
+                width=12
+            )
+        else:
+            self.full_report_btn = ttk.Button(
+                self, 
+                text=f"{icons['report']} 完整报告",
+                width=12
+            )
+        self.full_report_btn.pack(side=tk.LEFT, padx=5)
+        create_tooltip(self.full_report_btn, "扫描一次，生成包含标题、作者、字数、图片和转换状态的完整报告")
+        
+        # 继续上次批次按钮
+        if TTKBOOTSTRAP_AVAILABLE:
+            self.resume_batch_btn = ttk.Button(
+                self, 
+                text=f"{icons['resume']} 继续上次",
+                bootstyle=f"{self.bootstyle}-outline", 
+                width=12
+            )
+        else:
+            self.resume_batch_btn = ttk.Button(
+                self, 
+                text=f"{icons['resume']} 继续上次",
+                width=12
+            )
+        self.resume_batch_btn.pack(side=tk.LEFT, padx=5)
+        create_tooltip(self.resume_batch_btn, "继续上次被中断的转换，跳过已完成的文件")
+        
     def set_command(self, button_name, command):
         """
         设置按钮的命令
         
         参数:
-            button_name: 按钮名称 (convert, pack_error, extract_images, extract_titles, check_wordcount)
+            button_name: 按钮名称 (convert, pack_error, extract_images, extract_titles, check_wordcount, full_report, resume_batch)
             command: 要绑定的命令
         """
         button_map = {
@@ -153,7 +191,9 @@ class ButtonFrame(ttk.Frame):
             'pack_error': self.pack_error_btn,
             'extract_images': self.extract_images_btn,
             'extract_titles': self.extract_titles_btn,
-            'check_wordcount': self.check_wordcount_btn
+            'check_wordcount': self.check_wordcount_btn,
+            'full_report': self.full_report_btn,
+            'resume_batch': self.resume_batch_btn
         }
         
         if button_name in button_map and button_map[button_name]:
@@ -173,6 +213,8 @@ class ButtonFrame(ttk.Frame):
         self.extract_images_btn.state(state)
         self.extract_titles_btn.state(state)
         self.check_wordcount_btn.state(state)
+        self.full_report_btn.state(state)
+        self.resume_batch_btn.state(state)
         
         # 打包错误文件按钮只在有错误文件时启用
         if enable_all and error_files_exist:
@@ -22,6 +22,9 @@ class FileFrame(ttk.LabelFrame):
         self.suffix_text = tk.StringVar(
             value="——福州大学先进制造学院与海洋学院关工委2023年'中华魂'（毛泽东伟大精神品格）主题教育征文"
         )
+        self.recursive = tk.BooleanVar(value=False)
+        self.mirror_output = tk.BooleanVar(value=True)
+        self.exclude_text = tk.StringVar(value="")
         
         # 设置网格布局
         self.columnconfigure(0, weight=0)  # 标签列不伸展
@@ -99,6 +102,30 @@ class FileFrame(ttk.LabelFrame):
         )
         suffix_check.grid(row=3, column=2, pady=5)
         
+        # 子文件夹扫描选项
+        scan_label = ttk.Label(self, text="排除文件:")
+        scan_label.grid(row=4, column=0, sticky=tk.W, pady=5)
+        
+        exclude_entry = ttk.Entry(self, textvariable=self.exclude_text, width=50)
+        exclude_entry.grid(row=4, column=1, padx=5, sticky=(tk.W, tk.E), pady=5)
+        create_tooltip(exclude_entry, "要跳过的文件或文件夹，支持通配符，多个用分号分隔，例如：草稿; *备份*")
+        
+        recursive_check = ttk.Checkbutton(
+            self, 
+            text="包含子文件夹", 
+            variable=self.recursive,
+        )
+        recursive_check.grid(row=4, column=2, pady=5)
+        create_tooltip(recursive_check, "同时处理输入文件夹下各级子文件夹中的Word文件（跳过隐藏文件和~$临时文件）")
+        
+        mirror_check = ttk.Checkbutton(
+            self, 
+            text="输出保持目录结构", 
+            variable=self.mirror_output,
+        )
+        mirror_check.grid(row=4, column=3, padx=5, pady=5)
+        create_tooltip(mirror_check, "包含子文件夹时，在输出文件夹中按输入的子文件夹结构分别保存结果")
+        
         # 添加拖放支持
         self._setup_drag_drop(input_entry)
         self._setup_drag_drop(output_entry)
@@ -169,4 +196,56 @@ class FileFrame(ttk.LabelFrame):
         return {
             "enabled": self.suffix_enabled.get(),
             "text": self.suffix_text.get() if self.suffix_enabled.get() else ""
-        }
\ No newline at end of file
+        }
+    
+    def get_scan_options(self):
+        """获取输入文件夹的扫描选项，可直接传给get_folder_manifest"""
+        from folder_manifest import parse_patterns
+        return {
+            "recursive": self.recursive.get(),
+            "exclude": parse_patterns(self.exclude_text.get())
+        }
+    
+    def get_mirror_output(self):
+        """获取输出是否保持输入的目录结构"""
+        return self.recursive.get() and self.mirror_output.get()
+    
+    def get_source_dir(self):
+        """获取输入文件夹（不验证）"""
+        return self.input_path.get().strip()
+    
+    def get_output_dir(self):
+        """获取输出文件夹（不验证）"""
+        return self.output_path.get().strip()
+    
+    def attach_file_list(self, file_list):
+        """
+        关联文件列表，之后get_selected_files返回其中勾选的文件
+        
+        参数:
+            file_list: FileListFrame文件列表
+        """
+        self.file_list = file_list
+    
+    def get_selected_files(self, subset_only=False):
+        """
+        获取要处理的文件
+        
+        参数:
+            subset_only: 为True时，若没有在文件列表中只勾选部分文件则返回None
+        
+        返回:
+            list: 相对于输入文件夹的文件名，按作者编号排序；
+                  文件列表未按当前文件夹和扫描选项加载完成时返回文件夹中的全部文件
+        """
+        source_dir = self.get_source_dir()
+        scan_options = self.get_scan_options()
+        file_list = getattr(self, "file_list", None)
+        if file_list is not None and file_list.is_current(source_dir, scan_options):
+            if subset_only and not file_list.has_subset_selection():
+                return None
+            return file_list.get_selected_files()
+        if subset_only or not os.path.isdir(source_dir):
+            return None
+        from folder_manifest import get_folder_manifest
+        return get_folder_manifest(source_dir, **scan_options).names()
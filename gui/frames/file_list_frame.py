@@ -0,0 +1,456 @@
+"""
+提供虚拟化的文件列表界面组件
+
+表格控件只包含当前可见的若干行，滚动、排序和勾选都在内存中的行数据上进行，
+再用可见范围内的数据更新这些行，因此打开包含上万个文件的文件夹也不会卡顿。
+文件夹扫描、从分析缓存读取字数和标题、读取转换状态都在后台线程中进行，
+结果通过队列交给主线程，随到随显示。
+"""
+import os
+import queue
+import threading
+import tkinter as tk
+
+from gui.utils.ttk_compat import *  # 导入兼容性组件
+from gui.utils.ui_utils import create_tooltip
+
+# 列定义：(列名, 标题, 宽度)
+COLUMNS = (
+    ("selected", "选择", 40),
+    ("name", "文件名", 220),
+    ("author", "作者", 80),
+    ("size", "大小(KB)", 70),
+    ("word_count", "字数", 60),
+    ("title", "标题", 240),
+    ("status", "状态", 70),
+)
+
+# 勾选状态的显示符号
+CHECKED = "☑"
+UNCHECKED = "☐"
+
+# 后台线程每处理多少个文件向界面提交一次结果
+BATCH_SIZE = 500
+
+# 读取后台结果的间隔（毫秒）
+POLL_INTERVAL_MS = 100
+
+# 扫描选项变化后多久重新扫描（毫秒）
+RELOAD_DELAY_MS = 500
+
+# Shift键在事件状态中的标志位
+SHIFT_MASK = 0x0001
+
+
+class FileRow:
+    """文件列表中的一行"""
+
+    __slots__ = ("entry", "word_count", "title", "status")
+
+    def __init__(self, entry):
+        self.entry = entry
+        self.word_count = None
+        self.title = None
+        self.status = None
+
+
+def _sequential_map(func, items):
+    """未提供工作池时逐个执行，产出格式同WorkerPool.map_unordered"""
+    for index, item in enumerate(items):
+        try:
+            yield index, item, func(item), None
+        except Exception as e:
+            yield index, item, None, e
+
+
+class FileListFrame(ttk.LabelFrame):
+    """文件列表框架，显示输入文件夹中的Word文件并选择要处理的文件"""
+
+    def __init__(self, parent, file_frame, worker_pool=None):
+        """
+        初始化文件列表框架
+
+        参数:
+            parent: 父组件
+            file_frame: 提供输入、输出文件夹和扫描选项的FileFrame
+            worker_pool: 分析文档使用的共享工作池（可选）
+        """
+        super().__init__(parent, text="文件列表", padding="10")
+        self.file_frame = file_frame
+        self.worker_pool = worker_pool
+
+        # 行数据（按作者编号排序），显示顺序为rows中的位置列表
+        self.rows = []
+        self._order = []
+        # 已勾选的行位置
+        self._selected = set()
+        # Shift多选的起点（rows中的位置）
+        self._anchor = None
+        self._top = 0
+        self._sort_column = None
+        self._sort_reverse = False
+
+        # 当前列表对应的输入文件夹和扫描选项
+        self.source_dir = None
+        self.scan_options = None
+        self.loaded = False
+
+        # 后台线程的结果队列，带批次编号以丢弃过期结果
+        self._results = queue.Queue()
+        self._generation = 0
+        self._poll_id = None
+        self._reload_id = None
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+        self._create_widgets()
+
+        # 文件夹或扫描选项变化时重新扫描
+        file_frame.attach_file_list(self)
+        for var in (file_frame.input_path, file_frame.output_path, file_frame.recursive, file_frame.exclude_text):
+            var.trace_add("write", lambda *args: self.schedule_reload())
+        self.reload()
+
+    def _create_widgets(self):
+        """创建界面组件"""
+        toolbar = ttk.Frame(self)
+        toolbar.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+
+        refresh_btn = ttk.Button(toolbar, text="刷新", command=self.reload, width=6)
+        refresh_btn.pack(side=tk.LEFT, padx=(0, 5))
+        create_tooltip(refresh_btn, "重新扫描输入文件夹")
+        ttk.Button(toolbar, text="全选", command=self.select_all, width=6).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="全不选", command=self.select_none, width=6).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="反选", command=self.invert_selection, width=6).pack(side=tk.LEFT, padx=5)
+        analyze_btn = ttk.Button(toolbar, text="分析字数", command=self.analyze_missing, width=8)
+        analyze_btn.pack(side=tk.LEFT, padx=5)
+        create_tooltip(analyze_btn, "分析尚未缓存的文档，补全字数和标题")
+
+        self.count_label = ttk.Label(toolbar, text="")
+        self.count_label.pack(side=tk.RIGHT, padx=5)
+
+        # 表格只包含可见的行，滚动由独立的滚动条控制
+        self.tree = ttk.Treeview(self, columns=[c[0] for c in COLUMNS], show="headings",
+                                 selectmode="none", height=15)
+        for name, heading, width in COLUMNS:
+            self.tree.heading(name, text=heading, command=lambda n=name: self.sort_by(n))
+            self.tree.column(name, width=width, stretch=name in ("name", "title"),
+                             anchor=tk.CENTER if name in ("selected", "size", "word_count", "status") else tk.W)
+        self.tree.tag_configure("checked", background="#E8F0FE")
+        self.tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+
+        # 点击勾选，鼠标滚轮和键盘滚动
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<Configure>", lambda event: self._render())
+        self.tree.bind("<MouseWheel>", lambda event: self._scroll(-3 if event.delta > 0 else 3))
+        self.tree.bind("<Button-4>", lambda event: self._scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self._scroll(3))
+        self.tree.bind("<Prior>", lambda event: self._scroll(-self._visible_rows()))
+        self.tree.bind("<Next>", lambda event: self._scroll(self._visible_rows()))
+
+    # ---- 加载 ----
+
+    def schedule_reload(self):
+        """扫描选项变化后延迟重新扫描，避免输入时反复扫描"""
+        if self._reload_id is not None:
+            self.after_cancel(self._reload_id)
+        self._reload_id = self.after(RELOAD_DELAY_MS, self.reload)
+
+    def reload(self):
+        """在后台重新扫描输入文件夹"""
+        self._reload_id = None
+        self._generation += 1
+        self.rows = []
+        self._order = []
+        self._selected = set()
+        self._anchor = None
+        self._top = 0
+        self.loaded = False
+
+        source_dir = self.file_frame.get_source_dir()
+        self.source_dir = source_dir
+        self.scan_options = self.file_frame.get_scan_options()
+        if not source_dir or not os.path.isdir(source_dir):
+            self.count_label.configure(text="请选择输入文件夹")
+            self._render()
+            return
+
+        self.count_label.configure(text="正在扫描...")
+        threading.Thread(
+            target=self._load_thread,
+            args=(self._generation, source_dir, dict(self.scan_options), self.file_frame.get_output_dir()),
+            daemon=True
+        ).start()
+        self._start_polling()
+
+    def _load_thread(self, generation, source_dir, scan_options, output_dir):
+        """后台线程：扫描文件夹，再从分析缓存和转换清单读取每个文件的信息"""
+        from folder_manifest import get_folder_manifest
+        from analysis_cache import get_analysis_cache
+        try:
+            entries = list(get_folder_manifest(source_dir, **scan_options))
+        except OSError as e:
+            self._results.put((generation, "error", str(e)))
+            return
+        self._results.put((generation, "entries", entries))
+
+        # 字数和标题：只使用文件未变化时的缓存结果，不读取文件内容
+        cache = get_analysis_cache()
+        if cache is not None:
+            batch = []
+            for index, entry in enumerate(entries):
+                if generation != self._generation:
+                    return
+                try:
+                    analysis = cache.lookup(entry.path, hash_changed=False)
+                except Exception:
+                    analysis = None
+                if analysis is not None and analysis.get("error") is None:
+                    batch.append((index, analysis["word_count"], analysis["title"]))
+                if len(batch) >= BATCH_SIZE:
+                    self._results.put((generation, "analysis", batch))
+                    batch = []
+            self._results.put((generation, "analysis", batch))
+
+        # 转换状态
+        if output_dir and os.path.isdir(output_dir):
+            from conversion_manifest import ConversionManifest
+            manifest = ConversionManifest(output_dir)
+            batch = []
+            for index, entry in enumerate(entries):
+                if generation != self._generation:
+                    return
+                try:
+                    status, _ = manifest.status(entry.path, entry.name)
+                except OSError:
+                    status = "未转换"
+                batch.append((index, status))
+                if len(batch) >= BATCH_SIZE:
+                    self._results.put((generation, "status", batch))
+                    batch = []
+            self._results.put((generation, "status", batch))
+        self._results.put((generation, "done", None))
+
+    def analyze_missing(self):
+        """分析尚无字数信息的文档（结果同时写入分析缓存）"""
+        missing = [index for index, row in enumerate(self.rows) if row.word_count is None]
+        if not missing:
+            return
+        self.count_label.configure(text=f"正在分析 {len(missing)} 个文件...")
+        threading.Thread(target=self._analyze_thread, args=(self._generation, missing), daemon=True).start()
+        self._start_polling()
+
+    def _analyze_thread(self, generation, indices):
+        """后台线程：分析文档并按批提交字数和标题"""
+        from analysis_cache import iter_file_analyses
+        rows = self.rows
+        if self.worker_pool is not None:
+            map_unordered = self.worker_pool.map_unordered
+        else:
+            map_unordered = _sequential_map
+        batch = []
+        for position, _, analysis, _ in iter_file_analyses(
+                [rows[i].entry.path for i in indices], map_unordered,
+                costs=[rows[i].entry.cost for i in indices]):
+            if generation != self._generation:
+                return
+            if analysis.get("error") is None:
+                batch.append((indices[position], analysis["word_count"], analysis["title"]))
+            if len(batch) >= BATCH_SIZE // 10:
+                self._results.put((generation, "analysis", batch))
+                batch = []
+        self._results.put((generation, "analysis", batch))
+        self._results.put((generation, "done", None))
+
+    def _start_polling(self):
+        if self._poll_id is None:
+            self._poll_id = self.after(POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        """在主线程中应用后台线程提交的结果"""
+        self._poll_id = None
+        busy = True
+        changed = False
+        while True:
+            try:
+                generation, kind, data = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self._generation:
+                continue
+            changed = True
+            if kind == "entries":
+                self.rows = [FileRow(entry) for entry in data]
+                self._order = list(range(len(self.rows)))
+                self._selected = set(self._order)
+                self.loaded = True
+                if self._sort_column is not None:
+                    self._apply_sort()
+            elif kind == "analysis":
+                for index, word_count, title in data:
+                    self.rows[index].word_count = word_count
+                    self.rows[index].title = title
+            elif kind == "status":
+                for index, status in data:
+                    self.rows[index].status = status
+            elif kind == "error":
+                self.count_label.configure(text=f"扫描失败: {data}")
+                busy = False
+            elif kind == "done":
+                busy = False
+        if changed:
+            self._render()
+        if busy:
+            self._start_polling()
+
+    # ---- 显示 ----
+
+    def _row_height(self):
+        try:
+            return int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        except (ValueError, tk.TclError):
+            return 20
+
+    def _visible_rows(self):
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return int(self.tree.cget("height"))
+        # 减去表头的高度
+        return max(1, (height - self._row_height() - 4) // self._row_height())
+
+    def _row_values(self, index):
+        row = self.rows[index]
+        entry = row.entry
+        return (
+            CHECKED if index in self._selected else UNCHECKED,
+            entry.name,
+            entry.author_name or "未知",
+            f"{entry.size / 1024:.1f}",
+            "" if row.word_count is None else row.word_count,
+            row.title or "",
+            row.status or "",
+        )
+
+    def _render(self):
+        """用可见范围内的行数据更新表格"""
+        total = len(self._order)
+        rows = self._visible_rows()
+        self._top = min(max(0, self._top), max(0, total - rows))
+        visible = self._order[self._top:self._top + rows]
+
+        items = self.tree.get_children()
+        for iid in items[len(visible):]:
+            self.tree.delete(iid)
+        for position in range(len(items), len(visible)):
+            self.tree.insert("", tk.END, iid=f"row{position}")
+        for position, index in enumerate(visible):
+            self.tree.item(f"row{position}", values=self._row_values(index),
+                           tags=("checked",) if index in self._selected else ())
+
+        if total:
+            self.scrollbar.set(self._top / total, (self._top + len(visible)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+        if self.loaded:
+            self.count_label.configure(text=f"已选 {len(self._selected)} / 共 {total} 个文件")
+
+    def _scroll(self, rows):
+        self._top = max(0, self._top + rows)
+        self._render()
+        return "break"
+
+    def _on_scrollbar(self, action, value, unit=None):
+        """滚动条命令：moveto 比例 或 scroll 数量 units/pages"""
+        if action == "moveto":
+            self._top = int(float(value) * len(self._order))
+            self._render()
+        elif action == "scroll":
+            step = self._visible_rows() if unit == "pages" else 1
+            self._scroll(int(value) * step)
+
+    # ---- 排序和选择 ----
+
+    def sort_by(self, column):
+        """按列排序，再次点击同一列时倒序"""
+        if column == "selected":
+            return
+        if self._sort_column == column:
+            self._sort_reverse = not self._sort_reverse
+        else:
+            self._sort_column, self._sort_reverse = column, False
+        self._apply_sort()
+        self._render()
+
+    def _apply_sort(self):
+        rows = self.rows
+        keys = {
+            "name": lambda i: rows[i].entry.name,
+            "author": lambda i: rows[i].entry.author_name or "",
+            "size": lambda i: rows[i].entry.size,
+            "word_count": lambda i: (rows[i].word_count is None, rows[i].word_count or 0),
+            "title": lambda i: rows[i].title or "",
+            "status": lambda i: rows[i].status or "",
+        }
+        self._order = sorted(range(len(rows)), key=keys[self._sort_column], reverse=self._sort_reverse)
+
+    def _on_click(self, event):
+        """单击切换勾选，按住Shift单击将起点到该行之间设置为相同状态"""
+        if self.tree.identify_region(event.x, event.y) not in ("cell", "tree"):
+            return None
+        iid = self.tree.identify_row(event.y)
+        if not iid:
+            return "break"
+        position = self._top + int(iid[3:])
+        if position >= len(self._order):
+            return "break"
+        index = self._order[position]
+
+        if event.state & SHIFT_MASK and self._anchor is not None and self._anchor in self._order:
+            anchor_position = self._order.index(self._anchor)
+            low, high = sorted((anchor_position, position))
+            indices = self._order[low:high + 1]
+            if self._anchor in self._selected:
+                self._selected.update(indices)
+            else:
+                self._selected.difference_update(indices)
+        else:
+            self._selected.symmetric_difference_update((index,))
+            self._anchor = index
+        self._render()
+        return "break"
+
+    def select_all(self):
+        """勾选全部文件"""
+        self._selected = set(range(len(self.rows)))
+        self._render()
+
+    def select_none(self):
+        """取消勾选全部文件"""
+        self._selected = set()
+        self._render()
+
+    def invert_selection(self):
+        """反选"""
+        self._selected = set(range(len(self.rows))) - self._selected
+        self._render()
+
+    def is_current(self, source_dir, scan_options):
+        """列表是否已按给定的输入文件夹和扫描选项加载完成"""
+        return (self.loaded and self.source_dir == source_dir and
+                self.scan_options == scan_options)
+
+    def get_selected_files(self):
+        """
+        获取勾选的文件
+
+        返回:
+            list: 相对于输入文件夹的文件名，按作者编号排序
+        """
+        return [row.entry.name for index, row in enumerate(self.rows) if index in self._selected]
+
+    def has_subset_selection(self):
+        """是否只勾选了部分文件"""
+        return self.loaded and len(self._selected) < len(self.rows)
@@ -23,6 +23,12 @@ class FormatFrame(ttk.LabelFrame):
         
         # 创建变量
         self.format_var = tk.StringVar(value="default")
+        self.incremental_var = tk.BooleanVar(value=False)
+        self.corpus_check_var = tk.BooleanVar(value=False)
+        
+        # 语料库按钮
+        self.import_corpus_btn = None
+        self.clear_corpus_btn = None
         
         # 设置网格布局
         self.columnconfigure(0, weight=1)
@@ -105,17 +111,66 @@ class FormatFrame(ttk.LabelFrame):
                                "文内一级标题：黑体小三，二级标题：楷体_GB2312小三，三四级标题：仿宋_GB2312小三")
         format_desc.config(state=tk.DISABLED)  # 设为只读
         
+        # 增量转换选项
+        incremental_check = ttk.Checkbutton(
+            self,
+            text="增量转换(跳过未变化且已生成的文件)",
+            variable=self.incremental_var
+        )
+        incremental_check.grid(row=1, column=0, pady=10, sticky=tk.W)
+        create_tooltip(incremental_check, "选中时只处理新增、修改过或转换设置已变化的文件，其余文件沿用上次的输出")
+        
         # 创建预览按钮
         if TTKBOOTSTRAP_AVAILABLE:
             preview_btn = ttk.Button(self, text="预览样式", command=self.preview_format, bootstyle="info-outline", width=10)
         else:
             preview_btn = ttk.Button(self, text="预览样式", command=self.preview_format, width=10)
         preview_btn.grid(row=1, column=0, pady=10, sticky=tk.E)
+        
+        # 往年征文比对分组
+        if TTKBOOTSTRAP_AVAILABLE:
+            corpus_group = ttk.LabelFrame(self, text="往年征文比对", padding=10, bootstyle="info")
+        else:
+            corpus_group = ttk.LabelFrame(self, text="往年征文比对", padding=10)
+        corpus_group.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=5)
+        corpus_group.columnconfigure(0, weight=1)
+        
+        corpus_check = ttk.Checkbutton(
+            corpus_group,
+            text="与往年征文比对(转换的文档将收录到本机语料库)",
+            variable=self.corpus_check_var
+        )
+        corpus_check.grid(row=0, column=0, sticky=tk.W)
+        create_tooltip(corpus_check, "选中时每篇文档转换后与本机语料库中的往年征文比对，列出相似的文档，并将其收录到语料库")
+        
+        if TTKBOOTSTRAP_AVAILABLE:
+            self.import_corpus_btn = ttk.Button(corpus_group, text="导入往年征文...", bootstyle="info-outline", width=14)
+            self.clear_corpus_btn = ttk.Button(corpus_group, text="清空语料库", bootstyle="danger-outline", width=10)
+        else:
+            self.import_corpus_btn = ttk.Button(corpus_group, text="导入往年征文...", width=14)
+            self.clear_corpus_btn = ttk.Button(corpus_group, text="清空语料库", width=10)
+        self.import_corpus_btn.grid(row=0, column=1, padx=5)
+        create_tooltip(self.import_corpus_btn, "将往年某一批征文所在的文件夹收录到本机语料库，无需转换")
+        self.clear_corpus_btn.grid(row=0, column=2, padx=5)
+        create_tooltip(self.clear_corpus_btn, "删除本机语料库中收录的所有征文")
+    
+    def set_corpus_commands(self, import_command, clear_command):
+        """
+        设置语料库按钮的命令
+        
+        参数:
+            import_command: 导入往年征文的命令
+            clear_command: 清空语料库的命令
+        """
+        self.import_corpus_btn.configure(command=import_command)
+        self.clear_corpus_btn.configure(command=clear_command)
     
     def get_format_config(self):
         """获取格式配置"""
         return {
-            "use_chinese_format": self.format_var.get() == "chinese"
+            "use_chinese_format": self.format_var.get() == "chinese",
+            "incremental": self.incremental_var.get(),
+            "corpus_check": self.corpus_check_var.get()
         }
 
     def preview_format(self):
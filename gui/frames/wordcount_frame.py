@@ -7,12 +7,7 @@ import sys
 from gui.utils.ttk_compat import *  # 导入兼容性组件
 from gui.utils.ui_utils import create_tooltip
 
-# 检查是否安装了openpyxl库
-try:
-    import openpyxl
-    EXCEL_AVAILABLE = True
-except ImportError:
-    EXCEL_AVAILABLE = False
+from report_sinks import REPORT_FORMATS, available_formats
 
 class WordcountFrame(ttk.LabelFrame):
     """字数检测设置框架"""
@@ -35,7 +30,10 @@ class WordcountFrame(ttk.LabelFrame):
         self.min_words = tk.IntVar(value=800)  # 最小字数要求
         self.mark_files = tk.BooleanVar(value=True)  # 是否标记不合格文件
         self.move_files = tk.BooleanVar(value=False)  # 是否移动不合格文件
-        self.generate_excel = tk.BooleanVar(value=True)  # 是否生成统计表格
+        self.generate_excel = tk.BooleanVar(value=True)  # 是否生成统计报告
+        # 报告格式，默认为Excel（未安装openpyxl时为CSV）
+        default_format = "excel" if "excel" in available_formats() else "csv"
+        self.report_formats = {name: tk.BooleanVar(value=name == default_format) for name in REPORT_FORMATS}
         self.strict_count = tk.BooleanVar(value=False)  # 是否启用严格字数统计
         
         # 创建界面组件
@@ -199,17 +197,30 @@ class WordcountFrame(ttk.LabelFrame):
         if TTKBOOTSTRAP_AVAILABLE:
             excel_check = ttk.Checkbutton(
                 output_group,
-                text="生成字数统计Excel表格",
+                text="生成统计报告",
                 variable=self.generate_excel
             )
         else:
             excel_check = ttk.Checkbutton(
                 output_group,
-                text="生成字数统计Excel表格",
+                text="生成统计报告",
                 variable=self.generate_excel
             )
         excel_check.pack(anchor=tk.W, pady=5)
-        create_tooltip(excel_check, "选中时将生成包含所有文档字数统计的Excel表格")
+        create_tooltip(excel_check, "选中时将生成包含所有文档字数统计的报告，标题提取和格式转换也使用相同的报告格式")
+        
+        # 报告格式选项
+        formats_frame = ttk.Frame(output_group)
+        formats_frame.pack(anchor=tk.W, padx=20, pady=(0, 5))
+        ttk.Label(formats_frame, text="报告格式:").pack(side=tk.LEFT)
+        available = available_formats()
+        for name, label in REPORT_FORMATS.items():
+            format_check = ttk.Checkbutton(formats_frame, text=label, variable=self.report_formats[name])
+            format_check.pack(side=tk.LEFT, padx=(5, 0))
+            if name not in available:
+                format_check.state(['disabled'])
+                create_tooltip(format_check, "未安装openpyxl，无法生成Excel报告")
+        create_tooltip(formats_frame, "CSV、JSON Lines和SQLite在每个文件处理完成时立即写入，便于其他程序读取")
         
         # 注意事项
         if TTKBOOTSTRAP_AVAILABLE:
@@ -285,6 +296,12 @@ class WordcountFrame(ttk.LabelFrame):
             "min_words": self.min_words.get(),
             "mark_files": self.mark_files.get(),
             "move_files": self.move_files.get(),
-            "generate_excel": self.generate_excel.get() and EXCEL_AVAILABLE,
+            "generate_excel": self.generate_excel.get() and bool(self.get_report_formats()),
+            "report_formats": self.get_report_formats(),
             "strict_count": self.strict_count.get()
-        }
\ No newline at end of file
+        }
+    
+    def get_report_formats(self):
+        """获取选中的报告格式列表"""
+        available = available_formats()
+        return [name for name, var in self.report_formats.items() if var.get() and name in available]
@@ -1,10 +1,25 @@
 """
 Word文档批量处理工具 - 处理器包
 
-提供各种业务逻辑处理器
+提供各种业务逻辑处理器（首次访问时才导入）
 """
-from gui.handlers.conversion_handler import ConversionHandler
-from gui.handlers.image_handler import ImageHandler
-from gui.handlers.wordcount_handler import WordcountHandler
+import importlib
 
-__all__ = ['ConversionHandler', 'ImageHandler', 'WordcountHandler']
\ No newline at end of file
+# 导出名称 -> 所在模块
+_EXPORTS = {
+    'ConversionHandler': 'gui.handlers.conversion_handler',
+    'ImageHandler': 'gui.handlers.image_handler',
+    'WordcountHandler': 'gui.handlers.wordcount_handler',
+}
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = list(_EXPORTS)
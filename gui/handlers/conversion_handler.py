@@ -2,16 +2,23 @@
 提供文件转换相关的业务逻辑处理
 """
 import os
-import threading
 import shutil
+import threading
 import tkinter as tk
-from docx import Document
+from tkinter import messagebox
+from analysis_cache import get_file_analysis
 from word_processors import (
     process_word_file, 
     extract_author_number,
     extract_author_from_filename
 )
-from heading_utils import count_document_words
+from task_events import run_task, TaskResult
+from conversion_manifest import ConversionManifest, conversion_config_hash
+from batch_journal import BatchJournal, load_last_batch
+from folder_manifest import get_folder_manifest, mirrored_output_dir, DuplicateTracker
+from file_utils import reuse_outputs
+from similarity import find_similar_pairs
+from report_sinks import create_report
 
 class ConversionHandler:
     """文件转换处理器，处理文件转换相关的业务逻辑"""
@@ -24,14 +31,18 @@ class ConversionHandler:
             app: 主应用程序实例
         """
         self.app = app
+        # 当前批次的日志和停止标志
+        self.journal = None
+        self._stop_event = threading.Event()
         
-    def validate_paths(self, input_dir, output_dir):
+    def validate_paths(self, input_dir, output_dir, scan_options=None):
         """
         验证输入和输出路径是否有效
         
         参数:
             input_dir: 输入目录
             output_dir: 输出目录
+            scan_options: 输入文件夹的扫描选项
             
         返回:
             tuple: (是否有效, 错误信息)
@@ -44,8 +55,7 @@ class ConversionHandler:
             return False, "输入目录不存在"
             
         # 检查是否有 Word 文件
-        input_files = [f for f in os.listdir(input_dir) if f.endswith(('.doc', '.docx'))]
-        if not input_files:
+        if not len(get_folder_manifest(input_dir, **(scan_options or {}))):
             return False, "输入目录中没有 Word 文件"
             
         return True, ""
@@ -57,8 +67,11 @@ class ConversionHandler:
         input_dir = paths["input_dir"]
         output_dir = paths["output_dir"]
         
+        # 获取扫描选项
+        scan_options = self.app.file_frame.get_scan_options()
+        
         # 验证路径
-        valid, error_msg = self.validate_paths(input_dir, output_dir)
+        valid, error_msg = self.validate_paths(input_dir, output_dir, scan_options)
         if not valid:
             self.app.set_status(error_msg)
             return
@@ -71,6 +84,8 @@ class ConversionHandler:
         # 获取格式配置 - 从新的位置获取各项配置
         format_config = self.app.format_frame.get_format_config()
         use_chinese_format = format_config["use_chinese_format"]
+        incremental = format_config.get("incremental", False)
+        corpus_check = format_config.get("corpus_check", False)
         
         # 从图片提取选项卡获取图片处理选项
         keep_image_position = not hasattr(self.app, 'extract_to_folder_var') or not self.app.extract_to_folder_var.get()
@@ -85,22 +100,112 @@ class ConversionHandler:
         mark_files = wordcount_config["mark_files"]
         move_files = wordcount_config["move_files"]
         
+        config = {
+            "input_dir": input_dir,
+            "output_dir": output_dir,
+            "suffix_enabled": suffix_enabled,
+            "suffix_text": suffix_text,
+            "use_chinese_format": use_chinese_format,
+            "keep_image_position": keep_image_position,
+            "show_author_info": show_author_info,
+            "wordcount_enabled": wordcount_enabled,
+            "min_words": min_words,
+            "mark_files": mark_files,
+            "move_files": move_files,
+            "incremental": incremental,
+            "corpus_check": corpus_check,
+            "scan_options": scan_options,
+            "mirror_output": self.app.file_frame.get_mirror_output(),
+            # 在文件列表中只勾选了部分文件时，只转换这些文件（None表示全部）
+            "selected_files": self.app.file_frame.get_selected_files(subset_only=True),
+            # 转换报告使用字数检测设置中选择的格式
+            "report_formats": wordcount_config["report_formats"] if wordcount_config["generate_excel"] else [],
+        }
+        if config["selected_files"] == []:
+            self.app.set_status("请在文件列表中勾选要转换的文件")
+            return
+        self._start_batch(config)
+    
+    def resume_last_batch(self):
+        """继续上次被中断的转换批次"""
+        state = load_last_batch()
+        if state is None:
+            messagebox.showinfo("继续上次批次", "没有需要继续的转换批次")
+            return
+        
+        config = state.config
+        if not os.path.exists(config.get("input_dir", "")):
+            messagebox.showerror("继续上次批次", f"输入目录不存在：{config.get('input_dir')}")
+            return
+        
+        remaining = state.remaining_files()
+        done_count = len(state.files) - len(remaining)
+        if not messagebox.askokcancel(
+            "继续上次批次",
+            f"上次批次共 {len(state.files)} 个文件，已完成 {done_count} 个，"
+            f"还剩 {len(remaining)} 个（其中 {len(state.in_flight)} 个处理到一半将重新处理）。\n\n"
+            f"输入目录：{config['input_dir']}\n输出目录：{config['output_dir']}\n\n是否继续？"
+        ):
+            return
+        
+        self._start_batch(config, state)
+    
+    def _start_batch(self, config, resume_state=None):
+        """
+        开始或继续一个转换批次
+        
+        参数:
+            config: 批次配置
+            resume_state: 要继续的批次状态，为None时开始新批次
+        """
+        input_dir = config["input_dir"]
+        output_dir = config["output_dir"]
+        use_chinese_format = config["use_chinese_format"]
+        keep_image_position = config["keep_image_position"]
+        show_author_info = config["show_author_info"]
+        wordcount_enabled = config["wordcount_enabled"]
+        min_words = config["min_words"]
+        move_files = config["move_files"]
+        incremental = config.get("incremental", False)
+        corpus_check = config.get("corpus_check", False)
+        
         # 准备开始转换处理
         self.app.reset_for_processing()
         
         # 向用户显示所选配置信息
         format_info = "中文标准格式" if use_chinese_format else "默认格式"
-        self.app.log_text.insert('end', f"使用{format_info}处理文档\n")
+        self.app.log(f"使用{format_info}处理文档\n")
         
         if not show_author_info:
-            self.app.log_text.insert('end', "不添加作者信息\n")
+            self.app.log("不添加作者信息\n")
             
         if keep_image_position:
-            self.app.log_text.insert('end', "保持图片在原文位置\n")
+            self.app.log("保持图片在原文位置\n")
         else:
-            self.app.log_text.insert('end', "所有图片将移至文末\n")
+            self.app.log("所有图片将移至文末\n")
         
-        self.app.log_text.insert('end', "\n开始处理文件...\n\n")
+        if incremental:
+            self.app.log("增量转换：跳过未变化的文件\n")
+        
+        if corpus_check:
+            self.app.log("与本机语料库中的往年征文比对，并收录本批文档\n")
+        
+        # 确定要处理的文件并打开批次日志
+        if resume_state is not None:
+            sorted_files = resume_state.remaining_files()
+            self.app.log(f"继续上次批次：跳过已完成的 {len(resume_state.files) - len(sorted_files)} 个文件\n")
+            journal = BatchJournal.resume(resume_state)
+        else:
+            selected_files = config.get("selected_files")
+            sorted_files = get_folder_manifest(input_dir, names=selected_files,
+                                               **config.get("scan_options", {})).names()
+            if selected_files is not None:
+                self.app.log(f"只转换文件列表中勾选的 {len(sorted_files)} 个文件\n")
+            journal = BatchJournal.create(config, sorted_files)
+        self.journal = journal
+        self._stop_event.clear()
+        
+        self.app.log("\n开始处理文件...\n\n")
         
         # 创建临时目录
         temp_dir = os.path.join(output_dir, "temp")
@@ -114,75 +219,130 @@ class ConversionHandler:
             low_wordcount_dir = os.path.join(output_dir, f"字数不足{min_words}字")
             os.makedirs(low_wordcount_dir, exist_ok=True)
         
-        # 在新线程中运行转换
-        thread = threading.Thread(
-            target=self._conversion_thread, 
-            args=(
-                input_dir, output_dir, temp_dir,
-                suffix_enabled, suffix_text,
-                use_chinese_format, keep_image_position, show_author_info,
-                wordcount_enabled, min_words, mark_files, move_files, low_wordcount_dir # Pass mark_files and move_files
-            ),
-            daemon=True
+        # 在共享工作池的后台线程中运行转换
+        self.app.worker_pool.run_in_background(
+            self._conversion_thread,
+            input_dir, output_dir, temp_dir,
+            config["suffix_enabled"], config["suffix_text"],
+            use_chinese_format, keep_image_position, show_author_info,
+            wordcount_enabled, min_words, config["mark_files"], move_files, low_wordcount_dir, # Pass mark_files and move_files
+            incremental, sorted_files, journal, config.get("mirror_output", False),
+            config.get("scan_options", {}), config.get("report_formats", []),
+            corpus_check
         )
-        thread.start()
+    
+    def stop(self):
+        """请求停止当前批次（处理完当前文件后停止），批次日志保留以便之后继续"""
+        self._stop_event.set()
+        journal, self.journal = self.journal, None
+        if journal is not None:
+            journal.close()
     
     def _conversion_thread(self, input_dir, output_dir, temp_dir,
                           suffix_enabled, suffix_text,
                           use_chinese_format, keep_image_position, show_author_info,
-                          wordcount_enabled, min_words, mark_files, move_files, low_wordcount_dir): # Receive mark_files and move_files
+                          wordcount_enabled, min_words, mark_files, move_files, low_wordcount_dir, # Receive mark_files and move_files
+                          incremental=False, sorted_files=None, journal=None, mirror_output=False,
+                          scan_options=None, report_formats=None, corpus_check=False):
         """转换处理线程"""
+        # 转换清单记录每个源文件的输出，供增量转换使用
+        manifest = ConversionManifest(output_dir)
+        skipped_files = []
+        completed = False
+        # 结束时在主线程中调用的回调（完成或出错），在结束进度汇总之后才投递，
+        # 避免界面在显示结束状态之后又显示进度
+        outcome = None
+        # 内容重复的文件：每组只转换一次，其余文件复用输出
+        duplicates = DuplicateTracker()
+        produced = {}
+        reused_files = []
+        # 字数检测时得到的正文签名，用于在摘要中列出相似文件
+        signatures = {}
+        # 转换报告，每个文件处理完成时写入一行
+        report = result_sheet = None
+        if report_formats:
+            try:
+                report = create_report(os.path.join(output_dir, "转换报告"), "转换报告", report_formats)
+                result_sheet = report.add_sheet("转换结果", ["文件名", "作者", "状态", "输出文件", "错误"])
+            except Exception as e:
+                self.app.log(f"! 转换报告创建失败: {str(e)}\n")
+                report = None
+        
+        # 每个文件处理完成时调用一次：写入报告行并汇总进度
+        def record_row(filename, status, outputs=(), error=None):
+            entry = folder.get(filename)
+            self.app.progress.advance(1, entry.size if entry is not None else 0)
+            if result_sheet is not None:
+                result_sheet.append([
+                    filename, extract_author_from_filename(os.path.basename(filename)) or "未知", status,
+                    "; ".join(os.path.relpath(path, output_dir) for path in outputs), error or ""
+                ])
+        
         try:
             # 获取目录中的所有文件并排序
-            input_files = [f for f in os.listdir(input_dir) if f.endswith(('.doc', '.docx'))]
-            sorted_files = sorted(input_files, key=lambda x: extract_author_number(x))
+            folder = get_folder_manifest(input_dir, **(scan_options or {}))
+            if sorted_files is None:
+                sorted_files = folder.names()
             
             total_files = len(sorted_files)
-            self.app.set_status(f"开始处理，共 {total_files} 个文件...")
             
-            # 配置进度条最大值
-            self.app.root.after(0, lambda: self.app.progress_bar.configure(maximum=total_files))
+            # 开始汇总进度，界面定时读取
+            self.app.progress.start("正在转换文件", total_files, folder.total_size(sorted_files))
             
             # 字数统计结果
             low_wordcount_files = []
             
+            # 处理结果
+            success_files = []
+            error_files = []
+            
             # 处理每个文件
             for index, filename in enumerate(sorted_files, 1):
-                # 更新进度条
-                current_progress = index / total_files * 100
-                self.app.root.after(0, lambda p=index: self.app.progress_bar.configure(value=p))
-                self.app.root.after(0, lambda: self.app.progress_bar.update())
+                # 窗口关闭时停止，剩余文件留待继续
+                if self._stop_event.is_set():
+                    return
                 
-                self.app.set_status(f"正在处理第 {index}/{total_files} 个文件 ({int(current_progress)}%)...")
                 input_file = os.path.join(input_dir, filename)
-                
-                # 设置当前处理的文件
-                self.app.redirect.set_current_file(filename)
+                # 子文件夹中的文件按需输出到对应的子目录
+                file_output_dir = mirrored_output_dir(output_dir, filename, mirror_output)
+                if journal is not None:
+                    journal.mark_started(filename)
+                duplicate_of = self._find_duplicate(duplicates, folder.get(filename), produced)
                 
                 # 如果启用了字数检测，先检查字数
                 word_count = None # Initialize word_count
                 should_process = True # Flag to determine if process_word_file should run
                 if wordcount_enabled:
                     try:
-                        doc = Document(input_file)
-                        word_count = count_document_words(doc)
+                        # 优先使用缓存的分析结果
+                        analysis = get_file_analysis(input_file)
+                        if analysis['error'] is not None:
+                            raise ValueError(analysis['error'])
+                        word_count = analysis['word_count']
+                        if analysis.get('signature'):
+                            signatures[filename] = analysis['signature']
                         
                         # 字数不足
                         if word_count < min_words:
-                            self.app.log_text.insert('end', f"! {filename}: 字数为 {word_count}，不足 {min_words} 字\n")
+                            self.app.log(f"! {filename}: 字数为 {word_count}，不足 {min_words} 字\n")
                             low_wordcount_files.append((filename, word_count))
                             
                             # 如果选择移动字数不足文件到单独文件夹
                             if move_files: # Use move_files instead of wordcount_action
-                                target_file = os.path.join(low_wordcount_dir, filename)
+                                target_file = os.path.join(mirrored_output_dir(low_wordcount_dir, filename, mirror_output),
+                                                           os.path.basename(filename))
+                                os.makedirs(os.path.dirname(target_file), exist_ok=True)
                                 shutil.copy2(input_file, target_file)
                                 should_process = False # Don't process further if moved
+                                record_row(filename, "字数不足已移出", [target_file])
+                                if journal is not None:
+                                    journal.mark_done(filename, True, [target_file])
                                 continue  # 跳过后续处理
                             # Note: Marking logic is handled within process_word_file based on parameters
                         else:
-                            self.app.log_text.insert('end', f"✓ {filename}: 字数为 {word_count}，满足要求\n")
+                            self.app.log(f"✓ {filename}: 字数为 {word_count}，满足要求\n")
                     except Exception as e:
-                        self.app.log_text.insert('end', f"! {filename}: 字数检测失败 - {str(e)}\n")
+                        self.app.log(f"! {filename}: 字数检测失败 - {str(e)}\n")
                 
                 # 根据文件扩展名选择处理方法 (only if not moved)
                 if should_process:
@@ -193,29 +353,150 @@ class ConversionHandler:
                                           mark_files and 
                                           not move_files) # Only mark if enabled, below threshold, marking is on, and not moving
 
-                    process_word_file(
-                        input_file, output_dir, suffix_enabled, suffix_text,
+                    # 增量模式下跳过输出已是最新的文件
+                    config_hash = conversion_config_hash(use_chinese_format, suffix_enabled, suffix_text,
+                                                         show_author_info, keep_image_position,
+                                                         mark_low_wordcount)
+                    outputs = manifest.check(input_file, config_hash, filename) if incremental else None
+                    if outputs:
+                        skipped_files.append(filename)
+                        success_files.append(filename)
+                        produced[filename] = outputs
+                        record_row(filename, "未变化已跳过", outputs)
+                        self.app.event_channel.put(TaskResult(filename, success=True, outputs=outputs))
+                        if journal is not None:
+                            journal.mark_done(filename, True, outputs)
+                        continue
+                    
+                    # 与之前转换过的文件内容和作者都相同时，直接链接或复制其输出
+                    if duplicate_of is not None:
+                        try:
+                            outputs = reuse_outputs(
+                                produced[duplicate_of],
+                                mirrored_output_dir(output_dir, duplicate_of, mirror_output),
+                                file_output_dir
+                            )
+                        except OSError as e:
+                            self.app.log(f"! {filename}: 复用 {duplicate_of} 的输出失败，重新转换 - {str(e)}\n")
+                        else:
+                            self.app.log(f"✓ {filename}: 与 {duplicate_of} 内容完全相同，已复用其输出\n")
+                            reused_files.append(filename)
+                            success_files.append(filename)
+                            produced[filename] = outputs
+                            manifest.record(input_file, config_hash, outputs, filename)
+                            record_row(filename, f"与{duplicate_of}相同已复用", outputs)
+                            self.app.event_channel.put(TaskResult(filename, success=True, outputs=outputs))
+                            if journal is not None:
+                                journal.mark_done(filename, True, outputs)
+                            continue
+                    
+                    # 语料库比对沿用清单中已计算的内容哈希，无需重新读取文件
+                    content_hash = None
+                    entry = folder.get(filename)
+                    if corpus_check and entry is not None:
+                        try:
+                            content_hash = entry.content_hash
+                        except OSError:
+                            pass
+                    
+                    # 在任务上下文中处理，日志和结果按文件归属投递到界面
+                    result = run_task(
+                        process_word_file, filename,
+                        input_file, file_output_dir, suffix_enabled, suffix_text,
                         use_chinese_format, keep_image_position, show_author_info,
-                        mark_low_wordcount=mark_low_wordcount # Pass the marking flag
+                        mark_low_wordcount=mark_low_wordcount, # Pass the marking flag
+                        corpus_check=corpus_check, content_hash=content_hash,
+                        channel=self.app.event_channel
                     )
+                    self.app.event_channel.put(result)
+                    record_row(filename, "成功" if result.success else "失败", result.outputs, result.error)
+                    if journal is not None:
+                        journal.mark_done(filename, result.success, result.outputs, result.error)
+                    if result.success:
+                        success_files.append(filename)
+                        if result.outputs:
+                            produced[filename] = result.outputs
+                            manifest.record(input_file, config_hash, result.outputs, filename)
+                    else:
+                        error_files.append(filename)
+            
+            # 所有文件都已处理，标记批次结束
+            completed = True
+            if journal is not None:
+                journal.finish()
+            
+            # 保存转换报告
+            if report is not None:
+                try:
+                    report_paths = report.save()
+                    self.app.log("\n转换报告已导出至:\n" + "".join(f"{path}\n" for path in report_paths))
+                except Exception as e:
+                    self.app.log(f"\n转换报告导出失败: {str(e)}\n")
             
             # 处理完成后显示统计信息
-            self._show_summary(total_files, low_wordcount_files, wordcount_enabled)
+            self._show_summary(total_files, low_wordcount_files, wordcount_enabled,
+                               success_files, error_files, skipped_files,
+                               duplicates.groups(), reused_files,
+                               find_similar_pairs(signatures.items()))
             
             # 清理临时文件
             self._cleanup_temp_files(temp_dir)
+            outcome = self.app.conversion_complete
             
         except Exception as e:
             # Capture the current value of e using a default argument
-            self.app.root.after(0, lambda err=e: self.app.conversion_error(str(err)))
+            outcome = lambda err=e: self.app.conversion_error(str(err))
+        finally:
+            self.app.progress.finish()
+            manifest.save()
+            if report is not None:
+                report.close()
+            # 批次未完成时保留日志，之后可继续
+            if journal is not None and not completed:
+                journal.close()
+            if self.journal is journal:
+                self.journal = None
+            if outcome is not None:
+                self.app.root.after(0, outcome)
+    
+    def _find_duplicate(self, tracker, entry, produced):
+        """
+        登记文件，并查找之前已成功转换、内容和作者名都相同的文件
+        
+        作者名取自文件名并写入输出文档，作者不同的重复文件仍需各自转换。
+        
+        参数:
+            tracker: 本批次的DuplicateTracker
+            entry: 文件清单条目，不在清单中时为None
+            produced: 已转换文件名到输出文件列表的映射
+            
+        返回:
+            str: 可复用输出的文件名，没有时返回None
+        """
+        if entry is None:
+            return None
+        try:
+            earlier = tracker.add(entry)
+        except OSError:
+            return None
+        for other in earlier:
+            if other.author_name == entry.author_name and other.name in produced:
+                return other.name
+        return None
     
-    def _show_summary(self, total_files, low_wordcount_files, wordcount_enabled):
+    def _show_summary(self, total_files, low_wordcount_files, wordcount_enabled,
+                      success_files, error_files, skipped_files=(),
+                      duplicate_groups=(), reused_files=(), similar_pairs=()):
         """显示处理结果摘要"""
-        success_count = len(self.app.redirect.get_success_files())
-        failed_count = len(self.app.redirect.get_error_files())
+        success_count = len(success_files)
+        failed_count = len(error_files)
         low_count = len(low_wordcount_files)
         
         summary = f"\n处理完成！\n总计: {total_files} 个文件\n成功: {success_count} 个\n失败: {failed_count} 个\n"
+        if skipped_files:
+            summary += f"未变化已跳过: {len(skipped_files)} 个\n"
+        if reused_files:
+            summary += f"内容重复已复用输出: {len(reused_files)} 个\n"
         
         if wordcount_enabled:
             summary += f"字数不足: {low_count} 个\n"
@@ -224,20 +505,23 @@ class ConversionHandler:
                 for filename, count in low_wordcount_files:
                     summary += f"{filename}: {count} 字\n"
         
+        if duplicate_groups:
+            summary += "\n内容完全相同的文件:\n"
+            for group in duplicate_groups:
+                summary += " = ".join(entry.name for entry in group) + "\n"
+        
+        if similar_pairs:
+            summary += "\n正文相似的文件:\n"
+            for name_a, name_b, similarity in similar_pairs:
+                summary += f"{name_a} ~ {name_b}: {similarity:.0%}\n"
+        
         if failed_count > 0:
             summary += "\n失败的文件作者数字:\n"
-            for failed_file in self.app.redirect.get_error_files():
+            for failed_file in error_files:
                 author_num = extract_author_number(failed_file)
                 summary += f"作者{author_num}\n"
         
-        self.app.log_text.insert('end', summary)
-        self.app.log_text.see('end')
-        
-        # 设置进度条为100%完成
-        self.app.root.after(0, lambda: self.app.progress_bar.configure(value=total_files))
-        
-        # 更新状态
-        self.app.root.after(0, lambda: self.app.conversion_complete())
+        self.app.log(summary)
     
     def _cleanup_temp_files(self, temp_dir):
         """清理临时文件"""
@@ -275,6 +559,7 @@ class ConversionHandler:
                     src_path = os.path.join(input_dir, filename)
                     if os.path.exists(src_path):
                         dst_path = os.path.join(error_dir, filename)
+                        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
                         shutil.copy2(src_path, dst_path)
                         copied_count += 1
                 except Exception as e:
@@ -0,0 +1,68 @@
+"""
+提供本机征文语料库相关的业务逻辑处理
+"""
+import time
+from tkinter import filedialog, messagebox, simpledialog
+
+from corpus_index import index_folder, clear_corpus_index
+
+class CorpusHandler:
+    """语料库处理器，负责导入往年征文和清空本机语料库"""
+
+    def __init__(self, app):
+        """
+        初始化语料库处理器
+
+        参数:
+            app: 主应用程序实例
+        """
+        self.app = app
+
+    def import_previous_batch(self):
+        """选择往年征文所在的文件夹并收录到语料库"""
+        if self.app.processing:
+            self.app.set_status("请等待当前任务完成")
+            return
+
+        folder = filedialog.askdirectory(title="选择往年征文所在的文件夹")
+        if not folder:
+            return
+
+        this_year = time.localtime().tm_year
+        year = simpledialog.askinteger(
+            "征文年份", "这批征文所属的年份：",
+            initialvalue=this_year - 1, minvalue=1900, maxvalue=this_year
+        )
+        if year is None:
+            return
+
+        # 导入期间禁用其他操作
+        self.app.reset_for_processing()
+        self.app.set_status("正在导入往年征文...")
+        self.app.log(f"将 {folder} 中的{year}年征文收录到本机语料库\n")
+
+        # 在共享工作池的后台线程中收录
+        self.app.worker_pool.run_in_background(self._import_thread, folder, year)
+
+    def _import_thread(self, folder, year):
+        """收录线程"""
+        try:
+            added = index_folder(folder, year)
+            self.app.log(f"✓ 新收录 {added} 篇{year}年征文\n")
+            self.app.root.after(0, lambda: self.app.set_status(f"导入完成，新收录 {added} 篇征文"))
+            self.app.root.after(0, self.app.enable_buttons)
+        except Exception as e:
+            self.app.root.after(0, lambda err=e: self.app.conversion_error(f"导入往年征文时出错: {str(err)}"))
+
+    def clear_corpus(self):
+        """删除本机语料库中收录的所有征文"""
+        if self.app.processing:
+            self.app.set_status("请等待当前任务完成")
+            return
+
+        if not messagebox.askyesno("确认", "确定要清空本机语料库吗？已收录的往年征文将全部删除。"):
+            return
+
+        count = clear_corpus_index()
+        self.app.log(f"已清空本机语料库，删除 {count} 篇收录的征文\n")
+        self.app.set_status("语料库已清空")
@@ -9,7 +9,6 @@ import threading
 
 from gui.handlers.parallel_processor import ParallelProcessor
 from word_processors import process_word_file
-from file_utils import get_output_file_path
 
 class EnhancedConversionHandler:
     """增强版Word文档转换处理器"""
@@ -22,7 +21,7 @@ class EnhancedConversionHandler:
             app: 主应用程序实例
         """
         self.app = app
-        self.processor = ParallelProcessor()
+        self.processor = ParallelProcessor(executor=app.worker_pool.io_executor())
         self.monitor_thread = None
         self.is_running = False
         
@@ -66,8 +65,7 @@ class EnhancedConversionHandler:
         # 准备处理界面
         self.app.reset_for_processing()
         self.app.set_status("正在初始化处理...")
-        self.app.log_text.insert('end', f"开始处理 {len(files)} 个文件...\n")
-        self.app.log_text.see('end')
+        self.app.log(f"开始处理 {len(files)} 个文件...\n")
         
         # 显示暂停和取消按钮
         self.app.show_process_controls(True)
@@ -118,8 +116,7 @@ class EnhancedConversionHandler:
                         error_msg = result["error"] or "未知错误"
                         log_text = f"× 处理失败: {result['filename']} - {error_msg}\n"
                         
-                    self.app.root.after(0, lambda t=log_text: 
-                        self._append_log(t))
+                    self._append_log(log_text)
                 
                 # 如果处理完成或已停止
                 if not progress["running"]:
@@ -179,9 +176,8 @@ class EnhancedConversionHandler:
         self.app.enable_buttons()
         
     def _append_log(self, text):
-        """添加日志文本"""
-        self.app.log_text.insert('end', text)
-        self.app.log_text.see('end')
+        """添加日志文本（可在任意线程中调用）"""
+        self.app.log(text)
         
     def pause_conversion(self):
         """暂停处理"""
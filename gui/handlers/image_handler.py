@@ -2,8 +2,10 @@
 提供图片提取相关的业务逻辑处理
 """
 import os
-import threading
-from image_extractor import extract_images_from_doc
+from concurrent.futures import wait, FIRST_COMPLETED
+from folder_manifest import get_folder_manifest
+from image_extractor import extract_images_from_doc, read_docx_images, write_image_file
+from task_events import run_task
 
 class ImageHandler:
     """图片提取处理器，处理从文档中提取图片的相关业务逻辑"""
@@ -53,19 +55,29 @@ class ImageHandler:
             self.app.set_status("请选择输出文件夹")
             return
             
+        # 获取并发提取配置
+        concurrent = not hasattr(self.app, 'concurrent_images_var') or self.app.concurrent_images_var.get()
+        max_workers = self.app.get_worker_count()
+        
+        # 在文件列表中只勾选了部分文件时，只处理这些文件（None表示全部）
+        selected_files = self.app.file_frame.get_selected_files(subset_only=True)
+        if selected_files == []:
+            self.app.set_status("请在文件列表中勾选要处理的文件")
+            return
+        
         # 准备开始提取图片
         self.app.reset_for_processing()
         self.app.set_status("正在提取图片...")
         
-        # 在新线程中运行提取
-        thread = threading.Thread(
-            target=self._extract_thread, 
-            args=(input_dir, output_dir),
-            daemon=True
+        # 在共享工作池的后台线程中运行提取
+        self.app.worker_pool.run_in_background(
+            self._extract_thread,
+            input_dir, output_dir, concurrent, max_workers,
+            self.app.file_frame.get_scan_options(), selected_files
         )
-        thread.start()
     
-    def _extract_thread(self, input_dir, output_dir):
+    def _extract_thread(self, input_dir, output_dir, concurrent=False, max_workers=None, scan_options=None,
+                        selected_files=None):
         """提取图片线程"""
         try:
             # 创建图片输出目录
@@ -73,46 +85,161 @@ class ImageHandler:
             os.makedirs(images_dir, exist_ok=True)
             
             # 获取所有Word文件
-            docx_files = [f for f in os.listdir(input_dir) if f.endswith(('.doc', '.docx'))]
-            total_files = len(docx_files)
+            manifest = get_folder_manifest(input_dir, names=selected_files, **(scan_options or {}))
+            docx_files = manifest.names()
+            file_sizes = [entry.size for entry in manifest]
             
-            # 配置进度条最大值
-            self.app.root.after(0, lambda: self.app.progress_bar.configure(maximum=total_files))
+            # 开始汇总进度，界面定时读取
+            self.app.progress.start("正在提取图片", len(docx_files), sum(file_sizes))
             
-            total_images = 0
-            
-            for index, filename in enumerate(docx_files, 1):
-                # 更新进度条
-                current_progress = index / total_files * 100
-                self.app.root.after(0, lambda p=index: self.app.progress_bar.configure(value=p))
-                self.app.root.after(0, lambda: self.app.progress_bar.update())
-                
-                self.app.set_status(f"正在提取图片: {index}/{total_files} ({int(current_progress)}%)...")
-                
-                input_file = os.path.join(input_dir, filename)
-                # 为每个文件创建子文件夹
-                file_images_dir = os.path.join(images_dir, os.path.splitext(filename)[0])
-                os.makedirs(file_images_dir, exist_ok=True)
-                
-                # 提取图片
-                temp_images = extract_images_from_doc(input_file, file_images_dir)
-                if temp_images:
-                    self.app.log_text.insert('end', f"✓ {filename}: 提取了 {len(temp_images)} 张图片\n")
-                    total_images += len(temp_images)
-                else:
-                    self.app.log_text.insert('end', f"! {filename}: 未找到图片\n")
+            if concurrent:
+                total_images = self._extract_concurrent(input_dir, images_dir, docx_files, file_sizes, max_workers)
+            else:
+                total_images = self._extract_sequential(input_dir, images_dir, docx_files, file_sizes)
             
             summary = f"\n提取完成！\n总计处理 {len(docx_files)} 个文件\n共提取 {total_images} 张图片\n"
-            self.app.log_text.insert('end', summary)
-            self.app.log_text.see('end')
+            self.app.log(summary)
             
-            # 设置进度条为100%完成
-            self.app.root.after(0, lambda: self.app.progress_bar.configure(value=total_files))
+            # 结束进度汇总
+            self.app.progress.finish()
             
             # 更新状态
             self.app.root.after(0, lambda: self.app.set_status(f"图片提取完成，共 {total_images} 张"))
             self.app.root.after(0, self.app.enable_buttons)
             
         except Exception as e:
-            self.app.root.after(0, lambda: self.app.set_status(f"提取图片时出错: {str(e)}"))
-            self.app.root.after(0, self.app.enable_buttons)
\ No newline at end of file
+            self.app.progress.finish()
+            self.app.root.after(0, lambda err=e: self.app.set_status(f"提取图片时出错: {str(err)}"))
+            self.app.root.after(0, self.app.enable_buttons)
+    
+    def _update_progress(self, file_size):
+        """记录一个文档提取完成"""
+        self.app.progress.advance(1, file_size)
+    
+    def _log_document_images(self, filename, count):
+        """记录单个文档的提取结果"""
+        if count:
+            self.app.log(f"✓ {filename}: 提取了 {count} 张图片\n")
+        else:
+            self.app.log(f"! {filename}: 未找到图片\n")
+    
+    def _extract_sequential(self, input_dir, images_dir, docx_files, file_sizes):
+        """逐个文档提取图片"""
+        total_images = 0
+        
+        for filename, file_size in zip(docx_files, file_sizes):
+            input_file = os.path.join(input_dir, filename)
+            # 为每个文件创建子文件夹
+            file_images_dir = os.path.join(images_dir, os.path.splitext(filename)[0])
+            os.makedirs(file_images_dir, exist_ok=True)
+            
+            # 提取图片
+            result = run_task(extract_images_from_doc, filename, input_file, file_images_dir,
+                              channel=self.app.event_channel, stage="提取图片")
+            temp_images = result.value or []
+            self._log_document_images(filename, len(temp_images))
+            total_images += len(temp_images)
+            self._update_progress(file_size)
+        
+        return total_images
+    
+    def _extract_concurrent(self, input_dir, images_dir, docx_files, file_sizes, max_workers=None):
+        """
+        并发提取图片：多个文档并行读取，图片写入分派到共享的I/O线程池
+        
+        参数:
+            input_dir: 输入目录
+            images_dir: 图片输出根目录
+            docx_files: 文档文件名列表
+            file_sizes: 各文档的大小（字节），用于汇总进度
+            max_workers: 并行读取的文档数
+            
+        返回:
+            int: 提取的图片总数
+        """
+        total_files = len(docx_files)
+        read_workers = max_workers or os.cpu_count() or 1
+        # 读取和写入都使用共享的I/O线程池，慢速存储上更多的并发写入可以掩盖延迟
+        io_pool = self.app.worker_pool.io_executor()
+        
+        # 预先批量创建所有子文件夹
+        target_dirs = [os.path.join(images_dir, os.path.splitext(f)[0]) for f in docx_files]
+        for target_dir in target_dirs:
+            os.makedirs(target_dir, exist_ok=True)
+        
+        total_images = 0
+        pending = iter(range(total_files))
+        # 限制同时在内存中的文档数，避免写入慢于读取时图片数据堆积
+        window = read_workers * 2
+        
+        read_futures = {}
+        write_groups = []
+        
+        def submit_next():
+            index = next(pending, None)
+            if index is not None:
+                input_file = os.path.join(input_dir, docx_files[index])
+                read_futures[io_pool.submit(self._read_images, input_file, target_dirs[index])] = index
+        
+        for _ in range(window):
+            submit_next()
+        
+        while read_futures or write_groups:
+            waitables = list(read_futures)
+            for _, futures in write_groups:
+                waitables.extend(futures)
+            wait(waitables, return_when=FIRST_COMPLETED)
+            
+            # 文档读取完成后将图片写入分派到I/O线程池
+            for future in [f for f in read_futures if f.done()]:
+                index = read_futures.pop(future)
+                try:
+                    written, images = future.result()
+                except Exception as e:
+                    self.app.log(f"× {docx_files[index]}: 提取图片时出现错误 - {str(e)}\n")
+                    written, images = [], []
+                futures = [
+                    io_pool.submit(write_image_file, os.path.join(target_dirs[index], name), blob)
+                    for name, blob in images
+                ]
+                write_groups.append((index, futures + [_completed(len(written))]))
+            
+            # 汇报图片全部写入完成的文档
+            for group in [g for g in write_groups if all(f.done() for f in g[1])]:
+                write_groups.remove(group)
+                index, futures = group
+                count = futures[-1].result()
+                for future in futures[:-1]:
+                    if future.exception() is None:
+                        count += 1
+                    else:
+                        self.app.log(f"× {docx_files[index]}: 保存图片时出错 - {future.exception()}\n")
+                
+                self._log_document_images(docx_files[index], count)
+                total_images += count
+                self._update_progress(file_sizes[index])
+                submit_next()
+        
+        return total_images
+    
+    def _read_images(self, input_file, target_dir):
+        """
+        读取单个文档的图片（在I/O线程池中执行）
+        
+        返回:
+            tuple: (已直接写入的图片路径列表, 待写入的(文件名, 数据)列表)
+        """
+        filename = os.path.basename(input_file)
+        if input_file.lower().endswith('.doc'):
+            # .doc需要先转换，由提取函数直接写入
+            result = run_task(extract_images_from_doc, filename, input_file, target_dir,
+                              channel=self.app.event_channel, stage="提取图片")
+            return result.value or [], []
+        return [], read_docx_images(input_file)
+
+def _completed(value):
+    """创建一个已完成的Future，用于统计已直接写入的图片"""
+    from concurrent.futures import Future
+    future = Future()
+    future.set_result(value)
+    return future
@@ -6,26 +6,115 @@ import os
 import queue
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Dict, Any, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator, Tuple
 
 from word_processors import process_word_file
-from file_utils import get_output_file_path
+from task_events import run_task
+
+def iter_unordered(func: Callable, items: Iterable, max_workers: Optional[int] = None,
+                   use_processes: bool = True, executor: Optional[Executor] = None
+                   ) -> Iterator[Tuple[int, Any, Any, Optional[Exception]]]:
+    """
+    并行执行 func(item)，按完成顺序逐个产出结果
+    
+    解析Word文档是CPU密集型操作，默认使用进程池以利用多核；
+    进程池不可用时自动退回线程池。
+    
+    参数:
+        func: 可在工作进程中执行的模块级函数
+        items: 待处理的条目
+        max_workers: 最大工作进程/线程数，默认为CPU核心数
+        use_processes: 是否使用进程池
+        executor: 共享的执行器（可选），提供时直接使用且不会关闭
+        
+    返回:
+        生成器，依次产出 (原始索引, 条目, 结果, 异常)
+    """
+    items = list(items)
+    if not items:
+        return
+    
+    if executor is not None:
+        yield from _iter_completed(executor, func, items)
+        return
+    
+    max_workers = max_workers or os.cpu_count() or 1
+    if use_processes and max_workers > 1:
+        try:
+            executor = ProcessPoolExecutor(max_workers=min(max_workers, len(items)))
+        except (OSError, NotImplementedError, ImportError):
+            executor = None
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    
+    with executor:
+        yield from _iter_completed(executor, func, items)
+
+def _iter_completed(executor: Executor, func: Callable, items: List[Any]):
+    """向执行器提交所有条目并按完成顺序产出结果，生成器提前关闭时取消未开始的任务"""
+    futures = {executor.submit(func, item): (index, item) for index, item in enumerate(items)}
+    try:
+        for future in as_completed(futures):
+            index, item = futures[future]
+            try:
+                yield index, item, future.result(), None
+            except Exception as e:
+                yield index, item, None, e
+    finally:
+        for future in futures:
+            future.cancel()
+
+class ReorderBuffer:
+    """
+    重排缓冲区，将乱序完成的结果按原始索引顺序依次放出
+    """
+    
+    def __init__(self, start: int = 0):
+        """
+        初始化重排缓冲区
+        
+        参数:
+            start: 第一个结果的索引
+        """
+        self._next = start
+        self._pending: Dict[int, Any] = {}
+        
+    def push(self, index: int, value: Any) -> List[Any]:
+        """
+        放入一个结果
+        
+        参数:
+            index: 结果的原始索引
+            value: 结果值
+            
+        返回:
+            按顺序可以放出的结果列表（可能为空）
+        """
+        self._pending[index] = value
+        ready = []
+        while self._next in self._pending:
+            ready.append(self._pending.pop(self._next))
+            self._next += 1
+        return ready
 
 class ParallelProcessor:
     """
     并行处理器类，提供多线程并行处理功能
     """
     
-    def __init__(self, max_workers=None):
+    def __init__(self, max_workers=None, executor=None):
         """
         初始化并行处理器
         
         参数:
             max_workers: 最大工作线程数，默认为CPU核心数的2倍
+            executor: 共享的线程池（可选），提供时复用而不是每次新建
         """
         self.max_workers = max_workers or (os.cpu_count() * 2)
+        self._shared_executor = executor
         self._executor = None
+        self._futures = []
         self._lock = threading.Lock()
         self._results_queue = queue.Queue()
         self._total_files = 0
@@ -69,11 +158,11 @@ class ParallelProcessor:
             while not self._results_queue.empty():
                 self._results_queue.get()
             
-            # 创建线程池
-            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            # 优先复用共享线程池
+            self._executor = self._shared_executor or ThreadPoolExecutor(max_workers=self.max_workers)
             
             # 提交所有任务到线程池
-            for file_name in files:
+            self._futures = [
                 self._executor.submit(
                     self._process_single_file,
                     file_name,
@@ -81,6 +170,8 @@ class ParallelProcessor:
                     output_dir,
                     config
                 )
+                for file_name in files
+            ]
             
             # 启动监控线程
             monitor_thread = threading.Thread(
@@ -122,15 +213,21 @@ class ParallelProcessor:
                 
             output_path = os.path.join(output_dir, output_file)
             
-            # 调用处理函数
-            process_word_file(
+            # 在任务上下文中调用处理函数，日志按文件归属
+            task_result = run_task(
+                process_word_file,
+                file_name,
                 input_path, 
                 output_path,
                 use_chinese_format=config.get("use_chinese_format", False),
                 keep_image_position=config.get("keep_image_position", True),
-                show_author_info=config.get("show_author_info", False)
+                show_author_info=config.get("show_author_info", False),
+                channel=config.get("channel")
             )
             
+            if not task_result.success:
+                raise RuntimeError(task_result.error or "处理失败")
+            
             # 标记处理成功
             result["success"] = True
             
@@ -155,9 +252,11 @@ class ParallelProcessor:
     
     def _monitor_executor(self):
         """监控线程池执行状态"""
-        # 等待线程池任务完成
+        # 等待本批任务完成，共享线程池不关闭
         try:
-            self._executor.shutdown(wait=True)
+            wait(self._futures)
+            if self._executor is not self._shared_executor:
+                self._executor.shutdown(wait=True)
         finally:
             with self._lock:
                 self._running = False
@@ -176,8 +275,10 @@ class ParallelProcessor:
         """停止处理"""
         with self._lock:
             self._running = False
-            # 不阻塞立即关闭线程池
-            if self._executor:
+            # 取消尚未开始的任务，不阻塞
+            for future in self._futures:
+                future.cancel()
+            if self._executor and self._executor is not self._shared_executor:
                 self._executor.shutdown(wait=False, cancel_futures=True)
                 
     def get_progress(self) -> Dict[str, Any]:
@@ -0,0 +1,217 @@
+"""
+提供完整报告相关的业务逻辑处理
+"""
+import os
+from analysis_cache import iter_file_analyses
+from folder_manifest import get_folder_manifest
+from conversion_manifest import ConversionManifest
+from batch_journal import load_last_batch
+from similarity import find_similar_pairs
+from batch_statistics import BatchStatistics
+from report_sinks import create_report, available_formats
+from excel_report import STYLE_WARNING
+from gui.handlers.parallel_processor import ReorderBuffer
+
+# 完整报告的列
+REPORT_HEADERS = [
+    "序号", "文件名", "作者", "文档属性作者", "标题", "字数", "段落数", "字符数",
+    "图片数", "图片大小(KB)", "文件大小(KB)", "字数状态", "转换状态", "输出文件", "错误",
+]
+
+
+class ReportHandler:
+    """完整报告处理器，一次扫描生成包含标题、字数、图片和转换状态的报告"""
+
+    def __init__(self, app):
+        """
+        初始化完整报告处理器
+
+        参数:
+            app: 主应用程序实例
+        """
+        self.app = app
+
+    def validate_paths(self, input_dir, output_dir):
+        """
+        验证路径是否有效
+
+        参数:
+            input_dir: 输入目录
+            output_dir: 输出目录
+
+        返回:
+            tuple: (是否有效, 错误信息)
+        """
+        if not input_dir or not output_dir:
+            return False, "请选择输入和输出文件夹"
+
+        # 检查输入目录是否存在
+        if not os.path.exists(input_dir):
+            return False, "输入目录不存在"
+
+        return True, ""
+
+    def generate_full_report(self):
+        """开始生成完整报告"""
+        # 获取路径配置
+        paths = self.app.file_frame.get_paths()
+        input_dir = paths["input_dir"]
+        output_dir = paths["output_dir"]
+
+        # 验证路径
+        valid, error_msg = self.validate_paths(input_dir, output_dir)
+        if not valid:
+            self.app.set_status(error_msg)
+            return
+
+        # 字数标准和报告格式使用字数检测设置
+        wordcount_config = self.app.wordcount_frame.get_wordcount_config()
+        report_formats = wordcount_config["report_formats"] or available_formats()[:1]
+
+        # 在文件列表中只勾选了部分文件时，只处理这些文件（None表示全部）
+        selected_files = self.app.file_frame.get_selected_files(subset_only=True)
+        if selected_files == []:
+            self.app.set_status("请在文件列表中勾选要处理的文件")
+            return
+
+        # 准备开始生成报告
+        self.app.reset_for_processing()
+        self.app.set_status("正在生成完整报告...")
+
+        # 在共享工作池的后台线程中生成报告
+        self.app.worker_pool.run_in_background(
+            self._report_thread,
+            input_dir, output_dir, wordcount_config["min_words"], report_formats,
+            self.app.get_worker_count(), self.app.file_frame.get_scan_options(), selected_files
+        )
+
+    def _last_failures(self, input_dir, output_dir):
+        """
+        读取上一次转换同一文件夹时失败的文件
+
+        返回:
+            dict: 文件名 -> 错误信息
+        """
+        state = load_last_batch(include_finished=True)
+        if state is None:
+            return {}
+        config = state.config
+        if (os.path.abspath(config.get("input_dir", "")) != os.path.abspath(input_dir) or
+                os.path.abspath(config.get("output_dir", "")) != os.path.abspath(output_dir)):
+            return {}
+        return {
+            name: record.get("error") or "转换失败"
+            for name, record in state.completed.items()
+            if not record.get("success")
+        }
+
+    def _report_thread(self, input_dir, output_dir, min_words, report_formats, max_workers=None, scan_options=None,
+                       selected_files=None):
+        """完整报告线程：扫描一次文件夹，分析结果按目录顺序逐行写入报告"""
+        report = None
+        try:
+            manifest = get_folder_manifest(input_dir, names=selected_files, **(scan_options or {}))
+            total_files = len(manifest)
+            if not total_files:
+                self.app.root.after(0, lambda: self.app.set_status("输入目录中没有 Word 文件"))
+                self.app.root.after(0, self.app.enable_buttons)
+                return
+
+            # 开始汇总进度，界面定时读取
+            self.app.progress.start("正在生成完整报告", total_files, manifest.total_size())
+
+            # 转换状态来自输出目录的转换清单和最近一次转换批次的日志
+            conversions = ConversionManifest(output_dir)
+            failures = self._last_failures(input_dir, output_dir)
+
+            report = create_report(os.path.join(output_dir, "完整报告"), "完整报告", report_formats)
+            sheet = report.add_sheet("完整报告", REPORT_HEADERS)
+
+            word_counts = []
+            statistics = BatchStatistics(min_words)
+            low_wordcount_files = []
+            signatures = {}
+            status_counts = {}
+            error_count = 0
+            row_number = 0
+
+            reorder = ReorderBuffer()
+            results = iter_file_analyses(
+                manifest.paths(),
+                lambda func, items: self.app.worker_pool.map_unordered(func, items, max_workers),
+                costs=[entry.cost for entry in manifest]
+            )
+            for index, _, analysis, _ in results:
+                # 更新进度
+                self.app.progress.advance(1, manifest.entries[index].size)
+
+                for entry, row_analysis in reorder.push(index, (manifest.entries[index], analysis)):
+                    row_number += 1
+                    author_name = entry.author_name or "未知"
+                    word_count = row_analysis['word_count']
+                    error = row_analysis['error']
+
+                    # 字数状态
+                    if error is not None:
+                        error_count += 1
+                        word_status = ""
+                        self.app.log(f"× {entry.name}: 分析失败 - {error}\n")
+                    else:
+                        word_counts.append((entry.name, word_count, row_analysis['paragraph_count'],
+                                            row_analysis['character_count'], author_name))
+                        statistics.add(entry.name, author_name, word_count, row_analysis['paragraph_count'],
+                                       row_analysis['character_count'])
+                        if row_analysis.get('signature'):
+                            signatures[entry.name] = row_analysis['signature']
+                        word_status = "不足" if word_count < min_words else "合格"
+                        if word_count < min_words:
+                            low_wordcount_files.append((entry.name, word_count, author_name))
+
+                    # 转换状态
+                    try:
+                        conversion_status, outputs = conversions.status(entry.path, entry.name)
+                    except OSError:
+                        conversion_status, outputs = "未转换", []
+                    if conversion_status != "已转换" and entry.name in failures:
+                        conversion_status = "转换失败"
+                        error = error or failures[entry.name]
+                    status_counts[conversion_status] = status_counts.get(conversion_status, 0) + 1
+
+                    image_bytes = row_analysis.get('image_bytes')
+                    sheet.append([
+                        row_number, entry.name, author_name, row_analysis['author'] or "", row_analysis['title'] or "",
+                        word_count, row_analysis['paragraph_count'], row_analysis['character_count'],
+                        row_analysis['image_count'],
+                        round(image_bytes / 1024, 1) if image_bytes is not None else None,
+                        round(entry.size / 1024, 1),
+                        word_status, conversion_status,
+                        "; ".join(os.path.relpath(path, output_dir) for path in outputs),
+                        error or "",
+                    ], STYLE_WARNING if word_status == "不足" or conversion_status == "转换失败" else None)
+
+            # 字数不足、重复文件、相似文件和统计信息工作表
+            similar_pairs = find_similar_pairs(
+                (name, signatures[name]) for name in manifest.names() if name in signatures
+            )
+            self.app.wordcount_handler.write_summary_sheets(
+                report, word_counts, low_wordcount_files, min_words,
+                manifest.duplicate_groups(), similar_pairs, statistics
+            )
+            report_paths = report.save()
+
+            summary = f"\n完整报告：共 {total_files} 个文件，分析失败 {error_count} 个，字数不足 {len(low_wordcount_files)} 个\n"
+            summary += "转换状态：" + "，".join(f"{status} {count} 个" for status, count in status_counts.items()) + "\n"
+            summary += "报告已导出至:\n" + "".join(f"{path}\n" for path in report_paths)
+            self.app.log(summary)
+
+            self.app.root.after(0, lambda: self.app.set_status(f"完整报告已生成，共 {total_files} 个文件"))
+            self.app.root.after(0, self.app.enable_buttons)
+
+        except Exception as e:
+            self.app.root.after(0, lambda err=e: self.app.set_status(f"生成完整报告时出错: {str(err)}"))
+            self.app.root.after(0, self.app.enable_buttons)
+        finally:
+            # 结束进度汇总
+            self.app.progress.finish()
+            if report is not None:
+                report.close()
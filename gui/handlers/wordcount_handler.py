@@ -2,23 +2,17 @@
 提供字数统计相关的业务逻辑处理
 """
 import os
-import threading
-from datetime import datetime
-from docx import Document
-from heading_utils import get_document_stats
-from word_processors import extract_author_number, extract_author_from_filename
+from analysis_cache import iter_file_analyses
+from folder_manifest import get_folder_manifest
+from similarity import find_similar_pairs, SIMILARITY_THRESHOLD
+from batch_statistics import BatchStatistics
 
-# 检查是否安装了openpyxl库
-try:
-    import openpyxl
-    from openpyxl.styles import Font, Alignment, PatternFill
-    from openpyxl.utils import get_column_letter
-    EXCEL_AVAILABLE = True
-except ImportError:
-    EXCEL_AVAILABLE = False
+from excel_report import STYLE_WARNING, STYLE_PERCENT, STYLE_LABEL
+from report_sinks import create_report
+from gui.handlers.parallel_processor import ReorderBuffer
 
 class WordcountHandler:
-    """字数统计处理器，处理字数检测和Excel报告相关功能"""
+    """字数统计处理器，处理字数检测和统计报告相关功能"""
     
     def __init__(self, app):
         """
@@ -69,260 +63,266 @@ class WordcountHandler:
         # 获取字数检测配置
         wordcount_config = self.app.wordcount_frame.get_wordcount_config()
         min_words = wordcount_config["min_words"]
-        export_excel = wordcount_config["export_excel"]
+        report_formats = wordcount_config["report_formats"] if wordcount_config["generate_excel"] else []
+        max_workers = self.app.get_worker_count()
+        
+        # 在文件列表中只勾选了部分文件时，只处理这些文件（None表示全部）
+        selected_files = self.app.file_frame.get_selected_files(subset_only=True)
+        if selected_files == []:
+            self.app.set_status("请在文件列表中勾选要处理的文件")
+            return
         
         # 准备开始字数检测
         self.app.reset_for_processing()
         self.app.set_status("正在检测字数...")
         
-        # 在新线程中运行字数检测
-        thread = threading.Thread(
-            target=self._check_thread, 
-            args=(input_dir, output_dir, min_words, export_excel),
-            daemon=True
+        # 在共享工作池的后台线程中运行字数检测
+        self.app.worker_pool.run_in_background(
+            self._check_thread,
+            input_dir, output_dir, min_words, report_formats, max_workers,
+            self.app.file_frame.get_scan_options(), selected_files
         )
-        thread.start()
     
-    def _check_thread(self, input_dir, output_dir, min_words, export_excel):
-        """字数检测线程"""
+    def _check_thread(self, input_dir, output_dir, min_words, report_formats, max_workers=None, scan_options=None,
+                      selected_files=None):
+        """字数检测线程，在共享进程池中解析文档并按完成顺序流式显示结果，同时逐行写入报告"""
+        report = None
         try:
             # 获取所有Word文件
-            docx_files = [f for f in os.listdir(input_dir) if f.endswith(('.doc', '.docx'))]
+            manifest = get_folder_manifest(input_dir, names=selected_files, **(scan_options or {}))
+            docx_files = manifest.names()
             word_counts = []
             low_wordcount_files = []
+            # 文件名 -> 正文MinHash签名，用于查找相似文件
+            signatures = {}
+            
+            # 列式存储的统计数据，检测结束后一次性计算
+            statistics = BatchStatistics(min_words)
             
             total_files = len(docx_files)
             
-            # 配置进度条最大值
-            self.app.root.after(0, lambda: self.app.progress_bar.configure(maximum=total_files))
+            # 开始汇总进度，界面定时读取
+            self.app.progress.start("正在检测文件", total_files, manifest.total_size())
             
-            for index, filename in enumerate(docx_files, 1):
-                # 更新进度条
-                current_progress = index / total_files * 100
-                self.app.root.after(0, lambda p=index: self.app.progress_bar.configure(value=p))
-                self.app.root.after(0, lambda: self.app.progress_bar.update())
-                
-                self.app.set_status(f"正在检测文件 {index}/{total_files} ({int(current_progress)}%)...")
-                
-                input_file = os.path.join(input_dir, filename)
+            # 报告总览按目录顺序逐行写入，CSV等格式可在检测过程中读取
+            overview_sheet = None
+            if report_formats and docx_files:
                 try:
-                    doc = Document(input_file)
-                    stats = get_document_stats(doc)
-                    word_count = stats['word_count']
-                    para_count = stats['paragraph_count']
-                    char_count = stats['character_count']
-                    
-                    # 提取作者名
-                    author_name = extract_author_from_filename(filename) or "未知"
-                    
-                    word_counts.append((filename, word_count, para_count, char_count, author_name))
-                    if word_count < min_words:
-                        low_wordcount_files.append((filename, word_count, author_name))
+                    report = self._create_report(output_dir, report_formats)
+                    overview_sheet = report.add_sheet("字数统计总览", ["文件名", "作者", "字数", "段落数", "字符数", "状态"])
                 except Exception as e:
-                    self.app.log_text.insert('end', f"× {filename}: 字数检测失败 - {str(e)}\n")
+                    self.app.log(f"\n报告创建失败: {str(e)}\n")
+                    report = None
+            reorder = ReorderBuffer()
+            
+            input_files = [os.path.join(input_dir, f) for f in docx_files]
+            results = iter_file_analyses(
+                input_files,
+                lambda func, items: self.app.worker_pool.map_unordered(func, items, max_workers),
+                costs=[entry.cost for entry in manifest]
+            )
+            cached_count = 0
+            for done, (index, input_file, file_stats, cached) in enumerate(results, 1):
+                filename = docx_files[index]
+                cached_count += cached
+                
+                # 更新进度
+                self.app.progress.advance(1, manifest.entries[index].size)
+                
+                if file_stats['error'] is not None:
+                    self.app.log(f"× {filename}: 字数检测失败 - {file_stats['error']}\n")
+                    reorder.push(index, None)
+                    continue
+                
+                word_count = file_stats['word_count']
+                if file_stats.get('signature'):
+                    signatures[filename] = file_stats['signature']
+                para_count = file_stats['paragraph_count']
+                char_count = file_stats['character_count']
+                
+                # 提取作者名
+                author_name = manifest.entries[index].author_name or "未知"
+                
+                word_counts.append((filename, word_count, para_count, char_count, author_name))
+                for row in reorder.push(index, word_counts[-1]):
+                    if row is not None and overview_sheet is not None:
+                        self._write_overview_row(overview_sheet, row, min_words)
+                if word_count < min_words:
+                    low_wordcount_files.append((filename, word_count, author_name))
+                
+                # 更新统计信息
+                statistics.add(filename, author_name, word_count, para_count, char_count)
+                
+                # 流式显示每个文件的结果
+                status = "不足" if word_count < min_words else "合格"
+                self.app.log(f"{filename} ({author_name}): {word_count} 字 - {status}\n")
+            
+            if cached_count:
+                self.app.log(f"\n{cached_count} 个文件未变化，使用了缓存的检测结果\n")
             
             # 按字数排序
             word_counts.sort(key=lambda x: x[1])
+            # 字数不足文件保持目录顺序
+            positions = {name: i for i, name in enumerate(docx_files)}
+            low_wordcount_files.sort(key=lambda x: positions[x[0]])
+            
+            # 内容完全相同的重复提交（只比较大小相同的文件的哈希）
+            duplicate_groups = manifest.duplicate_groups()
+            # 正文相似的文件对（LSH索引只比较候选对）
+            similar_pairs = find_similar_pairs((name, signatures[name]) for name in docx_files if name in signatures)
             
             # 显示结果
-            self._show_results(word_counts, low_wordcount_files, min_words)
+            self._show_results(word_counts, low_wordcount_files, min_words, statistics, duplicate_groups,
+                               similar_pairs)
             
-            # 导出Excel报告
-            excel_path = ""
-            if export_excel and word_counts:
+            # 写入其余工作表并保存报告
+            report_paths = []
+            if report is not None:
                 try:
-                    excel_path = self._export_wordcount_excel(word_counts, low_wordcount_files, min_words, output_dir)
-                    self.app.log_text.insert('end', f"\n\nExcel报告已导出至: {excel_path}\n")
+                    self.write_summary_sheets(report, word_counts, low_wordcount_files, min_words,
+                                               duplicate_groups, similar_pairs, statistics)
+                    report_paths = report.save()
+                    self.app.log("\n\n报告已导出至:\n" + "".join(f"{path}\n" for path in report_paths))
                 except Exception as e:
-                    self.app.log_text.insert('end', f"\n\nExcel报告导出失败: {str(e)}\n")
+                    self.app.log(f"\n\n报告导出失败: {str(e)}\n")
             
-            self.app.log_text.see('end')
-            
-            # 设置进度条为100%完成
-            self.app.root.after(0, lambda: self.app.progress_bar.configure(value=total_files))
+            # 结束进度汇总
+            self.app.progress.finish()
             
             # 更新状态
             self.app.root.after(0, lambda: self.app.set_status(
                 f"字数检测完成，共 {len(word_counts)} 个文件，其中 {len(low_wordcount_files)} 个不足 {min_words} 字" +
-                (f"，已生成Excel报告" if excel_path else "")
+                (f"，已生成报告" if report_paths else "")
             ))
             self.app.root.after(0, self.app.enable_buttons)
             
         except Exception as e:
-            self.app.root.after(0, lambda: self.app.set_status(f"字数检测出错: {str(e)}"))
+            self.app.progress.finish()
+            self.app.root.after(0, lambda err=e: self.app.set_status(f"字数检测出错: {str(err)}"))
             self.app.root.after(0, self.app.enable_buttons)
+        finally:
+            if report is not None:
+                report.close()
     
-    def _show_results(self, word_counts, low_wordcount_files, min_words):
+    def _show_results(self, word_counts, low_wordcount_files, min_words, statistics=None, duplicate_groups=(),
+                      similar_pairs=()):
         """显示字数检测结果"""
-        self.app.log_text.insert('end', f"字数统计报告 (最小字数要求: {min_words})\n")
-        self.app.log_text.insert('end', "="*50 + "\n\n")
+        lines = [f"\n字数统计报告 (最小字数要求: {min_words})\n", "="*50 + "\n\n"]
         
         # 显示所有文件的字数
-        self.app.log_text.insert('end', "所有文件的字数统计:\n")
+        lines.append("所有文件的字数统计:\n")
         for filename, word_count, para_count, char_count, author_name in word_counts:
             status = "不足" if word_count < min_words else "合格"
-            self.app.log_text.insert('end', f"{filename} ({author_name}): {word_count} 字 ({para_count} 段落, {char_count} 字符) - {status}\n")
+            lines.append(f"{filename} ({author_name}): {word_count} 字 ({para_count} 段落, {char_count} 字符) - {status}\n")
         
         # 显示字数不足的文件
         if low_wordcount_files:
-            self.app.log_text.insert('end', "\n\n字数不足的文件:\n")
+            lines.append("\n\n字数不足的文件:\n")
             for filename, word_count, author_name in low_wordcount_files:
-                self.app.log_text.insert('end', f"{filename} ({author_name}): {word_count} 字\n")
+                lines.append(f"{filename} ({author_name}): {word_count} 字\n")
+        
+        # 显示内容完全相同的文件
+        if duplicate_groups:
+            lines.append("\n\n内容完全相同的文件:\n")
+            for group in duplicate_groups:
+                lines.append(" = ".join(entry.name for entry in group) + "\n")
+        
+        # 显示正文相似的文件
+        if similar_pairs:
+            lines.append(f"\n\n正文相似的文件 (相似度不低于 {SIMILARITY_THRESHOLD:.0%}):\n")
+            for name_a, name_b, similarity in similar_pairs:
+                lines.append(f"{name_a} ~ {name_b}: {similarity:.0%}\n")
         
-        # 统计信息
+        # 统计信息（优先使用处理过程中收集的列式数据）
+        if statistics is None:
+            statistics = self.build_statistics(word_counts, min_words)
+        stats = statistics.summary()
+        file_count = len(word_counts)
         summary = f"\n\n统计信息:\n"
-        summary += f"总文件数: {len(word_counts)} 个\n"
-        summary += f"平均字数: {sum(x[1] for x in word_counts) / len(word_counts) if word_counts else 0:.1f} 字\n"
-        summary += f"最大字数: {max(x[1] for x in word_counts) if word_counts else 0} 字\n"
-        summary += f"最小字数: {min(x[1] for x in word_counts) if word_counts else 0} 字\n"
+        summary += f"总文件数: {file_count} 个\n"
+        summary += f"平均字数: {stats['mean']:.1f} 字\n"
+        summary += f"中位字数: {stats['p50']:.0f} 字\n"
+        summary += f"最大字数: {stats['max']} 字\n"
+        summary += f"最小字数: {stats['min']} 字\n"
+        summary += f"字数标准差: {stats['std']:.1f}\n"
         summary += f"字数不足文件: {len(low_wordcount_files)} 个\n"
-        summary += f"字数合格文件: {len(word_counts) - len(low_wordcount_files)} 个\n"
+        summary += f"字数合格文件: {file_count - len(low_wordcount_files)} 个\n"
+        if duplicate_groups:
+            summary += f"重复文件: {sum(len(group) - 1 for group in duplicate_groups)} 个\n"
+        if similar_pairs:
+            summary += f"相似文件对: {len(similar_pairs)} 对\n"
+        lines.append(summary)
         
-        self.app.log_text.insert('end', summary)
+        self.app.log("".join(lines))
     
-    def _export_wordcount_excel(self, word_counts, low_wordcount_files, min_words, output_dir):
-        """导出字数统计Excel报告"""
-        if not EXCEL_AVAILABLE:
-            raise ImportError("缺少openpyxl库，无法导出Excel")
-        
-        # 创建报告目录
+    def build_statistics(self, word_counts, min_words):
+        """由字数统计结果列表构建列式统计数据"""
+        statistics = BatchStatistics(min_words)
+        for filename, word_count, para_count, char_count, author_name in word_counts:
+            statistics.add(filename, author_name, word_count, para_count, char_count)
+        return statistics
+    
+    def _create_report(self, output_dir, report_formats):
+        """在输出目录的字数统计报告文件夹中创建报告"""
         reports_dir = os.path.join(output_dir, "字数统计报告")
-        os.makedirs(reports_dir, exist_ok=True)
-        
-        # 创建带有当前日期时间的文件名
-        current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-        excel_path = os.path.join(reports_dir, f"字数统计报告_{current_time}.xlsx")
-        
-        # 创建新的Excel工作簿
-        wb = openpyxl.Workbook()
-        
-        # 创建总览工作表
-        overview_sheet = wb.active
-        overview_sheet.title = "字数统计总览"
-        
-        # 设置标题行
-        headers = ["文件名", "作者", "字数", "段落数", "字符数", "状态"]
-        for col, header in enumerate(headers, 1):
-            cell = overview_sheet.cell(row=1, column=col)
-            cell.value = header
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(horizontal='center')
-        
-        # 写入数据
-        for row, (filename, word_count, para_count, char_count, author_name) in enumerate(word_counts, 2):
-            status = "不足" if word_count < min_words else "合格"
-            
-            overview_sheet.cell(row=row, column=1).value = filename
-            overview_sheet.cell(row=row, column=2).value = author_name
-            overview_sheet.cell(row=row, column=3).value = word_count
-            overview_sheet.cell(row=row, column=4).value = para_count
-            overview_sheet.cell(row=row, column=5).value = char_count
-            overview_sheet.cell(row=row, column=6).value = status
-            
-            # 设置字数不足的行底色为浅红色
-            if word_count < min_words:
-                for col in range(1, 7):
-                    overview_sheet.cell(row=row, column=col).fill = PatternFill(
-                        start_color="FFCCCC", end_color="FFCCCC", fill_type="solid"
-                    )
-        
-        # 创建字数不足工作表
+        return create_report(reports_dir, "字数统计报告", report_formats)
+    
+    def _write_overview_row(self, sheet, row, min_words):
+        """写入总览工作表的一行，字数不足的行底色为浅红色"""
+        filename, word_count, para_count, char_count, author_name = row
+        low = word_count < min_words
+        sheet.append(
+            [filename, author_name, word_count, para_count, char_count, "不足" if low else "合格"],
+            STYLE_WARNING if low else None
+        )
+    
+    def write_summary_sheets(self, report, word_counts, low_wordcount_files, min_words, duplicate_groups=(),
+                              similar_pairs=(), statistics=None):
+        """写入字数不足、重复文件、相似文件、统计信息以及字数分布和作者、班级汇总工作表"""
+        # 字数不足工作表
         if low_wordcount_files:
-            low_sheet = wb.create_sheet(title="字数不足文件")
-            
-            # 设置标题行
-            headers = ["文件名", "作者", "字数", "差额"]
-            for col, header in enumerate(headers, 1):
-                cell = low_sheet.cell(row=1, column=col)
-                cell.value = header
-                cell.font = Font(bold=True)
-                cell.alignment = Alignment(horizontal='center')
-            
-            # 写入数据
-            for row, (filename, word_count, author_name) in enumerate(low_wordcount_files, 2):
-                low_sheet.cell(row=row, column=1).value = filename
-                low_sheet.cell(row=row, column=2).value = author_name
-                low_sheet.cell(row=row, column=3).value = word_count
-                low_sheet.cell(row=row, column=4).value = min_words - word_count
+            low_sheet = report.add_sheet("字数不足文件", ["文件名", "作者", "字数", "差额"])
+            for filename, word_count, author_name in low_wordcount_files:
+                low_sheet.append([filename, author_name, word_count, min_words - word_count])
         
-        # 创建统计信息工作表
-        stats_sheet = wb.create_sheet(title="统计信息")
+        # 重复文件工作表
+        if duplicate_groups:
+            duplicate_sheet = report.add_sheet("重复文件", ["组号", "文件名", "作者", "与之相同的文件"])
+            for group_number, group in enumerate(duplicate_groups, 1):
+                for entry in group[1:]:
+                    duplicate_sheet.append([group_number, entry.name, entry.author_name or "未知", group[0].name])
         
-        # 基本统计信息
+        # 相似文件工作表
+        if similar_pairs:
+            similar_sheet = report.add_sheet("相似文件", ["文件名A", "作者A", "文件名B", "作者B", "相似度"],
+                                             column_styles={4: STYLE_PERCENT})
+            authors = {filename: author_name for filename, _, _, _, author_name in word_counts}
+            for name_a, name_b, similarity in similar_pairs:
+                similar_sheet.append([name_a, authors.get(name_a, "未知"), name_b, authors.get(name_b, "未知"),
+                                      similarity])
+        
+        # 统计信息工作表
+        if statistics is None:
+            statistics = self.build_statistics(word_counts, min_words)
+        stats = statistics.summary()
+        stats_sheet = report.add_sheet("统计信息", column_styles={0: STYLE_LABEL})
         stats_data = [
-            ["总文件数", len(word_counts)],
-            ["平均字数", round(sum(x[1] for x in word_counts) / len(word_counts) if word_counts else 0, 1)],
-            ["最大字数", max(x[1] for x in word_counts) if word_counts else 0],
-            ["最小字数", min(x[1] for x in word_counts) if word_counts else 0],
+            ["总文件数", stats['count']],
+            ["总字数", stats['total']],
+            ["平均字数", round(stats['mean'], 1)],
+            ["中位字数", round(stats['p50'], 1)],
+            ["字数标准差", round(stats['std'], 1)],
+            ["最大字数", stats['max']],
+            ["最小字数", stats['min']],
             ["字数标准", min_words],
             ["字数不足文件数", len(low_wordcount_files)],
             ["字数合格文件数", len(word_counts) - len(low_wordcount_files)],
-            ["合格率", f"{(1 - len(low_wordcount_files) / len(word_counts)) * 100:.1f}%" if word_counts else "0%"]
+            ["重复文件数", sum(len(group) - 1 for group in duplicate_groups)],
+            ["相似文件对数", len(similar_pairs)],
+            ["合格率", f"{stats['pass_rate'] * 100:.1f}%"]
         ]
+        for row in stats_data:
+            stats_sheet.append(row)
         
-        for row, (label, value) in enumerate(stats_data, 1):
-            stats_sheet.cell(row=row, column=1).value = label
-            stats_sheet.cell(row=row, column=2).value = value
-            stats_sheet.cell(row=row, column=1).font = Font(bold=True)
-        
-        # 自动调整列宽
-        try:
-            for sheet in wb.worksheets:
-                # 创建列宽缓存以避免重复计算
-                column_widths = {}
-                
-                for col in range(1, sheet.max_column + 1):
-                    max_length = 0
-                    column = get_column_letter(col)
-                    column_widths[column] = max_length
-                    
-                    # 更高效的列宽计算
-                    for cell in sheet[column]:
-                        try:
-                            if cell.value:
-                                cell_length = len(str(cell.value))
-                                if cell_length > max_length:
-                                    max_length = cell_length
-                                    column_widths[column] = max_length
-                        except (TypeError, ValueError):
-                            continue
-                    
-                    # 设置列宽，考虑中文字符宽度
-                    adjusted_width = (max_length + 2) * 1.2
-                    sheet.column_dimensions[column].width = adjusted_width
-        except Exception as e:
-            print(f"! 调整Excel列宽时出错: {str(e)}")
-        
-        # 保存工作簿，增加异常处理
-        try:
-            # 确保目录存在
-            os.makedirs(os.path.dirname(excel_path), exist_ok=True)
-            
-            # 检查文件是否可写
-            if os.path.exists(excel_path) and not os.access(excel_path, os.W_OK):
-                alt_path = os.path.join(
-                    os.path.dirname(excel_path),
-                    f"字数统计报告_{current_time}_新.xlsx"
-                )
-                print(f"! 原文件无法写入，将保存到: {os.path.basename(alt_path)}")
-                excel_path = alt_path
-            
-            wb.save(excel_path)
-        except PermissionError:
-            # 处理权限错误
-            alt_path = os.path.join(
-                os.path.dirname(excel_path),
-                f"字数统计报告_{current_time}_新.xlsx"
-            )
-            print(f"! 保存Excel文件时出现权限错误，尝试保存到: {os.path.basename(alt_path)}")
-            try:
-                wb.save(alt_path)
-                excel_path = alt_path
-            except Exception as e:
-                print(f"× Excel报告保存失败: {str(e)}")
-                raise
-        except Exception as e:
-            print(f"× Excel报告保存失败: {str(e)}")
-            raise
-        
-        return excel_path
\ No newline at end of file
+        # 字数分布、百分位数和作者、班级汇总工作表
+        statistics.write_sheets(report)
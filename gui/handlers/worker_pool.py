@@ -0,0 +1,170 @@
+"""
+提供应用程序生命周期内共享的工作池
+
+启动时预先创建工作进程并导入耗时的模块，之后每次操作都复用同一组线程和进程，
+避免每次点击按钮都重新创建线程池、重新导入docx/openpyxl等模块。
+"""
+
+import os
+import threading
+import importlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Iterable, Optional
+
+# 预热时导入的模块，导入失败（如未安装openpyxl）时忽略
+WARM_MODULES = (
+    "docx",
+    "openpyxl",
+    "heading_utils",
+    "image_extractor",
+    "docx_processor",
+)
+
+# 同一时间运行的处理器主流程数：处理期间界面禁用所有操作按钮，只会有一个
+MAX_ACTIONS = 1
+
+def warm_up(modules=WARM_MODULES):
+    """
+    导入耗时模块并预热文档模板缓存
+
+    参数:
+        modules: 需要预先导入的模块名
+    """
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass
+
+    # 创建一次带样式的空文档，使模板文件进入缓存
+    try:
+        from document_styles import create_document_with_styles
+        create_document_with_styles()
+    except Exception:
+        pass
+
+def _noop():
+    """用于强制启动工作进程的空任务"""
+    return os.getpid()
+
+class WorkerPool:
+    """
+    应用程序级工作池
+
+    包含三类执行器：
+        - 后台任务线程：运行各处理器的主流程，替代每次新建threading.Thread
+        - 进程池：执行CPU密集的文档解析，进程启动时即完成预热
+        - I/O线程池：执行文件写入等I/O密集任务
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, io_workers: Optional[int] = None):
+        """
+        初始化工作池
+
+        参数:
+            max_workers: 工作进程数，默认为CPU核心数
+            io_workers: I/O线程数，默认为工作进程数的2倍且不少于4
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.io_workers = io_workers or max(4, self.max_workers * 2)
+        self._lock = threading.Lock()
+        self._task_executor = ThreadPoolExecutor(max_workers=MAX_ACTIONS, thread_name_prefix="task")
+        self._io_executor = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="io")
+        self._process_executor = None
+        self._closed = False
+
+    def start(self):
+        """
+        在后台启动并预热工作进程和当前进程的模块缓存
+
+        预热在单独的线程中执行，不占用后台任务线程，预热期间点击的操作可以立即开始
+        """
+        threading.Thread(target=self._start, name="warm-up", daemon=True).start()
+
+    def _start(self):
+        """启动工作池（在预热线程中执行）"""
+        executor = self.process_executor()
+        if executor is not None:
+            # 每个工作进程执行一次空任务，确保进程已创建并完成初始化
+            for _ in range(self.max_workers):
+                executor.submit(_noop)
+        warm_up()
+
+    def process_executor(self, max_workers: Optional[int] = None):
+        """
+        获取共享进程池，工作进程数变化时重新创建
+
+        参数:
+            max_workers: 期望的工作进程数，None表示保持当前设置
+
+        返回:
+            进程池，无法创建时返回None
+        """
+        with self._lock:
+            if self._closed:
+                return None
+            if max_workers and max_workers != self.max_workers:
+                self.max_workers = max_workers
+                if self._process_executor is not None:
+                    self._process_executor.shutdown(wait=False)
+                    self._process_executor = None
+            if self._process_executor is None:
+                try:
+                    self._process_executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        initializer=warm_up
+                    )
+                except (OSError, NotImplementedError, ImportError):
+                    return None
+            return self._process_executor
+
+    def io_executor(self):
+        """获取共享I/O线程池"""
+        return self._io_executor
+
+    def run_in_background(self, func: Callable, *args, **kwargs):
+        """
+        在后台任务线程中运行处理器主流程
+
+        返回:
+            Future对象
+        """
+        return self._task_executor.submit(func, *args, **kwargs)
+
+    def submit(self, func: Callable, *args, **kwargs):
+        """
+        提交CPU密集任务到进程池，进程池不可用时退回I/O线程池
+
+        返回:
+            Future对象
+        """
+        executor = self.process_executor()
+        if executor is None:
+            executor = self._io_executor
+        return executor.submit(func, *args, **kwargs)
+
+    def map_unordered(self, func: Callable, items: Iterable, max_workers: Optional[int] = None):
+        """
+        在共享进程池中并行执行 func(item)，按完成顺序产出结果
+
+        参数:
+            func: 可在工作进程中执行的模块级函数
+            items: 待处理的条目
+            max_workers: 期望的工作进程数
+
+        返回:
+            生成器，依次产出 (原始索引, 条目, 结果, 异常)
+        """
+        from gui.handlers.parallel_processor import iter_unordered
+        executor = self.process_executor(max_workers) or self._io_executor
+        return iter_unordered(func, items, executor=executor)
+
+    def shutdown(self):
+        """关闭工作池，不等待正在执行的任务"""
+        with self._lock:
+            self._closed = True
+            executor, self._process_executor = self._process_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._io_executor.shutdown(wait=False, cancel_futures=True)
+        self._task_executor.shutdown(wait=False, cancel_futures=True)
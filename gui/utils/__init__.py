@@ -4,6 +4,8 @@ Word文档批量处理工具 - 工具包
 提供各种辅助工具类和函数
 """
 from gui.utils.redirect_text import RedirectText
+from gui.utils.log_sink import LogSink
+from gui.utils.log_model import LogModel
 from gui.utils.ui_utils import create_tooltip, set_icon
 
-__all__ = ['RedirectText', 'create_tooltip', 'set_icon']
\ No newline at end of file
+__all__ = ['RedirectText', 'LogSink', 'LogModel', 'create_tooltip', 'set_icon']
\ No newline at end of file
@@ -0,0 +1,236 @@
+"""
+提供有界的日志数据模型
+
+最近的日志行保存在固定容量的环形缓冲区中，所有日志行同时追加写入磁盘上的溢出文件，
+并记录每行在文件中的偏移量和级别。查看器只按需读取可见的行，较早的行从溢出文件中读取，
+因此无论处理多少文件，内存占用都保持在上限以内，按级别筛选也无需读取日志文本。
+"""
+import os
+import re
+import tempfile
+from array import array
+
+from file_utils import get_cache_dir
+from task_events import detect_level, LEVEL_DEBUG, LEVEL_INFO, LEVEL_SUCCESS, LEVEL_WARNING, LEVEL_ERROR
+
+# 内存中保留的最近日志行数
+MEMORY_LINES = 20000
+
+# 级别在级别数组中的编号
+LEVELS = (LEVEL_DEBUG, LEVEL_INFO, LEVEL_SUCCESS, LEVEL_WARNING, LEVEL_ERROR)
+LEVEL_CODES = {level: code for code, level in enumerate(LEVELS)}
+
+# 错误和警告行带有的作者信息前缀，如"作者12(张三): "
+_AUTHOR_PREFIX = re.compile(r"^\s*作者[^:]*: ")
+
+
+def line_level(line):
+    """
+    推断一行日志的级别，忽略错误和警告行前的作者信息
+
+    参数:
+        line: 日志行
+
+    返回:
+        str: 事件级别
+    """
+    return detect_level(_AUTHOR_PREFIX.sub("", line, count=1))
+
+
+class LogModel:
+    """有界内存加磁盘溢出文件的日志模型（只在主线程中使用）"""
+
+    def __init__(self, capacity=MEMORY_LINES, spill_dir=None):
+        """
+        参数:
+            capacity: 内存中保留的最近日志行数
+            spill_dir: 溢出文件所在目录，默认使用缓存目录下的logs
+        """
+        self.capacity = capacity
+        self.spill_dir = spill_dir
+        # 行号 % capacity -> 该行文本
+        self._recent = [None] * capacity
+        self._levels = array('B')
+        self._offsets = array('q')
+        self._partial = ""
+        self._spill = None
+        self._spill_path = None
+        self._spill_size = 0
+        # 每次追加或清空后递增，供查看器判断是否需要刷新
+        self.version = 0
+
+    def __len__(self):
+        return len(self._levels)
+
+    def _open_spill(self):
+        if self._spill is None:
+            spill_dir = self.spill_dir or get_cache_dir("logs")
+            fd, self._spill_path = tempfile.mkstemp(prefix="log_", suffix=".txt", dir=spill_dir)
+            self._spill = os.fdopen(fd, "w+b")
+        return self._spill
+
+    def append(self, text):
+        """
+        追加日志文本，未以换行结尾的部分等到后续文本补全后再成为一行
+
+        参数:
+            text: 日志文本
+
+        返回:
+            int: 新增的行数
+        """
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        if not lines:
+            return 0
+
+        chunks = []
+        for line in lines:
+            index = len(self._levels)
+            self._levels.append(LEVEL_CODES[line_level(line)])
+            self._offsets.append(self._spill_size)
+            self._recent[index % self.capacity] = line
+            data = (line + "\n").encode("utf-8")
+            chunks.append(data)
+            self._spill_size += len(data)
+
+        spill = self._open_spill()
+        spill.seek(0, os.SEEK_END)
+        spill.write(b"".join(chunks))
+        self.version += 1
+        return len(lines)
+
+    def level(self, index):
+        """获取某行的级别"""
+        return LEVELS[self._levels[index]]
+
+    def _read_spilled(self, index):
+        spill = self._spill
+        spill.flush()
+        spill.seek(self._offsets[index])
+        return spill.readline().decode("utf-8", errors="replace").rstrip("\n")
+
+    def get_line(self, index):
+        """
+        获取一行日志
+
+        参数:
+            index: 行号
+
+        返回:
+            tuple: (级别, 文本)
+        """
+        if index >= len(self._levels) - self.capacity:
+            text = self._recent[index % self.capacity]
+        else:
+            text = self._read_spilled(index)
+        return self.level(index), text
+
+    def get_lines(self, indices):
+        """
+        获取多行日志
+
+        参数:
+            indices: 行号序列
+
+        返回:
+            list: (级别, 文本) 列表
+        """
+        return [self.get_line(index) for index in indices]
+
+    def iter_lines(self, start=0):
+        """
+        按顺序遍历日志行，较早的行从溢出文件中顺序读取
+
+        参数:
+            start: 起始行号
+
+        返回:
+            迭代器: (行号, 级别代码, 文本)
+        """
+        total = len(self._levels)
+        if start >= total:
+            return
+        spill = self._spill
+        spill.flush()
+        spill.seek(self._offsets[start])
+        for index in range(start, total):
+            yield index, self._levels[index], spill.readline().decode("utf-8", errors="replace").rstrip("\n")
+
+    def filter(self, levels=None, keyword=None, start=0):
+        """
+        筛选日志行
+
+        参数:
+            levels: 保留的级别集合，None表示全部级别
+            keyword: 行中需包含的文本（如文件名，不区分大小写），None或空表示不限
+            start: 从该行号开始筛选，用于增量追加筛选结果
+
+        返回:
+            array: 匹配的行号
+        """
+        codes = set(LEVEL_CODES[level] for level in (levels if levels is not None else LEVELS))
+        result = array('q')
+        if not keyword:
+            levels_array = self._levels
+            result.extend(i for i in range(start, len(levels_array)) if levels_array[i] in codes)
+            return result
+
+        keyword = keyword.lower()
+        result.extend(
+            index for index, code, text in self.iter_lines(start)
+            if code in codes and keyword in text.lower()
+        )
+        return result
+
+    def text(self, indices=None):
+        """
+        获取日志文本
+
+        参数:
+            indices: 行号序列，None表示全部
+
+        返回:
+            str: 以换行连接的日志文本
+        """
+        if indices is None:
+            return "".join(text + "\n" for _, _, text in self.iter_lines())
+        return "".join(text + "\n" for _, text in self.get_lines(indices))
+
+    def export(self, path, indices=None):
+        """
+        将日志写入文件，不在内存中拼接全部文本
+
+        参数:
+            path: 目标文件路径
+            indices: 行号序列，None表示全部
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            if indices is None:
+                for _, _, text in self.iter_lines():
+                    f.write(text + "\n")
+            else:
+                for index in indices:
+                    f.write(self.get_line(index)[1] + "\n")
+
+    def clear(self):
+        """清空日志并截断溢出文件"""
+        self._recent = [None] * self.capacity
+        self._levels = array('B')
+        self._offsets = array('q')
+        self._partial = ""
+        self._spill_size = 0
+        if self._spill is not None:
+            self._spill.seek(0)
+            self._spill.truncate()
+        self.version += 1
+
+    def close(self):
+        """关闭并删除溢出文件"""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+            try:
+                os.remove(self._spill_path)
+            except OSError:
+                pass
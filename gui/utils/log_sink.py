@@ -0,0 +1,112 @@
+"""
+提供批量刷新的日志输出
+
+任意线程都可以调用write将日志加入队列，队列只在Tk主线程中按固定间隔合并成一次
+插入写入文本控件，既避免在工作线程中操作Tk控件，也避免每行日志都触发一次界面重绘。
+完整日志保存在日志模型中，文本控件只保留最近的若干行。
+"""
+import threading
+from collections import deque
+
+# 两次刷新之间的最短间隔（毫秒），即日志区域每秒最多刷新约20次
+FLUSH_INTERVAL_MS = 50
+
+# 单次刷新最多写入的日志条数，积压更多时留到下一次刷新
+MAX_LINES_PER_FLUSH = 5000
+
+# 主窗口日志区域保留的最近行数，完整日志在"大窗口"中查看
+MAX_WIDGET_LINES = 2000
+
+
+class LogSink:
+    """线程安全的日志队列，在主线程中批量写入文本控件"""
+
+    def __init__(self, root, text_widget, interval_ms=FLUSH_INTERVAL_MS, model=None,
+                 max_widget_lines=MAX_WIDGET_LINES):
+        """
+        参数:
+            root: tkinter主窗口，用于在主线程中调度刷新
+            text_widget: 目标文本控件
+            interval_ms: 刷新间隔（毫秒）
+            model: 保存完整日志的LogModel（可选）
+            max_widget_lines: 文本控件保留的最多行数，None表示不限
+        """
+        self.root = root
+        self.text_widget = text_widget
+        self.interval_ms = interval_ms
+        self.model = model
+        self.max_widget_lines = max_widget_lines
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._after_id = None
+
+    def start(self):
+        """开始定时刷新（需在主线程中调用）"""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        """停止定时刷新并写出积压的日志（需在主线程中调用）"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self.flush()
+
+    def write(self, text):
+        """
+        从任意线程追加日志文本
+
+        参数:
+            text: 日志文本
+        """
+        if text:
+            with self._lock:
+                self._pending.append(text)
+
+    def clear(self):
+        """丢弃尚未写出的日志并清空文本控件（需在主线程中调用）"""
+        with self._lock:
+            self._pending.clear()
+        self.text_widget.delete(1.0, 'end')
+        if self.model is not None:
+            self.model.clear()
+
+    def flush(self, max_lines=None):
+        """
+        将积压的日志合并为一次插入写入文本控件（需在主线程中调用）
+
+        参数:
+            max_lines: 本次最多写入的条数，None表示全部
+
+        返回:
+            int: 写入的条数
+        """
+        with self._lock:
+            if max_lines is None or len(self._pending) <= max_lines:
+                lines = list(self._pending)
+                self._pending.clear()
+            else:
+                lines = [self._pending.popleft() for _ in range(max_lines)]
+        if lines:
+            text = "".join(lines)
+            if self.model is not None:
+                self.model.append(text)
+            self.text_widget.insert('end', text)
+            self._trim()
+            self.text_widget.see('end')
+        return len(lines)
+
+    def _trim(self):
+        """删除文本控件中超出保留行数的最早的行"""
+        if self.max_widget_lines is None:
+            return
+        line_count = int(self.text_widget.index('end-1c').split('.')[0])
+        excess = line_count - self.max_widget_lines
+        if excess > 0:
+            self.text_widget.delete('1.0', f'{excess + 1}.0')
+
+    def _tick(self):
+        try:
+            self.flush(MAX_LINES_PER_FLUSH)
+        finally:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
@@ -0,0 +1,265 @@
+"""
+提供虚拟化的日志查看窗口
+
+窗口中的文本控件只包含当前可见的若干行，滚动时从日志模型中读取对应的行重新填充，
+因此打开和滚动的速度与日志总行数无关。支持按级别（×/!/✓）和文件名筛选。
+"""
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import filedialog, messagebox
+
+from gui.utils.ttk_compat import *  # 导入所有兼容性组件
+from gui.utils.ui_utils import center_window
+from task_events import LEVEL_DEBUG, LEVEL_INFO, LEVEL_SUCCESS, LEVEL_WARNING, LEVEL_ERROR
+
+# 检查日志是否有新内容的间隔（毫秒）
+REFRESH_INTERVAL_MS = 500
+
+# 文件名输入停止后多久开始筛选（毫秒）
+FILTER_DELAY_MS = 300
+
+# 级别筛选选项：(显示名称, 包含的级别)
+LEVEL_FILTERS = [
+    ("错误 ×", (LEVEL_ERROR,)),
+    ("警告 !", (LEVEL_WARNING,)),
+    ("成功 ✓", (LEVEL_SUCCESS,)),
+    ("其他", (LEVEL_INFO, LEVEL_DEBUG)),
+]
+
+# 各级别的文字颜色
+LEVEL_COLORS = {
+    LEVEL_ERROR: "#CC0000",
+    LEVEL_WARNING: "#CC6600",
+    LEVEL_SUCCESS: "#008800",
+}
+
+
+class LogViewer:
+    """虚拟化日志查看窗口"""
+
+    def __init__(self, parent, model, set_status=None):
+        """
+        参数:
+            parent: 父窗口
+            model: LogModel日志模型
+            set_status: 显示状态信息的函数（可选）
+        """
+        self.parent = parent
+        self.model = model
+        self.set_status = set_status or (lambda message: None)
+
+        # 筛选后的行号，None表示显示全部
+        self.indices = None
+        # 已筛选到的行号，日志增长时只筛选新增的行
+        self._filtered_upto = 0
+        self._seen_version = None
+        # 第一可见行在（筛选后）行列表中的位置
+        self.top = 0
+        # 位于底部时跟随新日志滚动
+        self.follow = True
+        self._refresh_id = None
+        self._filter_id = None
+
+        self._create_window()
+        self._refresh()
+
+    def _create_window(self):
+        self.window = tk.Toplevel(self.parent)
+        self.window.title("查看日志")
+        self.window.minsize(800, 600)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        log_frame = ttk.Frame(self.window, padding=10)
+        log_frame.pack(fill=tk.BOTH, expand=True)
+
+        # 创建工具栏框架
+        toolbar_frame = ttk.Frame(log_frame)
+        toolbar_frame.pack(fill=tk.X, pady=(0, 5))
+
+        copy_btn = ttk.Button(toolbar_frame, text="复制全部", command=self._copy_to_clipboard)
+        copy_btn.pack(side=tk.LEFT, padx=5)
+        save_btn = ttk.Button(toolbar_frame, text="保存日志", command=self._save_to_file)
+        save_btn.pack(side=tk.LEFT, padx=5)
+
+        # 级别筛选
+        self.level_vars = []
+        for label, _ in LEVEL_FILTERS:
+            var = tk.BooleanVar(value=True)
+            ttk.Checkbutton(toolbar_frame, text=label, variable=var,
+                            command=self._apply_filter).pack(side=tk.LEFT, padx=(10, 0))
+            self.level_vars.append(var)
+
+        # 文件名筛选
+        ttk.Label(toolbar_frame, text="文件名:").pack(side=tk.LEFT, padx=(15, 5))
+        self.keyword_var = tk.StringVar()
+        keyword_entry = ttk.Entry(toolbar_frame, textvariable=self.keyword_var, width=20)
+        keyword_entry.pack(side=tk.LEFT)
+        keyword_entry.bind("<KeyRelease>", self._schedule_filter)
+
+        self.count_label = ttk.Label(toolbar_frame, text="")
+        self.count_label.pack(side=tk.RIGHT, padx=5)
+
+        # 日志文本框，只包含可见的行，滚动由独立的滚动条控制
+        text_frame = ttk.Frame(log_frame)
+        text_frame.pack(fill=tk.BOTH, expand=True)
+        text_frame.columnconfigure(0, weight=1)
+        text_frame.rowconfigure(0, weight=1)
+
+        self.font = tkfont.Font(family="Consolas", size=10)
+        self.text = tk.Text(text_frame, wrap=tk.NONE, width=100, height=30, font=self.font)
+        self.text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        for level, color in LEVEL_COLORS.items():
+            self.text.tag_configure(level, foreground=color)
+
+        self.scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        x_scrollbar = ttk.Scrollbar(text_frame, orient=tk.HORIZONTAL, command=self.text.xview)
+        x_scrollbar.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.text.configure(xscrollcommand=x_scrollbar.set, state=tk.DISABLED)
+
+        # 鼠标滚轮和键盘滚动
+        self.text.bind("<Configure>", lambda event: self._render())
+        self.text.bind("<MouseWheel>", lambda event: self._scroll(-3 if event.delta > 0 else 3))
+        self.text.bind("<Button-4>", lambda event: self._scroll(-3))
+        self.text.bind("<Button-5>", lambda event: self._scroll(3))
+        self.text.bind("<Up>", lambda event: self._scroll(-1))
+        self.text.bind("<Down>", lambda event: self._scroll(1))
+        self.text.bind("<Prior>", lambda event: self._scroll(-self._visible_rows()))
+        self.text.bind("<Next>", lambda event: self._scroll(self._visible_rows()))
+        self.text.bind("<Home>", lambda event: self._scroll_to(0))
+        self.text.bind("<End>", lambda event: self._scroll_to(self._row_count()))
+
+        # 居中显示窗口
+        center_window(self.window, 800, 600)
+
+    def _row_count(self):
+        return len(self.model) if self.indices is None else len(self.indices)
+
+    def _visible_rows(self):
+        height = self.text.winfo_height()
+        if height <= 1:
+            return int(self.text.cget("height"))
+        return max(1, height // self.font.metrics("linespace"))
+
+    def _selected_levels(self):
+        return [level for var, (_, levels) in zip(self.level_vars, LEVEL_FILTERS) if var.get() for level in levels]
+
+    def _is_filtered(self):
+        return len(self._selected_levels()) < sum(len(levels) for _, levels in LEVEL_FILTERS) or \
+            bool(self.keyword_var.get().strip())
+
+    def _schedule_filter(self, event=None):
+        """输入文件名时延迟筛选，避免每次按键都扫描日志"""
+        if self._filter_id is not None:
+            self.window.after_cancel(self._filter_id)
+        self._filter_id = self.window.after(FILTER_DELAY_MS, self._apply_filter)
+
+    def _apply_filter(self):
+        """重新筛选全部日志"""
+        self._filter_id = None
+        self.indices = None
+        self._filtered_upto = 0
+        self._update_filter()
+        self.follow = True
+        self._render()
+
+    def _update_filter(self):
+        """对尚未筛选的新增日志行进行筛选"""
+        total = len(self.model)
+        if total < self._filtered_upto:
+            # 日志已被清空
+            self._filtered_upto = 0
+            if self.indices is not None:
+                del self.indices[:]
+        if not self._is_filtered():
+            self.indices = None
+        else:
+            matches = self.model.filter(self._selected_levels(), self.keyword_var.get().strip(),
+                                        start=self._filtered_upto)
+            if self.indices is None:
+                self.indices = matches
+            else:
+                self.indices.extend(matches)
+        self._filtered_upto = total
+
+    def _refresh(self):
+        """定时检查日志是否有新内容"""
+        try:
+            if self.model.version != self._seen_version:
+                self._seen_version = self.model.version
+                self._update_filter()
+                self._render()
+        finally:
+            self._refresh_id = self.window.after(REFRESH_INTERVAL_MS, self._refresh)
+
+    def _render(self):
+        """从日志模型读取可见的行填充文本控件"""
+        total = self._row_count()
+        rows = self._visible_rows()
+        max_top = max(0, total - rows)
+        self.top = max_top if self.follow else min(max(0, self.top), max_top)
+
+        end = min(total, self.top + rows)
+        if self.indices is None:
+            numbers = range(self.top, end)
+        else:
+            numbers = self.indices[self.top:end]
+
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete(1.0, tk.END)
+        for level, line in self.model.get_lines(numbers):
+            self.text.insert(tk.END, line + "\n", level)
+        self.text.configure(state=tk.DISABLED)
+
+        if total:
+            self.scrollbar.set(self.top / total, end / total)
+        else:
+            self.scrollbar.set(0, 1)
+        self.count_label.configure(text=f"显示 {total} / 共 {len(self.model)} 行")
+
+    def _scroll_to(self, top):
+        self.top = top
+        self.follow = top + self._visible_rows() >= self._row_count()
+        self._render()
+        return "break"
+
+    def _scroll(self, rows):
+        return self._scroll_to(max(0, self.top + rows))
+
+    def _on_scrollbar(self, action, value, unit=None):
+        """滚动条命令：moveto 比例 或 scroll 数量 units/pages"""
+        if action == "moveto":
+            self._scroll_to(int(float(value) * self._row_count()))
+        elif action == "scroll":
+            step = self._visible_rows() if unit == "pages" else 1
+            self._scroll(int(value) * step)
+
+    def _current_indices(self):
+        return None if self.indices is None else list(self.indices)
+
+    def _copy_to_clipboard(self):
+        """复制（筛选后的）日志内容到剪贴板"""
+        self.parent.clipboard_clear()
+        self.parent.clipboard_append(self.model.text(self._current_indices()))
+        self.set_status("日志已复制到剪贴板")
+
+    def _save_to_file(self):
+        """保存（筛选后的）日志到文件"""
+        file_path = filedialog.asksaveasfilename(
+            parent=self.window,
+            defaultextension=".log",
+            filetypes=[("日志文件", "*.log"), ("文本文件", "*.txt"), ("所有文件", "*.*")]
+        )
+        if file_path:
+            try:
+                self.model.export(file_path, self._current_indices())
+                self.set_status(f"日志已保存到 {file_path}")
+            except Exception as e:
+                messagebox.showerror("保存错误", f"保存日志时出错：{str(e)}")
+
+    def close(self):
+        """关闭窗口并停止刷新"""
+        for after_id in (self._refresh_id, self._filter_id):
+            if after_id is not None:
+                self.window.after_cancel(after_id)
+        self.window.destroy()
@@ -0,0 +1,146 @@
+"""
+提供批量处理的进度汇总
+
+处理线程每完成一个文件只在锁内累加计数，不向界面投递任何回调；界面在主线程中按固定
+间隔读取快照，更新进度条并显示文件速率、数据速率、已用时间和按剩余字节数估算的剩余时间。
+"""
+import time
+import threading
+from collections import namedtuple
+
+# 界面读取进度的间隔（毫秒）
+SAMPLE_INTERVAL_MS = 250
+
+# 进度快照
+ProgressSnapshot = namedtuple("ProgressSnapshot", [
+    "label", "done_files", "total_files", "done_bytes", "total_bytes",
+    "elapsed", "files_per_second", "bytes_per_second", "eta", "active", "generation",
+])
+
+
+def format_duration(seconds):
+    """
+    将秒数格式化为 时:分:秒 或 分:秒
+
+    参数:
+        seconds: 秒数
+
+    返回:
+        str: 格式化后的时间
+    """
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+class ProgressAggregator:
+    """线程安全的进度计数器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._label = ""
+        self._total_files = 0
+        self._total_bytes = 0
+        self._done_files = 0
+        self._done_bytes = 0
+        self._start_time = None
+        self._end_time = None
+        self._active = False
+        # 每次开始新批次时递增，界面据此判断是否已显示过某个批次的最终进度
+        self._generation = 0
+
+    def start(self, label, total_files, total_bytes=0):
+        """
+        开始一个新的批次
+
+        参数:
+            label: 状态栏显示的操作名称，如"正在检测文件"
+            total_files: 文件总数
+            total_bytes: 文件总大小（字节），用于估算剩余时间
+        """
+        with self._lock:
+            self._label = label
+            self._total_files = total_files
+            self._total_bytes = total_bytes
+            self._done_files = 0
+            self._done_bytes = 0
+            self._start_time = time.monotonic()
+            self._end_time = None
+            self._active = True
+            self._generation += 1
+
+    def advance(self, files=1, nbytes=0):
+        """
+        记录完成的文件（可在任意线程中调用）
+
+        参数:
+            files: 完成的文件数
+            nbytes: 完成的文件大小（字节）
+        """
+        with self._lock:
+            self._done_files += files
+            self._done_bytes += nbytes
+
+    def finish(self):
+        """结束当前批次，之后界面只再更新一次进度条，不再改写状态栏"""
+        with self._lock:
+            if self._active:
+                self._active = False
+                self._end_time = time.monotonic()
+
+    def snapshot(self):
+        """
+        读取当前进度
+
+        返回:
+            ProgressSnapshot: 进度快照，eta为剩余秒数（无法估算时为None）
+        """
+        with self._lock:
+            label = self._label
+            done_files, total_files = self._done_files, self._total_files
+            done_bytes, total_bytes = self._done_bytes, self._total_bytes
+            start_time, end_time = self._start_time, self._end_time
+            active, generation = self._active, self._generation
+
+        if start_time is None:
+            elapsed = 0.0
+        else:
+            elapsed = (end_time or time.monotonic()) - start_time
+        files_per_second = done_files / elapsed if elapsed > 0 else 0.0
+        bytes_per_second = done_bytes / elapsed if elapsed > 0 else 0.0
+
+        # 文件大小差别很大时，按剩余字节数估算比按剩余文件数更准确
+        eta = None
+        if total_bytes and bytes_per_second > 0:
+            eta = max(0, total_bytes - done_bytes) / bytes_per_second
+        elif files_per_second > 0:
+            eta = max(0, total_files - done_files) / files_per_second
+
+        return ProgressSnapshot(label, done_files, total_files, done_bytes, total_bytes,
+                                elapsed, files_per_second, bytes_per_second, eta, active, generation)
+
+    @staticmethod
+    def format(snapshot):
+        """
+        将进度快照格式化为状态栏文本
+
+        参数:
+            snapshot: ProgressSnapshot
+
+        返回:
+            str: 如"正在检测文件 120/500 (24%) | 35.2 个/秒 | 4.1 MB/秒 | 已用 00:03 | 剩余约 00:11"
+        """
+        total = snapshot.total_files
+        percent = int(snapshot.done_files / total * 100) if total else 0
+        parts = [f"{snapshot.label} {snapshot.done_files}/{total} ({percent}%)"]
+        if snapshot.done_files:
+            parts.append(f"{snapshot.files_per_second:.1f} 个/秒")
+            if snapshot.done_bytes:
+                parts.append(f"{snapshot.bytes_per_second / (1024 * 1024):.1f} MB/秒")
+        parts.append(f"已用 {format_duration(snapshot.elapsed)}")
+        if snapshot.eta is not None and snapshot.done_files < total:
+            parts.append(f"剩余约 {format_duration(snapshot.eta)}")
+        return " | ".join(parts)
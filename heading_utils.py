@@ -71,3 +71,125 @@ def get_document_stats(doc):
         'character_count': sum(len(para.text) for para in doc.paragraphs),
     }
     return stats
+
+
+def get_document_text(doc):
+    """
+    获取文档正文（段落和表格中的文本），用于相似文档检测
+    
+    参数:
+        doc: 已加载的docx文档对象或DocDocument
+        
+    返回:
+        str: 以换行分隔的正文
+    """
+    texts = [para.text for para in doc.paragraphs]
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                texts.extend(para.text for para in cell.paragraphs)
+    return "\n".join(texts)
+
+def extract_document_title(doc):
+    """
+    从已加载的文档中提取标题
+    
+    依次尝试文档属性、加粗或设置了字号的第一段、第一个非空段落
+    
+    参数:
+        doc: 已加载的docx文档对象
+        
+    返回:
+        str: 文档标题，过长时截断
+    """
+    # 尝试从文档属性获取标题
+    try:
+        doc_title = doc.core_properties.title or ""
+    except Exception:
+        doc_title = ""
+    
+    # 如果文档属性中没有标题，从文档内容中提取
+    if not doc_title and len(doc.paragraphs) > 0:
+        # 检查第一段是否为标题（通常是加粗或大字体）
+        first_para = doc.paragraphs[0]
+        if len(first_para.runs) > 0 and first_para.text.strip():
+            if first_para.runs[0].bold or first_para.runs[0].font.size is not None:
+                doc_title = first_para.text.strip()
+    
+    # 如果仍未找到标题，使用第一个非空段落
+    if not doc_title:
+        for para in doc.paragraphs:
+            if para.text.strip():
+                doc_title = para.text.strip()
+                break
+    
+    # 如果标题太长，可能是摘要或正文，截取合理长度
+    if len(doc_title) > 100:
+        doc_title = doc_title[:97] + "..."
+    
+    return doc_title
+
+def analyze_document(doc):
+    """
+    一次性获取文档的统计信息、标题、作者、图片数量和大小以及正文的MinHash签名
+    
+    参数:
+        doc: 已加载的docx文档对象或DocDocument
+        
+    返回:
+        dict: 包含word_count、paragraph_count、character_count、title、author、image_count、
+              image_bytes、signature的字典，无法统计图片时image_count和image_bytes为None，
+              正文过短时signature为None
+    """
+    from similarity import minhash_signature
+    analysis = get_document_stats(doc)
+    analysis['signature'] = minhash_signature(get_document_text(doc))
+    analysis['title'] = extract_document_title(doc)
+    try:
+        analysis['author'] = doc.core_properties.author or ""
+    except Exception:
+        analysis['author'] = ""
+    
+    # 内置.doc读取器不解析图片
+    part = getattr(doc, 'part', None)
+    if part is not None:
+        images = [rel.target_part for rel in part.rels.values() if "image" in rel.reltype and not rel.is_external]
+        analysis['image_count'] = len(images)
+        analysis['image_bytes'] = sum(len(image.blob) for image in images)
+    else:
+        analysis['image_count'] = None
+        analysis['image_bytes'] = None
+    return analysis
+
+def analyze_file(input_file):
+    """
+    打开Word文件并分析，可在工作进程中执行
+    
+    解析失败时不抛出异常，而是在结果的error字段中记录错误信息，以便缓存
+    
+    参数:
+        input_file: Word文件路径（.doc或.docx）
+        
+    返回:
+        dict: analyze_document的结果，另含error字段（成功时为None）
+    """
+    from doc_reader import load_document
+    try:
+        analysis = analyze_document(load_document(input_file))
+        analysis['error'] = None
+    except ImportError:
+        # 缺少依赖不是文件本身的问题，不应被缓存
+        raise
+    except Exception as e:
+        analysis = {
+            'word_count': None,
+            'paragraph_count': None,
+            'character_count': None,
+            'title': "",
+            'author': "",
+            'image_count': None,
+            'image_bytes': None,
+            'signature': None,
+            'error': str(e) or type(e).__name__,
+        }
+    return analysis
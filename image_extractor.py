@@ -9,6 +9,7 @@ import os
 import sys
 import shutil
 from zipfile import BadZipFile
+from task_events import report
 try:
     from PIL import Image
 except ImportError:
@@ -32,103 +33,98 @@ def extract_images_from_doc(input_file, output_dir):
         
         extracted_images = []
         
-        # 针对.doc文件使用pywin32处理
+        # .doc文件使用共享缓存中的转换结果读取图片
         if input_file.lower().endswith('.doc'):
+            from conversion_cache import get_cached_docx
+            from doc_converters import ConversionError
+            
             try:
-                import win32com.client
-                import pythoncom
-                
-                # 初始化COM
-                pythoncom.CoInitialize()
-                
-                # 创建临时目录
-                temp_dir = os.path.join(output_dir, "temp_conversion")
-                os.makedirs(temp_dir, exist_ok=True)
-                
-                # 临时docx文件路径
-                temp_docx = os.path.join(temp_dir, "temp_file.docx")
-                
-                # 使用Word转换doc为docx
-                word_app = win32com.client.Dispatch("Word.Application")
-                word_app.Visible = False
-                
-                try:
-                    doc = word_app.Documents.Open(os.path.abspath(input_file))
-                    doc.SaveAs2(os.path.abspath(temp_docx), FileFormat=16)  # 16表示docx格式
-                    doc.Close()
-                    
-                    # 处理转换后的docx文件
-                    with open(temp_docx, 'rb') as f:
-                        # 使用docx2python提取图片
-                        from docx2python import docx2python
-                        docx_content = docx2python(temp_docx)
-                        
-                        # 提取所有图片
-                        image_index = 0
-                        for image_data in docx_content.images:
-                            if image_data[1]:  # 确保有图片数据
-                                image_ext = '.png'  # 默认扩展名
-                                image_path = os.path.join(output_dir, f"image_{image_index}{image_ext}")
-                                with open(image_path, 'wb') as img_file:
-                                    img_file.write(image_data[1])
-                                extracted_images.append(image_path)
-                                image_index += 1
-                finally:
-                    word_app.Quit()
-                    pythoncom.CoUninitialize()
-                    
-                    # 清理临时文件
-                    if os.path.exists(temp_docx):
-                        os.remove(temp_docx)
-                    if os.path.exists(temp_dir):
-                        shutil.rmtree(temp_dir)
-            except ImportError:
-                print("× 错误: 处理.doc文件需要安装pywin32和docx2python")
+                images = read_docx_images(get_cached_docx(input_file))
+            except ConversionError as e:
+                report(f"× 转换doc文件失败: {str(e)}")
                 return []
         else:
             # 处理.docx文件
             try:
-                doc = Document(input_file)
+                images = read_docx_images(input_file)
             except BadZipFile:
-                print(f"× 错误：文件 '{input_file}' 可能已损坏或不是有效的Word文档")
+                report(f"× 错误：文件 '{input_file}' 可能已损坏或不是有效的Word文档")
                 return []
-            
-            # 直接从文档关系中提取图片
-            image_index = 0
-            for rel in doc.part.rels.values():
-                if "image" in rel.reltype:
-                    try:
-                        image_part = rel.target_part
-                        
-                        # 确定文件扩展名
-                        content_type = image_part.content_type
-                        extension = '.jpg'  # 默认扩展名
-                        if 'png' in content_type:
-                            extension = '.png'
-                        elif 'gif' in content_type:
-                            extension = '.gif'
-                        elif 'tiff' in content_type:
-                            extension = '.tiff'
-                        elif 'bmp' in content_type:
-                            extension = '.bmp'
-                        
-                        # 保存图片到输出目录
-                        image_filename = f"img_{image_index}{extension}"
-                        image_path = os.path.join(output_dir, image_filename)
-                        with open(image_path, 'wb') as f:
-                            f.write(image_part.blob)
-                        
-                        extracted_images.append(image_path)
-                        image_index += 1
-                    except Exception as e:
-                        print(f"× 提取图片时出错: {str(e)}")
         
-        print(f"✓ 成功从文档中提取了 {len(extracted_images)} 张图片")
+        # 保存图片到输出目录
+        for image_filename, blob in images:
+            try:
+                image_path = os.path.join(output_dir, image_filename)
+                write_image_file(image_path, blob)
+                extracted_images.append(image_path)
+            except Exception as e:
+                report(f"× 提取图片时出错: {str(e)}")
+        
+        report(f"✓ 成功从文档中提取了 {len(extracted_images)} 张图片")
         return extracted_images
     except Exception as e:
-        print(f"× 提取图片时出现错误: {str(e)}")
+        report(f"× 提取图片时出现错误: {str(e)}")
         return []
 
+def get_image_extension(content_type):
+    """
+    根据图片的内容类型确定文件扩展名
+    
+    参数:
+        content_type: 图片部件的内容类型
+        
+    返回:
+        str: 文件扩展名
+    """
+    if 'png' in content_type:
+        return '.png'
+    elif 'gif' in content_type:
+        return '.gif'
+    elif 'tiff' in content_type:
+        return '.tiff'
+    elif 'bmp' in content_type:
+        return '.bmp'
+    return '.jpg'  # 默认扩展名
+
+def read_docx_images(input_file):
+    """
+    读取.docx文档中的所有图片数据，不写入磁盘
+    
+    参数:
+        input_file: Word文档路径
+        
+    返回:
+        list: (图片文件名, 图片数据) 元组列表
+    """
+    doc = Document(input_file)
+    
+    # 直接从文档关系中读取图片
+    images = []
+    for rel in doc.part.rels.values():
+        if "image" in rel.reltype:
+            try:
+                image_part = rel.target_part
+                extension = get_image_extension(image_part.content_type)
+                images.append((f"img_{len(images)}{extension}", image_part.blob))
+            except Exception as e:
+                report(f"× 读取图片时出错: {str(e)}")
+    return images
+
+def write_image_file(image_path, blob):
+    """
+    将图片数据写入文件
+    
+    参数:
+        image_path: 图片保存路径
+        blob: 图片数据
+        
+    返回:
+        str: 图片保存路径
+    """
+    with open(image_path, 'wb') as f:
+        f.write(blob)
+    return image_path
+
 def add_images_to_document(doc, images, width=None):
     """
     将图片添加到文档末尾
@@ -152,7 +148,7 @@ def add_images_to_document(doc, images, width=None):
             run = img_para.add_run()
             run.add_picture(img_path, width=width)
         except Exception as e:
-            print(f"× 添加图片到文档时出错：{str(e)}")
+            report(f"× 添加图片到文档时出错：{str(e)}")
             
 def extract_document_image_relations(doc):
     """
@@ -215,9 +211,9 @@ def find_paragraph_images(doc, image_relations):
                                     
                                 para_images.append(img_temp_path)
                             except Exception as e:
-                                print(f"× 处理图片 {rel_id} 时出错: {str(e)}")
+                                report(f"× 处理图片 {rel_id} 时出错: {str(e)}")
             except Exception as e:
-                print(f"× 检查run中的图片时出错: {str(e)}")
+                report(f"× 检查run中的图片时出错: {str(e)}")
         
         # 如果段落包含图片，记录下来
         if para_images:
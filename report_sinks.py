@@ -0,0 +1,308 @@
+"""
+提供可替换的报告输出（Excel、CSV、JSON Lines、SQLite）
+
+所有报告输出使用相同的接口：add_sheet(名称, 表头) 得到一个工作表，
+append(行) 追加一行，save() 完成写入并返回生成的文件路径列表。CSV、JSON Lines和SQLite
+在追加时立即写入磁盘，处理大批量文件时无需在内存中累积结果，
+其他脚本可以在处理过程中读取已完成文件的结果。
+"""
+import os
+import csv
+import json
+import time
+import sqlite3
+
+from excel_report import ExcelReport, EXCEL_AVAILABLE
+
+# 支持的报告格式及显示名称
+REPORT_FORMATS = {
+    "excel": "Excel",
+    "csv": "CSV",
+    "jsonl": "JSON Lines",
+    "sqlite": "SQLite",
+}
+
+# SQLite报告累计多少行或经过多少秒后提交一次
+SQLITE_COMMIT_ROWS = 100
+SQLITE_COMMIT_SECONDS = 1.0
+
+
+def _safe_name(name):
+    """将工作表名称转换为可用于文件名的形式"""
+    return "".join("_" if char in '\\/:*?"<>|' else char for char in name)
+
+
+class ReportSink:
+    """报告输出的基类"""
+
+    def __init__(self, base_path):
+        """
+        参数:
+            base_path: 报告路径（不含扩展名）
+        """
+        self.base_path = base_path
+        os.makedirs(os.path.dirname(os.path.abspath(base_path)), exist_ok=True)
+
+    def add_sheet(self, title, headers=None, column_styles=None):
+        """
+        添加工作表
+
+        参数:
+            title: 工作表名称
+            headers: 表头（可选）
+            column_styles: Excel列样式，其他格式忽略
+
+        返回:
+            支持append(values, style=None)的工作表对象
+        """
+        raise NotImplementedError
+
+    def save(self):
+        """
+        完成写入
+
+        返回:
+            list: 生成的文件路径
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """关闭尚未完成的报告"""
+
+
+class ExcelSink(ReportSink):
+    """Excel报告（保存时写出）"""
+
+    def __init__(self, base_path):
+        super().__init__(base_path)
+        self._report = ExcelReport(base_path + ".xlsx")
+
+    def add_sheet(self, title, headers=None, column_styles=None):
+        return self._report.add_sheet(title, headers, column_styles)
+
+    def save(self):
+        return [self._report.save()]
+
+    def close(self):
+        self._report.close()
+
+
+class _CsvSheet:
+    def __init__(self, path, headers):
+        self.path = path
+        # 带BOM的UTF-8，Excel可直接打开
+        self._file = open(path, "w", encoding="utf-8-sig", newline="")
+        self._writer = csv.writer(self._file)
+        if headers:
+            self.append(headers)
+
+    def append(self, values, style=None):
+        self._writer.writerow(values)
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class CsvSink(ReportSink):
+    """CSV报告，每个工作表一个文件"""
+
+    def __init__(self, base_path):
+        super().__init__(base_path)
+        self._sheets = []
+
+    def add_sheet(self, title, headers=None, column_styles=None):
+        sheet = _CsvSheet(f"{self.base_path}_{_safe_name(title)}.csv", headers)
+        self._sheets.append(sheet)
+        return sheet
+
+    def save(self):
+        self.close()
+        return [sheet.path for sheet in self._sheets]
+
+    def close(self):
+        for sheet in self._sheets:
+            sheet.close()
+
+
+class _JsonLinesSheet:
+    def __init__(self, sink, title, headers):
+        self._sink = sink
+        self.title = title
+        self.headers = list(headers) if headers else None
+
+    def append(self, values, style=None):
+        values = list(values)
+        if self.headers:
+            record = {"sheet": self.title}
+            record.update(zip(self.headers, values))
+        else:
+            record = {"sheet": self.title, "values": values}
+        self._sink.write(record)
+
+
+class JsonLinesSink(ReportSink):
+    """JSON Lines报告，所有工作表的行写入同一个文件，每行带sheet字段"""
+
+    def __init__(self, base_path):
+        super().__init__(base_path)
+        self.path = base_path + ".jsonl"
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def add_sheet(self, title, headers=None, column_styles=None):
+        return _JsonLinesSheet(self, title, headers)
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+    def save(self):
+        self.close()
+        return [self.path]
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class _SqliteSheet:
+    def __init__(self, sink, title, headers):
+        self._sink = sink
+        self.table = title
+        self.columns = list(headers) if headers else None
+
+    def _create_table(self, width):
+        if self.columns is None:
+            self.columns = [f"列{i}" for i in range(1, width + 1)]
+        columns = ", ".join(f'"{c}"' for c in self.columns)
+        self._sink.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" ({columns})')
+        self._insert = (f'INSERT INTO "{self.table}" VALUES '
+                        f'({", ".join("?" for _ in self.columns)})')
+
+    def append(self, values, style=None):
+        values = list(values)
+        if not hasattr(self, "_insert"):
+            self._create_table(len(values))
+        values = (values + [None] * len(self.columns))[:len(self.columns)]
+        self._sink.execute(self._insert, values, row=True)
+
+
+class SqliteSink(ReportSink):
+    """SQLite报告，每个工作表一张表"""
+
+    def __init__(self, base_path):
+        super().__init__(base_path)
+        self.path = base_path + ".sqlite3"
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    def add_sheet(self, title, headers=None, column_styles=None):
+        return _SqliteSheet(self, _safe_name(title).replace('"', ''), headers)
+
+    def execute(self, sql, parameters=(), row=False):
+        self._conn.execute(sql, parameters)
+        if not row:
+            self._conn.commit()
+            return
+        self._uncommitted += 1
+        # 定期提交，其他程序可以读取已写入的行
+        if self._uncommitted >= SQLITE_COMMIT_ROWS or time.monotonic() - self._last_commit >= SQLITE_COMMIT_SECONDS:
+            self._commit()
+
+    def _commit(self):
+        self._conn.commit()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    def save(self):
+        self.close()
+        return [self.path]
+
+    def close(self):
+        if self._conn is not None:
+            self._commit()
+            self._conn.close()
+            self._conn = None
+
+
+# 格式名称 -> 报告输出类
+SINKS = {
+    "excel": ExcelSink,
+    "csv": CsvSink,
+    "jsonl": JsonLinesSink,
+    "sqlite": SqliteSink,
+}
+
+
+def available_formats():
+    """当前环境可用的报告格式"""
+    return [name for name in REPORT_FORMATS if name != "excel" or EXCEL_AVAILABLE]
+
+
+class MultiSink(ReportSink):
+    """同时写入多种格式的报告"""
+
+    def __init__(self, base_path, formats):
+        """
+        参数:
+            base_path: 报告路径（不含扩展名）
+            formats: 报告格式列表，未安装openpyxl时Excel改为CSV
+        """
+        super().__init__(base_path)
+        formats = list(dict.fromkeys(formats or ["excel"]))
+        if "excel" in formats and not EXCEL_AVAILABLE:
+            print("! 未安装openpyxl，Excel报告改为CSV格式")
+            formats = [f for f in formats if f != "excel"]
+            if "csv" not in formats:
+                formats.append("csv")
+        self.sinks = []
+        try:
+            for name in formats:
+                self.sinks.append(SINKS[name](base_path))
+        except Exception:
+            self.close()
+            raise
+
+    def add_sheet(self, title, headers=None, column_styles=None):
+        return _MultiSheet([sink.add_sheet(title, headers, column_styles) for sink in self.sinks])
+
+    def save(self):
+        """
+        返回:
+            list: 各格式报告生成的文件路径
+        """
+        return [path for sink in self.sinks for path in sink.save()]
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class _MultiSheet:
+    def __init__(self, sheets):
+        self._sheets = sheets
+
+    def append(self, values, style=None):
+        values = list(values)
+        for sheet in self._sheets:
+            sheet.append(values, style)
+
+
+def create_report(reports_dir, name, formats):
+    """
+    在报告目录中创建带时间戳的报告
+
+    参数:
+        reports_dir: 报告目录
+        name: 报告名称，如"字数统计报告"
+        formats: 报告格式列表
+
+    返回:
+        MultiSink: 报告输出
+    """
+    current_time = time.strftime("%Y%m%d_%H%M%S")
+    return MultiSink(os.path.join(reports_dir, f"{name}_{current_time}"), formats)
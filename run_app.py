@@ -6,6 +6,8 @@ Word文档批量处理工具启动脚本
 """
 import sys
 import os
+import json
+import time
 import subprocess
 import importlib.util
 import tkinter as tk
@@ -22,11 +24,67 @@ OPTIONAL_PACKAGES = [
     ("openpyxl", "openpyxl", "Excel报告生成(可选)")
 ]
 
+# 依赖检查结果的缓存文件（位于缓存目录）
+DEPENDENCY_CACHE_FILE = "dependencies.json"
+
+# 启动基准：导入主界面模块的时间上限（秒），以及启动时不应导入的较重模块
+STARTUP_IMPORT_BUDGET = 0.5
+STARTUP_HEAVY_MODULES = ("docx", "openpyxl", "PIL", "numpy", "word_processors", "image_extractor")
+
 def check_dependency(package_name, import_name):
     """检查依赖包是否已安装"""
     spec = importlib.util.find_spec(import_name)
     return spec is not None
 
+def _environment_signature():
+    """
+    当前Python环境的特征：解释器、版本和各搜索路径的修改时间
+
+    安装或卸载包会改变site-packages目录的修改时间，缓存随之失效
+    """
+    paths = []
+    for path in sys.path:
+        try:
+            paths.append([path, os.stat(path or os.curdir).st_mtime_ns])
+        except OSError:
+            pass
+    return {"executable": sys.executable, "version": sys.version, "paths": paths}
+
+def _dependency_cache_path():
+    from file_utils import get_cache_dir
+    return os.path.join(get_cache_dir(), DEPENDENCY_CACHE_FILE)
+
+def probe_dependencies(use_cache=True):
+    """
+    检查各依赖包是否已安装，环境未变化时直接使用上次的结果
+
+    参数:
+        use_cache: 是否使用缓存的结果
+
+    返回:
+        dict: 导入名 -> 是否已安装
+    """
+    signature = _environment_signature()
+    if use_cache:
+        try:
+            with open(_dependency_cache_path(), "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("signature") == signature:
+                return cached["installed"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    installed = {
+        import_name: check_dependency(import_name, import_name)
+        for _, import_name, _ in REQUIRED_PACKAGES + OPTIONAL_PACKAGES
+    }
+    try:
+        with open(_dependency_cache_path(), "w", encoding="utf-8") as f:
+            json.dump({"signature": signature, "installed": installed}, f)
+    except OSError:
+        pass
+    return installed
+
 def install_package(package_name):
     """安装依赖包"""
     try:
@@ -39,17 +97,18 @@ def check_dependencies():
     """检查所有依赖包，并尝试安装缺少的包"""
     missing_packages = []
     optional_missing = []
+    installed = probe_dependencies()
     
     # 检查必需的包
     for package_info in REQUIRED_PACKAGES:
         package_name, import_name, description = package_info
-        if not check_dependency(import_name, import_name):
+        if not installed.get(import_name):
             missing_packages.append((package_name, description))
     
     # 检查可选的包
     for package_info in OPTIONAL_PACKAGES:
         package_name, import_name, description = package_info
-        if not check_dependency(import_name, import_name):
+        if not installed.get(import_name):
             optional_missing.append((package_name, description))
     
     # 如果有缺少的必需包，尝试安装
@@ -59,6 +118,9 @@ def check_dependencies():
             print(f"正在安装 {package_name} ({description})...")
             if not install_package(package_name):
                 return False, f"无法安装依赖项: {package_name}"
+        # 安装后重新检查并更新缓存
+        importlib.invalidate_caches()
+        probe_dependencies(use_cache=False)
     
     # 显示可选包的安装信息
     if optional_missing:
@@ -68,6 +130,43 @@ def check_dependencies():
     
     return True, "所有必需的依赖项已安装"
 
+def benchmark_startup(runs=3, budget=STARTUP_IMPORT_BUDGET):
+    """
+    测量导入主界面模块的时间，并检查启动时是否导入了较重的模块
+
+    每次在新的子进程中导入gui.app，取最快的一次，避免受磁盘缓存等因素影响。
+
+    参数:
+        runs: 测量次数
+        budget: 导入时间上限（秒）
+
+    返回:
+        bool: 是否在时间上限内且未导入较重的模块
+    """
+    code = (
+        "import sys, time, json\n"
+        "start = time.perf_counter()\n"
+        "import gui.app\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"heavy = [m for m in {STARTUP_HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n"
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True,
+                                text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    elapsed = min(result["elapsed"] for result in results)
+    heavy = sorted(set(m for result in results for m in result["heavy"]))
+    print(f"导入 gui.app 用时 {elapsed * 1000:.0f} 毫秒（上限 {budget * 1000:.0f} 毫秒）")
+    if heavy:
+        print(f"× 启动时导入了较重的模块: {', '.join(heavy)}")
+    ok = elapsed <= budget and not heavy
+    print("✓ 启动基准通过" if ok else "× 启动基准未通过")
+    return ok
+
 def show_gui_error(message):
     """显示图形界面错误消息"""
     try:
@@ -101,4 +200,9 @@ def start_app():
         show_gui_error(f"检查依赖项时出错: {str(e)}")
 
 if __name__ == "__main__":
+    # 打包为exe后使用进程池需要此调用
+    import multiprocessing
+    multiprocessing.freeze_support()
+    if "--benchmark-startup" in sys.argv:
+        sys.exit(0 if benchmark_startup() else 1)
     start_app()
\ No newline at end of file
@@ -0,0 +1,236 @@
+"""
+提供基于MinHash和LSH的相似文档检测
+
+将文档正文规范化后切分为字符片段（shingle），计算固定长度的MinHash签名；
+签名按段（band）放入LSH索引，只有至少一段完全相同的文档才作为候选对，
+再用签名估计相似度，避免对所有文档两两比较。签名很小，可随分析结果一起缓存。
+安装了NumPy时对所有哈希函数向量化计算签名；未安装时使用结果相同的纯Python实现。
+"""
+import random
+import struct
+import zlib
+
+# 检查是否安装了numpy库
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# 字符片段长度
+SHINGLE_SIZE = 4
+
+# 签名长度及LSH分段方式（段数 × 每段行数 = 签名长度）
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 32
+LSH_ROWS = 4
+
+# 默认的相似度阈值（估计的Jaccard相似度）
+SIMILARITY_THRESHOLD = 0.5
+
+# 规范化后少于该字数的文档不计算签名
+MIN_TEXT_LENGTH = 50
+
+# 哈希函数 h(x) = (a * x + b) mod P，P为梅森素数 2^31 - 1
+_PRIME = (1 << 31) - 1
+_random = random.Random(20230915)
+_COEFFICIENTS = [
+    (_random.randrange(1, _PRIME), _random.randrange(0, _PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+_SIGNATURE_FORMAT = f"<{NUM_PERMUTATIONS}I"
+
+# 向量化计算时每次处理的片段数，限制中间矩阵（哈希函数数 × 片段数）的内存占用
+_NUMPY_CHUNK = 4096
+
+
+def normalize_text(text):
+    """
+    规范化文本：只保留字母、数字和中文字符并转为小写，与字数统计的规则一致
+
+    参数:
+        text: 原始文本
+
+    返回:
+        str: 规范化后的文本
+    """
+    return "".join(char for char in text.lower() if char.isalnum() or '\u4e00' <= char <= '\u9fff')
+
+
+def text_shingles(text, size=SHINGLE_SIZE):
+    """
+    将规范化后的文本切分为字符片段并哈希
+
+    参数:
+        text: 规范化后的文本
+        size: 片段长度
+
+    返回:
+        set: 片段哈希值集合
+    """
+    if len(text) < size:
+        return set()
+    data = [text[i:i + size].encode("utf-8") for i in range(len(text) - size + 1)]
+    return {zlib.crc32(shingle) & _PRIME for shingle in data}
+
+
+def minhash_signature(text):
+    """
+    计算文本的MinHash签名
+
+    参数:
+        text: 文档正文
+
+    返回:
+        bytes: 签名（NUM_PERMUTATIONS个无符号32位整数），文本过短时返回None
+    """
+    text = normalize_text(text)
+    if len(text) < MIN_TEXT_LENGTH:
+        return None
+    shingles = text_shingles(text)
+    if NUMPY_AVAILABLE:
+        values = _numpy_min_hashes(shingles)
+    else:
+        values = [min([(a * x + b) % _PRIME for x in shingles]) for a, b in _COEFFICIENTS]
+    return struct.pack(_SIGNATURE_FORMAT, *values)
+
+
+def _numpy_min_hashes(shingles):
+    """
+    用numpy计算每个哈希函数在所有片段上的最小值
+
+    a、x均小于2^31，a * x + b 不会超出uint64的范围，结果与纯Python实现完全相同。
+
+    参数:
+        shingles: 片段哈希值集合
+
+    返回:
+        list: NUM_PERMUTATIONS个最小哈希值
+    """
+    a, b = _numpy_coefficients()
+    values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+    result = np.full(NUM_PERMUTATIONS, _PRIME, dtype=np.uint64)
+    for start in range(0, len(values), _NUMPY_CHUNK):
+        chunk = values[start:start + _NUMPY_CHUNK]
+        hashes = np.multiply.outer(a, chunk)
+        hashes += b[:, None]
+        hashes %= np.uint64(_PRIME)
+        np.minimum(result, hashes.min(axis=1), out=result)
+    return result.tolist()
+
+
+_numpy_arrays = None
+
+
+def _numpy_coefficients():
+    """哈希函数系数的numpy数组，首次使用时创建"""
+    global _numpy_arrays
+    if _numpy_arrays is None:
+        _numpy_arrays = (
+            np.array([a for a, _ in _COEFFICIENTS], dtype=np.uint64),
+            np.array([b for _, b in _COEFFICIENTS], dtype=np.uint64),
+        )
+    return _numpy_arrays
+
+
+def unpack_signature(signature):
+    """将签名字节解包为整数元组，长度不符时返回None"""
+    if not signature or len(signature) != struct.calcsize(_SIGNATURE_FORMAT):
+        return None
+    return struct.unpack(_SIGNATURE_FORMAT, signature)
+
+
+def estimate_similarity(signature_a, signature_b):
+    """
+    用两个签名估计文档的Jaccard相似度
+
+    参数:
+        signature_a: 解包后的签名
+        signature_b: 解包后的签名
+
+    返回:
+        float: 0到1之间的相似度
+    """
+    same = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return same / NUM_PERMUTATIONS
+
+
+class LSHIndex:
+    """MinHash签名的LSH分段索引"""
+
+    def __init__(self, bands=LSH_BANDS, rows=LSH_ROWS):
+        """
+        参数:
+            bands: 段数
+            rows: 每段包含的签名值个数
+        """
+        if bands * rows > NUM_PERMUTATIONS:
+            raise ValueError("段数与每段行数之积不能超过签名长度")
+        self.bands = bands
+        self.rows = rows
+        # 每段一个字典：段内签名值 -> 文档键列表
+        self._buckets = [{} for _ in range(bands)]
+        self.signatures = {}
+
+    def add(self, key, signature):
+        """
+        加入一个文档
+
+        参数:
+            key: 文档键（如文件名）
+            signature: minhash_signature返回的签名字节
+
+        返回:
+            set: 与该文档至少有一段相同的已加入文档的键（候选相似文档）
+        """
+        values = unpack_signature(signature)
+        if values is None:
+            return set()
+        candidates = set()
+        for band, buckets in enumerate(self._buckets):
+            start = band * self.rows
+            bucket = buckets.setdefault(values[start:start + self.rows], [])
+            candidates.update(bucket)
+            bucket.append(key)
+        self.signatures[key] = values
+        return candidates
+
+    def similar_to(self, key, candidates, threshold=SIMILARITY_THRESHOLD):
+        """
+        从候选文档中筛选估计相似度达到阈值的文档
+
+        返回:
+            list: (候选键, 相似度) 列表
+        """
+        values = self.signatures[key]
+        matches = []
+        for other in candidates:
+            similarity = estimate_similarity(values, self.signatures[other])
+            if similarity >= threshold:
+                matches.append((other, similarity))
+        return matches
+
+
+def find_similar_pairs(signatures, threshold=SIMILARITY_THRESHOLD):
+    """
+    在一批文档中找出相似的文档对
+
+    参数:
+        signatures: 可迭代的 (文档键, 签名字节)，按文档顺序排列
+        threshold: 相似度阈值
+
+    返回:
+        list: (先出现的文档键, 后出现的文档键, 相似度) 列表，按相似度从高到低排列
+    """
+    index = LSHIndex()
+    order = {}
+    pairs = []
+    for key, signature in signatures:
+        candidates = index.add(key, signature)
+        if key not in index.signatures:
+            continue
+        order[key] = len(order)
+        for other, similarity in index.similar_to(key, candidates, threshold):
+            pairs.append((other, key, similarity))
+    pairs.sort(key=lambda pair: (-pair[2], order[pair[0]], order[pair[1]]))
+    return pairs
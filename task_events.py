@@ -0,0 +1,288 @@
+"""
+提供按任务划分的结构化处理事件
+
+处理函数通过 report() 输出日志。当处于 task_context() 中时，消息会被记录为
+带有文件名、阶段、级别和耗时信息的 TaskEvent，并投递到线程/进程安全的事件通道；
+不在任务上下文中时则与原来一样直接 print 到标准输出。
+"""
+import queue
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# 事件级别
+LEVEL_DEBUG = "debug"
+LEVEL_INFO = "info"
+LEVEL_SUCCESS = "success"
+LEVEL_WARNING = "warning"
+LEVEL_ERROR = "error"
+
+# 日志前缀与级别的对应关系（与原有的 ×/✓/! 约定保持一致）
+LEVEL_PREFIXES = {
+    LEVEL_SUCCESS: "✓",
+    LEVEL_ERROR: "×",
+    LEVEL_WARNING: "!",
+}
+
+# 当前线程/协程所处的任务上下文
+_current_task = ContextVar("current_task", default=None)
+
+
+def detect_level(message):
+    """
+    根据消息前缀推断事件级别
+
+    参数:
+        message: 日志消息
+
+    返回:
+        str: 事件级别
+    """
+    text = message.strip()
+    if text.startswith("DEBUG"):
+        return LEVEL_DEBUG
+    for level, prefix in LEVEL_PREFIXES.items():
+        if text.startswith(prefix):
+            return level
+    # 兼容增强版处理器使用的√前缀
+    if text.startswith("√"):
+        return LEVEL_SUCCESS
+    return LEVEL_INFO
+
+
+class TaskEvent:
+    """单条结构化处理事件"""
+
+    __slots__ = ("file", "stage", "level", "message", "timestamp", "elapsed")
+
+    def __init__(self, file, stage, level, message, timestamp=None, elapsed=0.0):
+        """
+        初始化处理事件
+
+        参数:
+            file: 事件所属的文件名（可为None）
+            stage: 处理阶段
+            level: 事件级别
+            message: 消息文本
+            timestamp: 事件时间戳，默认为当前时间
+            elapsed: 距任务开始的耗时（秒）
+        """
+        self.file = file
+        self.stage = stage
+        self.level = level
+        self.message = message
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.elapsed = elapsed
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"TaskEvent({self.file!r}, {self.stage!r}, {self.level!r}, {self.message!r})"
+
+    def format(self):
+        """
+        格式化为日志行，错误和警告信息附带作者信息
+
+        返回:
+            str: 以换行结尾的日志文本
+        """
+        text = self.message.strip()
+        if self.file and self.level in (LEVEL_ERROR, LEVEL_WARNING) and not text.endswith(".docx"):
+            from file_utils import extract_author_number, extract_author_from_filename
+            author_num = extract_author_number(self.file)
+            if self.level == LEVEL_ERROR:
+                author_name = extract_author_from_filename(self.file)
+                return f"作者{author_num}({author_name}): {text}\n"
+            return f"作者{author_num}: {text}\n"
+        return self.message if self.message.endswith("\n") else self.message + "\n"
+
+
+class TaskResult:
+    """单个任务的处理结果"""
+
+    __slots__ = ("file", "success", "value", "error", "elapsed", "events", "outputs")
+
+    def __init__(self, file, success=False, value=None, error=None, elapsed=0.0, events=None, outputs=None):
+        self.file = file
+        self.success = success
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+        self.events = events if events is not None else []
+        self.outputs = outputs if outputs is not None else []
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+class EventChannel:
+    """
+    事件通道，包装一个线程安全队列
+
+    默认使用 queue.Queue；需要跨进程时可传入 multiprocessing.Manager().Queue()
+    """
+
+    def __init__(self, backing_queue=None):
+        """
+        初始化事件通道
+
+        参数:
+            backing_queue: 底层队列对象，需支持put和get_nowait
+        """
+        self._queue = backing_queue if backing_queue is not None else queue.Queue()
+
+    def put(self, event):
+        """投递一个事件或任务结果"""
+        self._queue.put(event)
+
+    def drain(self, max_items=None):
+        """
+        非阻塞地取出当前所有（或至多max_items个）事件
+
+        参数:
+            max_items: 最多取出的数量，None表示全部
+
+        返回:
+            list: 事件列表
+        """
+        items = []
+        while max_items is None or len(items) < max_items:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            except (EOFError, OSError):
+                # 跨进程队列在关闭后可能抛出这些异常
+                break
+        return items
+
+
+class TaskContext:
+    """任务上下文，记录当前处理的文件、阶段和产生的事件"""
+
+    def __init__(self, file, channel=None, stage="处理"):
+        self.file = file
+        self.channel = channel
+        self.stage = stage
+        self.start_time = time.perf_counter()
+        self.events = []
+        self.outputs = []
+
+    def emit(self, message, level=None, stage=None):
+        """记录一条事件，并在有通道时立即投递"""
+        event = TaskEvent(
+            self.file,
+            stage or self.stage,
+            level or detect_level(message),
+            message,
+            elapsed=time.perf_counter() - self.start_time,
+        )
+        self.events.append(event)
+        if self.channel is not None:
+            self.channel.put(event)
+        return event
+
+
+@contextmanager
+def task_context(file, channel=None, stage="处理"):
+    """
+    进入一个任务上下文，上下文内的 report() 调用都会归属到该文件
+
+    参数:
+        file: 当前处理的文件名
+        channel: 事件通道（可选），为None时事件只保留在上下文中
+        stage: 初始处理阶段
+    """
+    context = TaskContext(file, channel, stage)
+    token = _current_task.set(context)
+    try:
+        yield context
+    finally:
+        _current_task.reset(token)
+
+
+def current_task():
+    """获取当前的任务上下文，不在任务中时返回None"""
+    return _current_task.get()
+
+
+def set_stage(stage):
+    """设置当前任务的处理阶段"""
+    context = _current_task.get()
+    if context is not None:
+        context.stage = stage
+
+
+def report(message, level=None, stage=None):
+    """
+    输出一条处理日志
+
+    在任务上下文中记录为结构化事件，否则直接打印到标准输出
+
+    参数:
+        message: 日志消息，沿用 ×/✓/! 前缀约定
+        level: 事件级别，默认根据前缀推断
+        stage: 处理阶段，默认使用上下文当前阶段
+    """
+    context = _current_task.get()
+    if context is None:
+        print(message)
+        return None
+    return context.emit(message, level, stage)
+
+
+def record_output(path):
+    """记录当前任务生成的输出文件"""
+    context = _current_task.get()
+    if context is not None:
+        context.outputs.append(path)
+
+
+def run_task(func, file, *args, channel=None, stage="处理", **kwargs):
+    """
+    在任务上下文中运行处理函数，并返回结构化结果
+
+    处理函数返回False或抛出异常时视为失败。该函数可在进程池中执行，
+    此时结果中的事件会随返回值一起传回主进程。
+
+    参数:
+        func: 处理函数
+        file: 当前处理的文件名
+        channel: 事件通道（可选）
+        stage: 初始处理阶段
+
+    返回:
+        TaskResult: 任务结果
+    """
+    with task_context(file, channel, stage) as context:
+        try:
+            value = func(*args, **kwargs)
+            success = value is not False
+            error = None
+            if not success:
+                errors = [e.message.strip() for e in context.events if e.level == LEVEL_ERROR]
+                error = errors[-1] if errors else None
+        except Exception as e:
+            value = None
+            success = False
+            error = str(e)
+            context.emit(f"× 处理文件时出现错误：{error}", LEVEL_ERROR)
+
+        return TaskResult(
+            file,
+            success=success,
+            value=value,
+            error=error,
+            elapsed=time.perf_counter() - context.start_time,
+            events=context.events,
+            outputs=context.outputs,
+        )
@@ -0,0 +1,15 @@
+"""
+测试的公共配置
+
+将项目根目录加入模块搜索路径，并把缓存目录指向临时目录，避免读写用户的缓存。
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# 需在导入被测模块之前设置，缓存目录在首次使用时才读取该变量
+os.environ["C_DOC_CACHE_DIR"] = tempfile.mkdtemp(prefix="c-doc-test-cache-")
@@ -0,0 +1,120 @@
+"""
+生成用于测试的最小.doc（Word 97-2003）文件
+
+写出只含WordDocument和1Table两个流的复合文档，正文为一个未压缩（UTF-16）的分段，
+足以让内置的.doc读取器提取段落，测试无需安装python-docx或Word。
+"""
+import struct
+
+SECTOR_SIZE = 512
+# 流至少为该大小时存放在常规扇区中，无需小流
+MINI_STREAM_CUTOFF = 4096
+FREESECT = 0xFFFFFFFF
+ENDOFCHAIN = 0xFFFFFFFE
+FATSECT = 0xFFFFFFFD
+NOSTREAM = 0xFFFFFFFF
+
+# 正文在WordDocument流中的偏移
+TEXT_OFFSET = 1024
+
+
+def _pad(data, size):
+    size = max(size, len(data))
+    size = -(-size // SECTOR_SIZE) * SECTOR_SIZE
+    return data + b"\0" * (size - len(data))
+
+
+def _word_document(text):
+    """生成WordDocument流：文件信息块（FIB）加正文"""
+    fib = bytearray(TEXT_OFFSET)
+    struct.pack_into("<HH", fib, 0, 0xA5EC, 0x00C1)
+    # fWhichTblStm：分段表位于1Table流
+    struct.pack_into("<H", fib, 0x0A, 0x0200)
+    csw, cslw, cb_rg_fc_lcb = 14, 22, 93
+    struct.pack_into("<H", fib, 32, csw)
+    position = 34 + csw * 2
+    struct.pack_into("<H", fib, position, cslw)
+    # FibRgLw97.ccpText
+    struct.pack_into("<i", fib, position + 2 + 3 * 4, len(text))
+    position = position + 2 + cslw * 4
+    struct.pack_into("<H", fib, position, cb_rg_fc_lcb)
+    # FibRgFcLcb97.fcClx / lcbClx，分段表放在1Table流开头
+    struct.pack_into("<II", fib, position + 2 + 33 * 8, 0, 5 + 8 + 8)
+    return _pad(bytes(fib) + text.encode("utf-16-le"), MINI_STREAM_CUTOFF)
+
+
+def _table(text):
+    """生成1Table流：只含一个分段的分段表（Clx）"""
+    plc = struct.pack("<II", 0, len(text)) + struct.pack("<HIH", 0, TEXT_OFFSET, 0)
+    clx = b"\x02" + struct.pack("<I", len(plc)) + plc
+    return _pad(clx, MINI_STREAM_CUTOFF)
+
+
+def _directory_entry(name, entry_type, start, size, left=NOSTREAM, right=NOSTREAM, child=NOSTREAM):
+    entry = bytearray(128)
+    if name:
+        encoded = name.encode("utf-16-le")
+        entry[:len(encoded)] = encoded
+        struct.pack_into("<H", entry, 64, len(encoded) + 2)
+    struct.pack_into("<BB", entry, 66, entry_type, 1)
+    struct.pack_into("<III", entry, 68, left, right, child)
+    struct.pack_into("<III", entry, 116, start, size, 0)
+    return bytes(entry)
+
+
+def build_doc(paragraphs):
+    """
+    生成.doc文件内容
+
+    参数:
+        paragraphs: 段落文本列表
+
+    返回:
+        bytes: 文件内容
+    """
+    text = "".join(p + "\r" for p in paragraphs)
+    word_document = _word_document(text)
+    table = _table(text)
+
+    # 扇区0为FAT，扇区1为目录，之后依次为WordDocument和1Table流
+    word_start = 2
+    word_sectors = len(word_document) // SECTOR_SIZE
+    table_start = word_start + word_sectors
+    table_sectors = len(table) // SECTOR_SIZE
+
+    fat = [FATSECT, ENDOFCHAIN]
+    for start, count in ((word_start, word_sectors), (table_start, table_sectors)):
+        fat.extend(start + i + 1 for i in range(count - 1))
+        fat.append(ENDOFCHAIN)
+    fat.extend([FREESECT] * (SECTOR_SIZE // 4 - len(fat)))
+
+    directory = b"".join((
+        _directory_entry("Root Entry", 5, ENDOFCHAIN, 0, child=1),
+        _directory_entry("WordDocument", 2, word_start, len(word_document), right=2),
+        _directory_entry("1Table", 2, table_start, len(table)),
+        _directory_entry("", 0, FREESECT, 0),
+    ))
+
+    header = bytearray(SECTOR_SIZE)
+    header[:8] = b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1"
+    struct.pack_into("<HHHHH", header, 24, 0x003E, 3, 0xFFFE, 9, 6)
+    struct.pack_into("<IIIIIIIII", header, 40, 0, 1, 1, 0, MINI_STREAM_CUTOFF, ENDOFCHAIN, 0, ENDOFCHAIN, 0)
+    struct.pack_into("<109I", header, 76, 0, *([FREESECT] * 108))
+
+    return bytes(header) + struct.pack(f"<{len(fat)}I", *fat) + directory + word_document + table
+
+
+def write_doc(path, paragraphs):
+    """
+    写出.doc文件
+
+    参数:
+        path: 文件路径
+        paragraphs: 段落文本列表
+
+    返回:
+        str: 文件路径
+    """
+    with open(path, "wb") as f:
+        f.write(build_doc(paragraphs))
+    return str(path)
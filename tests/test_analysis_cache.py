@@ -0,0 +1,52 @@
+"""
+analysis_cache 的测试
+"""
+import os
+
+from analysis_cache import AnalysisCache, iter_file_analyses
+
+from doc_factory import write_doc
+
+
+def _sequential_map(func, items):
+    for index, item in enumerate(items):
+        yield index, item, func(item), None
+
+
+def test_lookup_by_stat_and_by_content(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache.sqlite3"))
+    try:
+        path = tmp_path / "1张三.doc"
+        path.write_bytes(b"content")
+        assert cache.lookup(str(path)) is None
+        cache.put(str(path), {"word_count": 12, "title": "标题", "error": None})
+        assert cache.lookup(str(path))["word_count"] == 12
+
+        # 修改时间变化但内容未变：不计算哈希时未命中，计算哈希后命中
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+        assert cache.lookup(str(path), hash_changed=False) is None
+        assert cache.lookup(str(path))["title"] == "标题"
+        assert cache.lookup(str(path), hash_changed=False)["title"] == "标题"
+
+        # 内容相同的副本也能命中
+        copy = tmp_path / "副本.doc"
+        copy.write_bytes(b"content")
+        assert cache.lookup(str(copy))["word_count"] == 12
+    finally:
+        cache.close()
+
+
+def test_iter_file_analyses_uses_cache(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache.sqlite3"))
+    try:
+        files = [write_doc(tmp_path / f"{i}张三.doc", [f"标题{i}", "正文" * i]) for i in range(1, 4)]
+
+        first = sorted(iter_file_analyses(files, _sequential_map, cache))
+        assert [cached for _, _, _, cached in first] == [False, False, False]
+        assert [analysis["title"] for _, _, analysis, _ in first] == ["标题1", "标题2", "标题3"]
+
+        second = sorted(iter_file_analyses(files, _sequential_map, cache))
+        assert [cached for _, _, _, cached in second] == [True, True, True]
+        assert [a["word_count"] for _, _, a, _ in second] == [a["word_count"] for _, _, a, _ in first]
+    finally:
+        cache.close()
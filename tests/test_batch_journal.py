@@ -0,0 +1,46 @@
+"""
+batch_journal 的测试
+"""
+from batch_journal import BatchJournal, get_journal_path, load_last_batch
+
+
+def test_resume_after_interruption(tmp_path):
+    journal_dir = str(tmp_path)
+    journal = BatchJournal.create({"input_dir": "in"}, ["a.docx", "b.docx", "c.docx"], journal_dir)
+    journal.mark_started("a.docx")
+    journal.mark_done("a.docx", True, ["out/a.docx"])
+    journal.mark_started("b.docx")
+    journal.mark_done("b.docx", False, error="损坏")
+    journal.mark_started("c.docx")
+    journal.close()
+    # 崩溃时写了一半的记录被忽略
+    with open(get_journal_path(journal_dir), "a", encoding="utf-8") as f:
+        f.write('{"type": "done", "file": "c.do')
+
+    state = load_last_batch(journal_dir)
+
+    assert state.config == {"input_dir": "in"}
+    assert state.succeeded_files() == {"a.docx"}
+    assert state.in_flight == {"c.docx"}
+    assert state.remaining_files() == ["b.docx", "c.docx"]
+
+    resumed = BatchJournal.resume(state)
+    resumed.mark_done("b.docx", True)
+    resumed.mark_done("c.docx", True)
+    resumed.finish()
+
+    assert load_last_batch(journal_dir) is None
+    finished = load_last_batch(journal_dir, include_finished=True)
+    assert finished.finished
+    assert finished.remaining_files() == []
+
+
+def test_new_batch_replaces_old(tmp_path):
+    BatchJournal.create({}, ["a.docx"], str(tmp_path)).close()
+    BatchJournal.create({}, ["b.docx"], str(tmp_path)).close()
+
+    assert load_last_batch(str(tmp_path)).files == ["b.docx"]
+
+
+def test_missing_journal(tmp_path):
+    assert load_last_batch(str(tmp_path)) is None
@@ -0,0 +1,86 @@
+"""
+batch_statistics 的测试
+"""
+import os
+
+import pytest
+
+import batch_statistics
+from batch_statistics import BatchStatistics, ROOT_CLASS
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def numpy_available(request, monkeypatch):
+    """分别使用numpy和纯Python实现计算"""
+    if request.param and not batch_statistics.NUMPY_AVAILABLE:
+        pytest.skip("未安装numpy")
+    monkeypatch.setattr(batch_statistics, "NUMPY_AVAILABLE", request.param)
+    return request.param
+
+
+def _statistics():
+    statistics = BatchStatistics(min_words=500)
+    rows = [
+        (os.path.join("一班", "1张三.docx"), "张三", 300),
+        (os.path.join("一班", "2李四.docx"), "李四", 800),
+        (os.path.join("二班", "3王五.docx"), "王五", 1000),
+        ("4赵六.docx", "张三", 600),
+    ]
+    for name, author, words in rows:
+        statistics.add(name, author, words, 10, words + 50)
+    return statistics
+
+
+class _Report:
+    def __init__(self):
+        self.sheets = {}
+
+    def add_sheet(self, title, headers=None, column_styles=None):
+        rows = self.sheets[title] = []
+        return type("Sheet", (), {"append": lambda self, values, style=None: rows.append(list(values))})()
+
+
+def test_summary(numpy_available):
+    summary = _statistics().summary()
+
+    assert summary["count"] == 4
+    assert summary["total"] == 2700
+    assert summary["mean"] == pytest.approx(675)
+    assert summary["std"] == pytest.approx(258.6020, rel=1e-4)
+    assert (summary["min"], summary["max"]) == (300, 1000)
+    assert summary["low_count"] == 1
+    assert summary["pass_rate"] == pytest.approx(0.75)
+    assert summary["p50"] == pytest.approx(700)
+    assert summary["p25"] == pytest.approx(525)
+
+
+def test_histogram(numpy_available):
+    histogram = _statistics().histogram(bins=2)
+
+    assert histogram == [(300, 650, 2), (650, 1000, 2)]
+    assert sum(files for _, _, files in _statistics().histogram()) == 4
+
+
+def test_group_aggregates(numpy_available):
+    statistics = _statistics()
+
+    assert statistics.group_aggregates("author")[0] == ("张三", 2, 900, 450.0, 300, 600, 1)
+    assert [row[0] for row in statistics.group_aggregates("class")] == ["一班", "二班", ROOT_CLASS]
+
+
+def test_empty_statistics():
+    statistics = BatchStatistics(min_words=500)
+    report = _Report()
+    statistics.write_sheets(report)
+
+    assert statistics.summary()["count"] == 0
+    assert statistics.histogram() == []
+    assert report.sheets == {}
+
+
+def test_write_sheets():
+    report = _Report()
+    _statistics().write_sheets(report)
+
+    assert list(report.sheets) == ["字数分布", "百分位数", "作者统计", "班级统计"]
+    assert report.sheets["百分位数"][2] == ["50%", 700.0]
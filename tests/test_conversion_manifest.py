@@ -0,0 +1,63 @@
+"""
+conversion_manifest 的测试
+"""
+import os
+
+from conversion_manifest import ConversionManifest, conversion_config_hash
+
+
+def _config(**overrides):
+    options = dict(use_chinese_format=True, suffix_enabled=True, suffix_text="后缀",
+                   show_author_info=True, keep_image_position=True)
+    options.update(overrides)
+    return conversion_config_hash(**options)
+
+
+def test_config_hash():
+    assert _config() == _config()
+    assert _config() != _config(use_chinese_format=False)
+    # 未启用后缀时后缀内容不影响输出
+    assert _config(suffix_enabled=False) == _config(suffix_enabled=False, suffix_text="其他")
+
+
+def test_round_trip_and_staleness(tmp_path):
+    source = tmp_path / "1张三.docx"
+    source.write_bytes(b"v1")
+    output_dir = tmp_path / "out"
+    output = output_dir / "成功文件" / "张三-标题.docx"
+    output.parent.mkdir(parents=True)
+    output.write_bytes(b"out")
+
+    manifest = ConversionManifest(str(output_dir))
+    assert manifest.status(str(source))[0] == "未转换"
+    manifest.record(str(source), _config(), [str(output)])
+    manifest.save()
+
+    manifest = ConversionManifest(str(output_dir))
+    assert manifest.check(str(source), _config()) == [str(output)]
+    assert manifest.check(str(source), _config(use_chinese_format=False)) is None
+    assert manifest.status(str(source)) == ("已转换", [str(output)])
+
+    # 只修改时间变化时仍为最新
+    os.utime(source, ns=(0, os.stat(source).st_mtime_ns + 10 ** 9))
+    assert manifest.check(str(source), _config()) == [str(output)]
+
+    source.write_bytes(b"v2")
+    assert manifest.check(str(source), _config()) is None
+    assert manifest.status(str(source))[0] == "已过期"
+
+
+def test_record_removes_unused_old_output(tmp_path):
+    source = tmp_path / "1张三.docx"
+    source.write_bytes(b"v1")
+    old_output = tmp_path / "旧标题.docx"
+    new_output = tmp_path / "新标题.docx"
+    old_output.write_bytes(b"old")
+    new_output.write_bytes(b"new")
+
+    manifest = ConversionManifest(str(tmp_path))
+    manifest.record(str(source), _config(), [str(old_output)])
+    manifest.record(str(source), _config(), [str(new_output)])
+
+    assert not old_output.exists()
+    assert new_output.exists()
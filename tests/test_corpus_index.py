@@ -0,0 +1,102 @@
+"""
+corpus_index 的测试
+"""
+import os
+import random
+
+from corpus_index import (
+    CorpusIndex, LOCK_NAME, sampled_shingles,
+    check_and_add_document, clear_corpus_index, get_corpus_index,
+)
+
+
+def _text(seed, length=3000):
+    rng = random.Random(seed)
+    return "".join(chr(rng.randrange(0x4E00, 0x9FA5)) for _ in range(length))
+
+
+def test_find_similar_across_reopen(tmp_path):
+    index = CorpusIndex(str(tmp_path))
+    first = index.add_document(_text(1), name="2023-张三.docx", content_hash="h1", year=2023)
+    index.add_document(_text(2), name="2023-李四.docx", content_hash="h2", year=2023)
+    # 内容相同的文档只收录一次
+    assert index.add_document(_text(1), name="副本.docx", content_hash="h1") is None
+    # 尚未写入段文件的文档也能查到
+    assert index.find_similar(_text(1))[0][0]["id"] == first
+    index.close()
+
+    index = CorpusIndex(str(tmp_path))
+    try:
+        assert len(index) == 2
+        matches = index.find_similar(_text(1)[:2500] + _text(3, 500))
+        assert [m[0]["name"] for m in matches] == ["2023-张三.docx"]
+        assert matches[0][0]["year"] == 2023
+        assert 0.7 < matches[0][1] <= 1.0
+
+        assert index.find_similar(_text(4)) == []
+        assert index.find_similar(_text(1), exclude=("2023-张三.docx", "h1")) == []
+    finally:
+        index.close()
+
+
+def test_compact_keeps_documents(tmp_path):
+    index = CorpusIndex(str(tmp_path))
+    try:
+        for seed in range(3):
+            index.add_document(_text(seed), name=f"{seed}.docx", content_hash=str(seed))
+            index.flush()
+        assert len(index.segments) == 3
+        index.compact()
+        assert len(index.segments) == 1
+        for seed in range(3):
+            assert index.find_similar(_text(seed))[0][0]["name"] == f"{seed}.docx"
+    finally:
+        index.close()
+
+
+def test_short_text_is_ignored(tmp_path):
+    index = CorpusIndex(str(tmp_path))
+    try:
+        assert not sampled_shingles("太短")
+        assert index.add_document("太短", name="a.docx") is None
+        assert index.find_similar("太短") == []
+    finally:
+        index.close()
+
+
+def test_indexes_sharing_a_directory(tmp_path):
+    # 两个进程各自打开同一个索引目录
+    first = CorpusIndex(str(tmp_path))
+    second = CorpusIndex(str(tmp_path))
+    try:
+        first.add_document(_text(1), name="1.docx", content_hash="h1")
+        second.add_document(_text(2), name="2.docx", content_hash="h2")
+        first.flush()
+        second.flush()
+        assert not os.path.exists(os.path.join(str(tmp_path), LOCK_NAME))
+        # 写入时读入了另一个进程的文档和段文件
+        assert second.find_similar(_text(1))[0][0]["name"] == "1.docx"
+    finally:
+        first.close()
+        second.close()
+
+    index = CorpusIndex(str(tmp_path))
+    try:
+        assert [document["id"] for document in index.documents] == [0, 1]
+        for seed in (1, 2):
+            assert index.find_similar(_text(seed))[0][0]["name"] == f"{seed}.docx"
+    finally:
+        index.close()
+
+
+def test_check_and_add_document_uses_given_hash(tmp_path):
+    # 传入内容哈希时不读取源文件
+    missing = str(tmp_path / "2024-王五.docx")
+    try:
+        assert check_and_add_document(_text(1), missing, "h1", year=2024) == []
+        matches = check_and_add_document(_text(1), str(tmp_path / "副本.docx"), "h2")
+        assert [m[0]["name"] for m in matches] == ["2024-王五.docx"]
+    finally:
+        assert clear_corpus_index() == 2
+    assert len(get_corpus_index()) == 0
+    clear_corpus_index()
@@ -0,0 +1,155 @@
+"""
+doc_converters 转换实例池的测试
+"""
+import os
+import sys
+import threading
+
+import pytest
+
+from doc_converters import ConverterPool, ConversionError, DocConverter, FakeConverter, LibreOfficeConverter
+
+from doc_factory import write_doc
+
+
+class _CountingConverter(DocConverter):
+    """记录创建的实例，convert只返回输出路径"""
+
+    name = "counting"
+    instances = []
+
+    def __init__(self):
+        self.conversions = 0
+        self.closed = False
+        type(self).instances.append(self)
+
+    def convert(self, input_file, output_file):
+        self.conversions += 1
+        return output_file
+
+    def close(self):
+        self.closed = True
+
+
+class _CrashingConverter(_CountingConverter):
+    """第一个实例在收到信号后崩溃，之后的实例正常工作"""
+
+    instances = []
+    crash = threading.Event()
+    converting = threading.Event()
+
+    def __init__(self):
+        super().__init__()
+        self.alive = True
+        self.first = len(type(self).instances) == 1
+
+    def convert(self, input_file, output_file):
+        if self.first:
+            type(self).converting.set()
+            type(self).crash.wait(timeout=10)
+            self.alive = False
+            raise RuntimeError("Word进程已退出")
+        return super().convert(input_file, output_file)
+
+    def is_alive(self):
+        return self.alive
+
+
+def test_pool_reuses_instances():
+    _CountingConverter.instances = []
+    pool = ConverterPool(_CountingConverter, size=2)
+
+    for i in range(5):
+        assert pool.convert(f"{i}.doc", f"{i}.docx") == f"{i}.docx"
+    pool.close()
+
+    assert len(_CountingConverter.instances) == 1
+    assert _CountingConverter.instances[0].conversions == 5
+    assert _CountingConverter.instances[0].closed
+
+
+def test_pool_recovers_after_crash():
+    _CrashingConverter.instances = []
+    pool = ConverterPool(_CrashingConverter, size=1)
+    errors = []
+    results = []
+
+    def crash():
+        try:
+            pool.convert("a.doc", "a.docx")
+        except ConversionError as e:
+            errors.append(e)
+
+    first = threading.Thread(target=crash, daemon=True)
+    first.start()
+    assert _CrashingConverter.converting.wait(timeout=10)
+
+    # 唯一的实例正在使用中，第二个线程等待
+    second = threading.Thread(target=lambda: results.append(pool.convert("b.doc", "b.docx")), daemon=True)
+    second.start()
+    _CrashingConverter.crash.set()
+    first.join(timeout=10)
+    second.join(timeout=10)
+
+    assert not second.is_alive(), "实例崩溃后等待的线程未被唤醒"
+    assert len(errors) == 1
+    assert results == ["b.docx"]
+    assert len(_CrashingConverter.instances) == 2
+    assert _CrashingConverter.instances[0].closed
+    pool.close()
+
+
+def test_closed_pool_rejects_conversions():
+    pool = ConverterPool(_CountingConverter)
+    pool.close()
+    with pytest.raises(ConversionError):
+        pool.convert("a.doc", "a.docx")
+
+
+def test_unknown_backend():
+    with pytest.raises(ConversionError):
+        ConverterPool("不存在")
+
+
+def test_fake_converter(tmp_path):
+    docx = pytest.importorskip("docx")
+    source = write_doc(tmp_path / "1张三.doc", ["标题", "正文"])
+    pool = ConverterPool("fake")
+    try:
+        for name in ("a.docx", "b.docx"):
+            pool.convert(source, str(tmp_path / name))
+    finally:
+        pool.close()
+
+    assert [p.text for p in docx.Document(str(tmp_path / "b.docx")).paragraphs] == ["标题", "正文"]
+
+
+def test_libreoffice_profile_slots_are_reused():
+    first = LibreOfficeConverter(soffice="soffice")
+    second = LibreOfficeConverter(soffice="soffice")
+    try:
+        assert first.profile_dir != second.profile_dir
+        assert os.path.basename(first.profile_dir) == f"profile_{first.slot}"
+
+        # 关闭后槽位释放，下一个实例复用同一个配置目录
+        first.close()
+        third = LibreOfficeConverter(soffice="soffice")
+        assert third.profile_dir == first.profile_dir
+        third.close()
+    finally:
+        first.close()
+        second.close()
+
+
+def test_libreoffice_without_uno_logs_cli_mode(monkeypatch, capsys):
+    monkeypatch.setattr(LibreOfficeConverter, "_cli_notice_shown", False)
+    monkeypatch.setitem(sys.modules, "uno", None)
+    converters = [LibreOfficeConverter(soffice="soffice") for _ in range(2)]
+    try:
+        for converter in converters:
+            converter.start()
+    finally:
+        for converter in converters:
+            converter.close()
+
+    assert capsys.readouterr().out.count("单独启动一次soffice") == 1
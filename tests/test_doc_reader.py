@@ -0,0 +1,47 @@
+"""
+doc_reader 的测试
+"""
+import pytest
+
+from doc_reader import CompoundFile, DocFormatError, load_document, read_doc_document, read_doc_paragraphs
+
+from doc_factory import build_doc, write_doc
+
+
+def test_read_paragraphs(tmp_path):
+    path = write_doc(tmp_path / "1张三.doc", ["我的标题", "第一段正文。", "第二段\x0b换行", "", ""])
+
+    assert read_doc_paragraphs(path) == ["我的标题", "第一段正文。", "第二段\n换行"]
+
+
+def test_fields_keep_only_result(tmp_path):
+    path = write_doc(tmp_path / "1张三.doc", ["页码：\x13 PAGE \x145\x15 页"])
+
+    assert read_doc_paragraphs(path) == ["页码：5 页"]
+
+
+def test_compound_file_streams():
+    compound_file = CompoundFile(build_doc(["正文"]))
+
+    assert compound_file.list_streams() == ["1Table", "WordDocument"]
+    assert compound_file.exists("WordDocument")
+    with pytest.raises(DocFormatError):
+        compound_file.open_stream("0Table")
+
+
+def test_document_view(tmp_path):
+    path = write_doc(tmp_path / "1张三.doc", ["标题", "正文"])
+
+    document = read_doc_document(path)
+    assert [p.text for p in document.paragraphs] == ["标题", "正文"]
+    assert document.tables == []
+    assert document.core_properties.title == ""
+    assert [p.text for p in load_document(path).paragraphs] == ["标题", "正文"]
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / "1张三.doc"
+    path.write_bytes(b"not a word document" * 50)
+
+    with pytest.raises(DocFormatError):
+        read_doc_paragraphs(str(path))
@@ -0,0 +1,36 @@
+"""
+file_utils 的测试
+"""
+import os
+
+from file_utils import extract_author_number, link_or_copy, reuse_outputs
+
+
+def test_extract_author_number():
+    assert extract_author_number("85212张三-标题.docx") == 85212
+    assert extract_author_number("无编号.docx") == float("inf")
+
+
+def test_link_or_copy_replaces_target(tmp_path):
+    source = tmp_path / "a.docx"
+    source.write_bytes(b"new")
+    target = tmp_path / "sub" / "b.docx"
+    target.parent.mkdir()
+    target.write_bytes(b"old")
+
+    assert link_or_copy(str(source), str(target)) == str(target)
+    assert target.read_bytes() == b"new"
+
+
+def test_reuse_outputs_keeps_category_folder(tmp_path):
+    source_dir = tmp_path / "out"
+    source = source_dir / "成功文件" / "[字数不足]李四-标题.docx"
+    source.parent.mkdir(parents=True)
+    source.write_bytes(b"doc")
+    target_dir = tmp_path / "out" / "复赛"
+
+    outputs = reuse_outputs([str(source)], str(source_dir), str(target_dir))
+
+    expected = target_dir / "成功文件" / "[字数不足]李四-标题.docx"
+    assert outputs == [str(expected)]
+    assert expected.read_bytes() == b"doc"
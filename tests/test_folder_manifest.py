@@ -0,0 +1,79 @@
+"""
+folder_manifest 的测试
+"""
+import os
+
+from folder_manifest import FolderManifest, get_folder_manifest, mirrored_output_dir, parse_patterns
+
+
+def _write(path, data=b"x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_scan_sorts_by_author_number_and_skips_other_files(tmp_path):
+    _write(tmp_path / "85210王五.docx", b"aaa")
+    _write(tmp_path / "85202李四.doc", b"bb")
+    _write(tmp_path / "~$85202李四.doc")
+    _write(tmp_path / "说明.txt")
+    _write(tmp_path / "sub" / "85201张三.docx")
+
+    manifest = FolderManifest.build(str(tmp_path))
+
+    assert manifest.names() == ["85202李四.doc", "85210王五.docx"]
+    assert manifest.get("85202李四.doc").author_name == "李四"
+    assert manifest.get("85202李四.doc").author_number == 85202
+
+
+def test_total_size(tmp_path):
+    _write(tmp_path / "1张三.docx", b"a" * 10)
+    _write(tmp_path / "2李四.docx", b"a" * 5)
+    manifest = FolderManifest.build(str(tmp_path))
+
+    assert manifest.total_size() == 15
+    assert manifest.total_size(["2李四.docx", "不存在.docx"]) == 5
+
+
+def test_recursive_scan_with_exclude(tmp_path):
+    _write(tmp_path / "1张三.docx")
+    _write(tmp_path / "初赛" / "2李四.docx")
+    _write(tmp_path / "草稿" / "3王五.docx")
+
+    manifest = FolderManifest.build(str(tmp_path), recursive=True, exclude=parse_patterns("草稿"))
+
+    assert manifest.names() == ["1张三.docx", os.path.join("初赛", "2李四.docx")]
+    assert mirrored_output_dir("out", manifest.names()[1]) == os.path.join("out", "初赛")
+    assert mirrored_output_dir("out", manifest.names()[1], mirror_output=False) == "out"
+
+
+def test_duplicate_groups(tmp_path):
+    _write(tmp_path / "1张三.docx", b"same")
+    _write(tmp_path / "2李四.docx", b"same")
+    _write(tmp_path / "3王五.docx", b"diff")
+
+    groups = FolderManifest.build(str(tmp_path)).duplicate_groups()
+
+    assert [[entry.name for entry in group] for group in groups] == [["1张三.docx", "2李四.docx"]]
+
+
+def test_get_folder_manifest_reuses_until_folder_changes(tmp_path):
+    _write(tmp_path / "1张三.docx")
+    first = get_folder_manifest(str(tmp_path))
+    assert get_folder_manifest(str(tmp_path)) is first
+
+    _write(tmp_path / "2李四.docx")
+    os.utime(tmp_path, ns=(0, os.stat(tmp_path).st_mtime_ns + 10 ** 9))
+    second = get_folder_manifest(str(tmp_path))
+    assert second is not first
+    assert len(second) == 2
+
+
+def test_subset_keeps_manifest_order(tmp_path):
+    for name in ("1张三.docx", "2李四.docx", "3王五.docx"):
+        _write(tmp_path / name)
+
+    manifest = get_folder_manifest(str(tmp_path), names=["3王五.docx", "1张三.docx", "不存在.docx"])
+
+    assert manifest.names() == ["1张三.docx", "3王五.docx"]
+    assert len(get_folder_manifest(str(tmp_path))) == 3
@@ -0,0 +1,69 @@
+"""
+处理器的冒烟测试：在真实的文件夹上运行处理线程
+"""
+from gui.handlers.worker_pool import WorkerPool
+from gui.handlers.wordcount_handler import WordcountHandler
+from gui.utils.progress_aggregator import ProgressAggregator
+
+from doc_factory import write_doc
+
+
+class _Root:
+    """代替tkinter主窗口，after回调立即执行"""
+
+    def after(self, delay, callback=None, *args):
+        if callback is not None:
+            callback(*args)
+
+
+class _App:
+    """处理线程用到的主程序接口"""
+
+    def __init__(self):
+        self.root = _Root()
+        self.progress = ProgressAggregator()
+        self.worker_pool = WorkerPool(1)
+        self.logs = []
+        self.status = None
+
+    def log(self, message):
+        self.logs.append(message)
+
+    def set_status(self, message):
+        self.status = message
+
+    def enable_buttons(self):
+        pass
+
+
+def _run_wordcount(tmp_path, selected_files=None):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    write_doc(input_dir / "1张三-长文.doc", ["长文标题", "这是一篇足够长的正文。" * 10])
+    write_doc(input_dir / "2李四-短文.doc", ["短文标题", "太短了"])
+
+    app = _App()
+    try:
+        handler = WordcountHandler(app)
+        app.worker_pool.run_in_background(
+            handler._check_thread, str(input_dir), str(tmp_path / "output"), 50, [], 1, None, selected_files
+        ).result(timeout=60)
+    finally:
+        app.worker_pool.shutdown()
+    return app
+
+
+def test_wordcount_thread(tmp_path):
+    app = _run_wordcount(tmp_path)
+
+    assert app.status.startswith("字数检测完成，共 2 个文件，其中 1 个不足 50 字"), app.status
+    snapshot = app.progress.snapshot()
+    assert not snapshot.active
+    assert snapshot.done_files == 2
+    assert snapshot.done_bytes == snapshot.total_bytes > 0
+
+
+def test_wordcount_thread_selected_files(tmp_path):
+    app = _run_wordcount(tmp_path, ["1张三-长文.doc"])
+
+    assert app.status.startswith("字数检测完成，共 1 个文件，其中 0 个不足 50 字"), app.status
@@ -0,0 +1,56 @@
+"""
+LogModel 的测试
+"""
+import pytest
+
+from gui.utils.log_model import LogModel, line_level
+from task_events import LEVEL_ERROR, LEVEL_INFO, LEVEL_SUCCESS, LEVEL_WARNING
+
+
+@pytest.fixture
+def model(tmp_path):
+    model = LogModel(capacity=3, spill_dir=str(tmp_path))
+    yield model
+    model.close()
+
+
+def test_line_level_ignores_author_prefix():
+    assert line_level("作者12(张三): × 转换失败") == LEVEL_ERROR
+    assert line_level("! 字数不足") == LEVEL_WARNING
+    assert line_level("✓ 完成") == LEVEL_SUCCESS
+    assert line_level("开始处理") == LEVEL_INFO
+
+
+def test_partial_lines_and_spilled_lines(model):
+    assert model.append("开始处理\n× a.docx 失败\n✓ b") == 2
+    assert model.append(".docx 成功\n! c.docx 警告\n普通信息\n") == 3
+
+    assert len(model) == 5
+    # 容量为3，较早的行从溢出文件中读取
+    assert model.get_line(0) == (LEVEL_INFO, "开始处理")
+    assert model.get_line(2) == (LEVEL_SUCCESS, "✓ b.docx 成功")
+    assert model.get_lines([1, 4]) == [(LEVEL_ERROR, "× a.docx 失败"), (LEVEL_INFO, "普通信息")]
+
+
+def test_filter_and_export(model, tmp_path):
+    model.append("开始处理\n× A.docx 失败\n✓ b.docx 成功\n! a.docx 警告\n")
+
+    assert list(model.filter([LEVEL_ERROR, LEVEL_WARNING])) == [1, 3]
+    assert list(model.filter(keyword="a.docx")) == [1, 3]
+    assert list(model.filter([LEVEL_WARNING], keyword="a.docx", start=2)) == [3]
+    assert model.text([2]) == "✓ b.docx 成功\n"
+
+    path = tmp_path / "log.txt"
+    model.export(str(path))
+    assert path.read_text(encoding="utf-8") == "开始处理\n× A.docx 失败\n✓ b.docx 成功\n! a.docx 警告\n"
+
+
+def test_clear(model):
+    model.append("× a\n")
+    version = model.version
+    model.clear()
+
+    assert len(model) == 0
+    assert model.version > version
+    model.append("✓ b\n")
+    assert model.text() == "✓ b\n"
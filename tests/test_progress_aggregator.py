@@ -0,0 +1,31 @@
+"""
+ProgressAggregator 的测试
+"""
+from gui.utils.progress_aggregator import ProgressAggregator, format_duration
+
+
+def test_format_duration():
+    assert format_duration(65) == "01:05"
+    assert format_duration(3725) == "1:02:05"
+
+
+def test_snapshot_and_finish():
+    progress = ProgressAggregator()
+    progress.start("正在检测文件", 4, 400)
+    progress.advance(1, 100)
+    progress.advance(1, 100)
+
+    snapshot = progress.snapshot()
+    assert snapshot.active
+    assert (snapshot.done_files, snapshot.done_bytes) == (2, 200)
+    assert progress.format(snapshot).startswith("正在检测文件 2/4 (50%)")
+
+    progress.finish()
+    progress.finish()
+    finished = progress.snapshot()
+    assert not finished.active
+    assert finished.generation == snapshot.generation
+
+    progress.start("正在提取标题", 1)
+    assert progress.snapshot().generation == snapshot.generation + 1
+    assert progress.snapshot().done_files == 0
@@ -0,0 +1,44 @@
+"""
+RedirectText 的测试
+"""
+from gui.utils.redirect_text import RedirectText
+from task_events import TaskResult
+
+
+class _Sink:
+    def __init__(self):
+        self.lines = []
+
+    def write(self, text):
+        self.lines.append(text)
+
+
+def test_log_text_does_not_change_results():
+    redirect = RedirectText(None, sink=_Sink())
+    redirect.write("× 某个文件处理失败\n")
+    redirect.write("✓ 另一个文件处理成功\n")
+
+    assert redirect.get_error_files() == set()
+    assert redirect.get_success_files() == set()
+    assert redirect.sink.lines == ["× 某个文件处理失败\n", "✓ 另一个文件处理成功\n"]
+
+
+def test_record_result():
+    redirect = RedirectText(None, sink=_Sink())
+    redirect.record_result(TaskResult("1张三.docx", success=False))
+    redirect.record_result(TaskResult("2李四.docx", success=True))
+    redirect.record_result(TaskResult("1张三.docx", success=True))
+
+    assert redirect.get_error_files() == set()
+    assert redirect.get_success_files() == {"1张三.docx", "2李四.docx"}
+
+    redirect.clear_files()
+    assert redirect.get_success_files() == set()
+
+
+def test_error_only_filters_by_level():
+    redirect = RedirectText(None, error_only=True, sink=_Sink())
+    for line in ("开始处理\n", "× 失败\n", "! 警告\n", "✓ 成功\n", "  \n"):
+        redirect.write(line)
+
+    assert redirect.sink.lines == ["× 失败\n", "! 警告\n"]
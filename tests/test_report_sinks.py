@@ -0,0 +1,48 @@
+"""
+report_sinks 的测试
+"""
+import csv
+import json
+import sqlite3
+
+from report_sinks import create_report
+
+ROWS = [["1张三.docx", "张三", 1200], ["2李四.docx", "李四", 300]]
+
+
+def test_csv_jsonl_sqlite_round_trip(tmp_path):
+    report = create_report(str(tmp_path), "字数统计报告", ["csv", "jsonl", "sqlite"])
+    sheet = report.add_sheet("总览", ["文件名", "作者", "字数"])
+    for row in ROWS:
+        sheet.append(row)
+    paths = report.save()
+    report.close()
+
+    csv_path, jsonl_path, sqlite_path = paths
+    assert csv_path.endswith("_总览.csv")
+    with open(csv_path, encoding="utf-8-sig", newline="") as f:
+        assert list(csv.reader(f)) == [["文件名", "作者", "字数"]] + [[str(v) for v in row] for row in ROWS]
+
+    with open(jsonl_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert records[1] == {"sheet": "总览", "文件名": "2李四.docx", "作者": "李四", "字数": 300}
+
+    conn = sqlite3.connect(sqlite_path)
+    try:
+        assert conn.execute('SELECT * FROM "总览"').fetchall() == [tuple(row) for row in ROWS]
+    finally:
+        conn.close()
+
+
+def test_sheet_without_headers(tmp_path):
+    report = create_report(str(tmp_path), "报告", ["jsonl", "sqlite"])
+    report.add_sheet("统计").append(["总数", 2])
+    jsonl_path, sqlite_path = report.save()
+
+    with open(jsonl_path, encoding="utf-8") as f:
+        assert json.loads(f.readline()) == {"sheet": "统计", "values": ["总数", 2]}
+    conn = sqlite3.connect(sqlite_path)
+    try:
+        assert conn.execute('SELECT "列1", "列2" FROM "统计"').fetchall() == [("总数", 2)]
+    finally:
+        conn.close()
@@ -0,0 +1,61 @@
+"""
+similarity 的测试
+"""
+import random
+
+import pytest
+
+import similarity
+from similarity import (
+    MIN_TEXT_LENGTH, estimate_similarity, find_similar_pairs, minhash_signature, normalize_text,
+    unpack_signature,
+)
+
+
+def _text(seed, length=600):
+    rng = random.Random(seed)
+    return "".join(chr(rng.randrange(0x4E00, 0x9FA5)) for _ in range(length))
+
+
+def test_normalize_text():
+    assert normalize_text("Hello, 世界！ 123") == "hello世界123"
+
+
+def test_short_text_has_no_signature():
+    assert minhash_signature("短" * (MIN_TEXT_LENGTH - 1)) is None
+    assert unpack_signature(None) is None
+
+
+def test_identical_text_has_identical_signature():
+    text = _text(1)
+    signature = minhash_signature(text)
+
+    assert signature == minhash_signature(text + "！")
+    assert estimate_similarity(unpack_signature(signature), unpack_signature(signature)) == 1.0
+
+
+def test_find_similar_pairs():
+    original = _text(1)
+    edited = original[:550] + _text(2, 50)
+    signatures = [
+        ("a.docx", minhash_signature(original)),
+        ("b.docx", minhash_signature(_text(3))),
+        ("c.docx", minhash_signature(edited)),
+        ("d.docx", None),
+    ]
+
+    pairs = find_similar_pairs(signatures)
+
+    assert [(a, b) for a, b, _ in pairs] == [("a.docx", "c.docx")]
+    assert pairs[0][2] > 0.7
+
+
+def test_numpy_signature_matches_python(monkeypatch):
+    if not similarity.NUMPY_AVAILABLE:
+        pytest.skip("未安装numpy")
+    # 片段数超过一个分块，覆盖分块取最小值
+    text = _text(4, 6000)
+    signature = minhash_signature(text)
+
+    monkeypatch.setattr(similarity, "NUMPY_AVAILABLE", False)
+    assert minhash_signature(text) == signature
@@ -0,0 +1,32 @@
+"""
+WorkerPool 的测试
+"""
+import threading
+
+from gui.handlers import worker_pool
+from gui.handlers.worker_pool import WorkerPool
+
+
+def test_warm_up_does_not_use_task_thread(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    warm_up_threads = []
+
+    def warm_up():
+        warm_up_threads.append(threading.current_thread().name)
+        started.set()
+        release.wait()
+
+    monkeypatch.setattr(worker_pool, "warm_up", warm_up)
+    monkeypatch.setattr(WorkerPool, "process_executor", lambda self, max_workers=None: None)
+
+    pool = WorkerPool(1)
+    try:
+        pool.start()
+        assert started.wait(5)
+        # 预热尚未结束时，操作也能立即在后台任务线程中运行
+        assert pool.run_in_background(lambda: threading.current_thread().name).result(timeout=5).startswith("task")
+        assert warm_up_threads == ["warm-up"]
+    finally:
+        release.set()
+        pool.shutdown()
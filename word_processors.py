@@ -12,11 +12,16 @@ from doc_processor import process_doc_file
 from docx_processor import process_docx_file
 from image_extractor import extract_images_from_doc
 from file_utils import extract_author_number, extract_author_from_filename, cleanup_temp_directory
+from task_events import report, run_task
+from folder_manifest import get_folder_manifest, scan_folder, mirrored_output_dir, DuplicateTracker
+from file_utils import reuse_outputs
+from conversion_manifest import ConversionManifest, conversion_config_hash
 
 def process_word_file(input_file, output_dir, suffix_enabled=True, 
                      suffix_text="——福州大学先进制造学院与海洋学院关工委2023年'中华魂'（毛泽东伟大精神品格）主题教育征文", 
                      use_chinese_format=False, keep_image_position=True, show_author_info=True,
-                     mark_low_wordcount=False): # Added mark_low_wordcount parameter
+                     mark_low_wordcount=False, corpus_check=False,
+                     content_hash=None): # Added mark_low_wordcount parameter
     """
     处理单个Word文件，自动识别.doc或.docx格式
     
@@ -29,13 +34,15 @@ def process_word_file(input_file, output_dir, suffix_enabled=True,
         keep_image_position: 是否保持图片位置
         show_author_info: 是否显示作者信息
         mark_low_wordcount: 是否标记低字数文档
+        corpus_check: 是否与本机语料库中的往年征文比对，并将本文收录到语料库
+        content_hash: 源文件的内容哈希（可选，调用方已计算时传入）
         
     返回:
         bool: 处理成功返回True，否则返回False
     """
     # 检查文件是否存在
     if not os.path.exists(input_file):
-        print(f"× 错误：输入文件 '{input_file}' 不存在")
+        report(f"× 错误：输入文件 '{input_file}' 不存在")
         return False
     
     # 根据文件扩展名选择相应的处理函数
@@ -43,22 +50,26 @@ def process_word_file(input_file, output_dir, suffix_enabled=True,
         # TODO: Update process_doc_file similarly if needed
         return process_doc_file(
             input_file, output_dir, suffix_enabled, suffix_text, 
-            use_chinese_format, keep_image_position, show_author_info
+            use_chinese_format, keep_image_position, show_author_info,
+            corpus_check=corpus_check, content_hash=content_hash
             # Pass mark_low_wordcount=mark_low_wordcount when process_doc_file is updated
         )
     elif input_file.lower().endswith('.docx'):
         return process_docx_file(
             input_file, output_dir, suffix_enabled, suffix_text, 
             use_chinese_format, keep_image_position, show_author_info,
-            mark_low_wordcount=mark_low_wordcount # Pass parameter
+            mark_low_wordcount=mark_low_wordcount, # Pass parameter
+            corpus_check=corpus_check, content_hash=content_hash
         )
     else:
-        print(f"× 错误：不支持的文件格式 '{input_file}'")
+        report(f"× 错误：不支持的文件格式 '{input_file}'")
         return False
 
 def process_folder(input_folder, output_folder, suffix_enabled=True, 
                   suffix_text="——福州大学先进制造学院与海洋学院关工委2023年'中华魂'（毛泽东伟大精神品格）主题教育征文",
-                  use_chinese_format=False, keep_image_position=True, show_author_info=True):
+                  use_chinese_format=False, keep_image_position=True, show_author_info=True,
+                  channel=None, incremental=False, recursive=False, include=None, exclude=None,
+                  mirror_output=True, corpus_check=False):
     """
     处理文件夹中的所有Word文档
     
@@ -70,9 +81,16 @@ def process_folder(input_folder, output_folder, suffix_enabled=True,
         use_chinese_format: 是否使用中文格式
         keep_image_position: 是否保持图片位置
         show_author_info: 是否显示作者信息
+        channel: 事件通道（可选），为None时处理日志直接打印
+        incremental: 是否跳过内容和配置均未变化且输出仍存在的文件
+        recursive: 是否处理子文件夹中的文件（边扫描边处理）
+        include: 包含的文件通配符，默认为*.doc和*.docx
+        exclude: 排除的文件或文件夹通配符
+        mirror_output: 处理子文件夹时输出是否保持输入的目录结构
+        corpus_check: 是否与本机语料库中的往年征文比对，并将文档收录到语料库
         
     返回:
-        tuple: (成功处理文件数, 失败文件数)
+        tuple: (成功处理文件数（含跳过的文件）, 失败文件数)
     """
     # 确保输出文件夹存在
     if not os.path.exists(output_folder):
@@ -84,49 +102,104 @@ def process_folder(input_folder, output_folder, suffix_enabled=True,
     
     success_count = 0
     failure_count = 0
+    skipped_count = 0
+    reused_count = 0
+    
+    # 内容和作者都相同的重复文件只转换一次，其余复用输出
+    duplicates = DuplicateTracker()
+    produced = {}
+    
+    # 转换清单记录每个源文件的输出，供增量转换使用
+    manifest = ConversionManifest(output_folder)
+    config_hash = conversion_config_hash(use_chinese_format, suffix_enabled, suffix_text,
+                                         show_author_info, keep_image_position)
     
     try:
-        # 获取所有Word文件
-        word_files = [f for f in os.listdir(input_folder) 
-                     if not f.startswith('~$') and (f.endswith('.docx') or f.endswith('.doc'))]
-        
-        # 按作者编号排序
-        sorted_files = sorted(word_files, key=extract_author_number)
+        if recursive:
+            # 递归扫描时逐个目录产出文件，无需等待扫描完成即可开始处理
+            entries = scan_folder(input_folder, True, include, exclude)
+            print("正在扫描子文件夹并处理Word文件")
+        else:
+            # 获取所有Word文件（已按作者编号排序）
+            entries = get_folder_manifest(input_folder, False, include, exclude).entries
+            print(f"找到 {len(entries)} 个Word文件需要处理")
         
-        print(f"找到 {len(sorted_files)} 个Word文件需要处理")
-        
-        for filename in sorted_files:
-            # 设置当前处理的文件（用于日志）
-            if hasattr(sys.stdout, 'set_current_file'):
-                sys.stdout.set_current_file(filename)
-            if hasattr(sys.stderr, 'set_current_file'):
-                sys.stderr.set_current_file(filename)
-                
-            input_path = os.path.join(input_folder, filename)
+        for entry in entries:
+            filename = entry.name
+            input_path = entry.path
+            file_output_dir = mirrored_output_dir(output_folder, filename, recursive and mirror_output)
+            try:
+                earlier = duplicates.add(entry)
+            except OSError:
+                earlier = []
+            
+            # 增量模式下跳过输出已是最新的文件
+            outputs = manifest.check(input_path, config_hash, filename) if incremental else None
+            if outputs:
+                produced[filename] = outputs
+                skipped_count += 1
+                success_count += 1
+                continue
+            
+            # 与之前转换过的文件内容和作者都相同时，直接链接或复制其输出
+            original = next((e.name for e in earlier
+                             if e.author_name == entry.author_name and e.name in produced), None)
+            if original is not None:
+                try:
+                    outputs = reuse_outputs(
+                        produced[original],
+                        mirrored_output_dir(output_folder, original, recursive and mirror_output),
+                        file_output_dir
+                    )
+                except OSError as e:
+                    print(f"! {filename}: 复用 {original} 的输出失败，重新转换 - {str(e)}")
+                else:
+                    print(f"✓ {filename}: 与 {original} 内容完全相同，已复用其输出")
+                    produced[filename] = outputs
+                    manifest.record(input_path, config_hash, outputs, filename)
+                    reused_count += 1
+                    success_count += 1
+                    continue
+            
             print(f"\n处理文件：{filename}")
             
-            # 处理文档
-            success = process_word_file(
-                input_path, output_folder, suffix_enabled, suffix_text,
-                use_chinese_format, keep_image_position, show_author_info
+            # 在独立的任务上下文中处理文档，日志按文件归属
+            result = run_task(
+                process_word_file, filename,
+                input_path, file_output_dir, suffix_enabled, suffix_text,
+                use_chinese_format, keep_image_position, show_author_info,
+                corpus_check=corpus_check,
+                # 语料库比对沿用去重时已计算的内容哈希
+                content_hash=entry.content_hash if corpus_check else None,
+                channel=channel
             )
             
-            if success:
+            # 没有事件通道时直接输出该文件的日志
+            if channel is None:
+                for event in result.events:
+                    print(event.format(), end="")
+            
+            if result.success:
                 success_count += 1
+                if result.outputs:
+                    produced[filename] = result.outputs
+                    manifest.record(input_path, config_hash, result.outputs, filename)
             else:
                 failure_count += 1
+        
+        if skipped_count:
+            print(f"跳过 {skipped_count} 个未变化的文件")
+        if reused_count:
+            print(f"{reused_count} 个重复文件复用了已有输出")
+        for group in duplicates.groups():
+            print("! 内容完全相同：" + " = ".join(entry.name for entry in group))
                 
     except Exception as e:
         print(f"× 处理文件夹时发生错误：{str(e)}")
     finally:
+        manifest.save()
         # 清理临时文件
         cleanup_temp_directory(temp_dir)
-        
-        # 重置当前处理的文件
-        if hasattr(sys.stdout, 'set_current_file'):
-            sys.stdout.set_current_file(None)
-        if hasattr(sys.stderr, 'set_current_file'):
-            sys.stderr.set_current_file(None)
     
     return (success_count, failure_count)
 